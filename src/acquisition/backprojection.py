@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+from src.app_types import Distortion, Intrinsics
+
+UNDISTORT_ITERS = 20
+
+
+def _undistort_normalized(xd: np.ndarray, yd: np.ndarray, dist: Distortion) -> tuple[np.ndarray, np.ndarray]:
+    """Invert the Brown-Conrady (rational radial + tangential) model by fixed-point iteration."""
+    x, y = xd.copy(), yd.copy()
+    for _ in range(UNDISTORT_ITERS):
+        r2 = x * x + y * y
+        radial = (1 + r2 * (dist.k1 + r2 * (dist.k2 + r2 * dist.k3))) / (
+            1 + r2 * (dist.k4 + r2 * (dist.k5 + r2 * dist.k6))
+        )
+        dx = 2 * dist.p1 * x * y + dist.p2 * (r2 + 2 * x * x)
+        dy = dist.p1 * (r2 + 2 * y * y) + 2 * dist.p2 * x * y
+        x = (xd - dx) / radial
+        y = (yd - dy) / radial
+    return x, y
+
+
+class DepthBackprojector:
+    """
+    Turns depth images into Nx3 float32 point clouds.
+
+    The per-pixel ray table ``[x, y, 1]`` (undistorted normalized coordinates)
+    depends only on the intrinsics and distortion, so it is built once per
+    camera model and reused; each frame then costs a single vectorized multiply
+    by the scaled depth.
+    """
+
+    def __init__(self) -> None:
+        self._rays: dict[tuple[Intrinsics, Distortion | None], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def rays(self, intrinsics: Intrinsics, distortion: Distortion | None = None) -> np.ndarray:
+        key = (intrinsics, distortion)
+        rays = self._rays.get(key)
+        if rays is not None:
+            return rays
+        with self._lock:
+            rays = self._rays.get(key)
+            if rays is None:
+                rays = self._build_rays(intrinsics, distortion)
+                self._rays[key] = rays
+        return rays
+
+    @staticmethod
+    def _build_rays(intrinsics: Intrinsics, distortion: Distortion | None) -> np.ndarray:
+        w, h = int(intrinsics.width), int(intrinsics.height)
+        u = (np.arange(w, dtype=np.float64) - intrinsics.cx) / intrinsics.fx
+        v = (np.arange(h, dtype=np.float64) - intrinsics.cy) / intrinsics.fy
+        x, y = np.meshgrid(u, v)
+        if distortion is not None and distortion != Distortion():
+            x, y = _undistort_normalized(x, y, distortion)
+        rays = np.empty((h, w, 3), dtype=np.float32)
+        rays[..., 0] = x
+        rays[..., 1] = y
+        rays[..., 2] = 1.0
+        rays = rays.reshape(h * w, 3)
+        rays.setflags(write=False)
+        return rays
+
+    def backproject(
+        self,
+        depth: np.ndarray,
+        intrinsics: Intrinsics,
+        depth_scale: float = 1.0,
+        organized: bool = False,
+        distortion: Distortion | None = None,
+    ) -> np.ndarray:
+        """
+        Backproject an (H, W) depth image (raw sensor units) to camera-frame points.
+
+        With ``organized=False`` zero-depth pixels are dropped: only valid pixels
+        are gathered from the ray table and scaled in place, so the output array
+        is the only allocation of point size. With ``organized=True`` the result
+        keeps all H*W rows in sensor order, invalid pixels being (0, 0, 0).
+        """
+        h, w = int(intrinsics.height), int(intrinsics.width)
+        if depth.shape != (h, w):
+            raise ValueError(f"depth must be {h}x{w} to match intrinsics, got shape {depth.shape}")
+        rays = self.rays(intrinsics, distortion)
+        flat = depth.reshape(-1)
+
+        if organized:
+            z = flat.astype(np.float32)
+            if depth_scale != 1.0:
+                z *= np.float32(depth_scale)
+            return rays * z[:, None]
+
+        idx = np.flatnonzero(flat)
+        z = flat[idx].astype(np.float32)
+        if depth_scale != 1.0:
+            z *= np.float32(depth_scale)
+        points = rays[idx]
+        points *= z[:, None]
+        return points
+
+
+_default_backprojector = DepthBackprojector()
+
+
+def backproject_depth(
+    depth: np.ndarray,
+    intrinsics: Intrinsics,
+    depth_scale: float = 1.0,
+    organized: bool = False,
+    distortion: Distortion | None = None,
+) -> np.ndarray:
+    """Backproject with the process-wide ray-table cache."""
+    return _default_backprojector.backproject(depth, intrinsics, depth_scale, organized, distortion)
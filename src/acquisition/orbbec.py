@@ -1,14 +1,16 @@
-from src.app_types import PointCloud, Intrinsics
+from src.acquisition.backprojection import DepthBackprojector
+from src.app_types import PointCloud, Intrinsics, Distortion
 import numpy as np
 from pyorbbecsdk import Config, PointCloudFilter, OBFormat, Frame
 from pyorbbecsdk import OBSensorType, OBPropertyID
 from pyorbbecsdk import Pipeline
-import open3d as o3d
 
 def convert_to_o3d_point_cloud(points, colors=None):
     """
     Converts numpy arrays of points and colors (if provided) into an Open3D point cloud object.
     """
+    import open3d as o3d
+
     pcd = o3d.geometry.PointCloud()
     pcd.points = o3d.utility.Vector3dVector(points)
     if colors is not None:
@@ -16,7 +18,9 @@ def convert_to_o3d_point_cloud(points, colors=None):
     return pcd
 
 class OrbbecSource:
-    def __init__(self):
+    def __init__(self, use_sdk_point_cloud: bool = False):
+        self.use_sdk_point_cloud = use_sdk_point_cloud
+        self._backprojector = DepthBackprojector()
         self.config = Config()
         self.pipeline = Pipeline()
         device = self.pipeline.get_device()
@@ -28,12 +32,27 @@ class OrbbecSource:
             assert depth_profile is not None
             print("depth profile: ", depth_profile)
             self.depth_intrinsics = depth_profile.get_intrinsic()    
+            self.depth_distortion = depth_profile.get_distortion()
             self.config.enable_stream(depth_profile)
         except Exception as e:
             print(e)
             return
         self.pipeline.start(self.config)
         self.camera_param = self.pipeline.get_camera_param()
+        self.intrinsics = Intrinsics(self.depth_intrinsics.fx,
+                                     self.depth_intrinsics.fy,
+                                     self.depth_intrinsics.cx,
+                                     self.depth_intrinsics.cy,
+                                     self.depth_intrinsics.width,
+                                     self.depth_intrinsics.height)
+        self.distortion = Distortion(k1=self.depth_distortion.k1,
+                                     k2=self.depth_distortion.k2,
+                                     k3=self.depth_distortion.k3,
+                                     k4=self.depth_distortion.k4,
+                                     k5=self.depth_distortion.k5,
+                                     k6=self.depth_distortion.k6,
+                                     p1=self.depth_distortion.p1,
+                                     p2=self.depth_distortion.p2)
         # self.point_cloud_filter = PointCloudFilter()
         # self.point_cloud_filter.set_camera_param(camera_param)
         # self.point_cloud_filter.set_create_point_format(OBFormat.POINT)
@@ -42,19 +61,28 @@ class OrbbecSource:
         frames = self.pipeline.wait_for_frames(10000)
         if frames is None:
             raise Exception("Frame was not obtained")
-        
-        points = frames.get_point_cloud(self.camera_param)
-        points_o3d = convert_to_o3d_point_cloud(np.array(points))
-        
-        
-        intrinsics = Intrinsics(self.depth_intrinsics.fx,
-                                self.depth_intrinsics.fy,
-                                self.depth_intrinsics.cx,
-                                self.depth_intrinsics.cy,
-                                self.depth_intrinsics.width,
-                                self.depth_intrinsics.height)
-        
-        return PointCloud(points=points_o3d,
-                          intrinsics=intrinsics, depth_scale=1.0)
-        
-    
\ No newline at end of file
+
+        if self.use_sdk_point_cloud:
+            points = frames.get_point_cloud(self.camera_param)
+            points_o3d = convert_to_o3d_point_cloud(np.array(points))
+            return PointCloud(points=points_o3d,
+                              intrinsics=self.intrinsics, depth_scale=1.0)
+
+        depth_frame = frames.get_depth_frame()
+        if depth_frame is None:
+            raise Exception("Depth frame was not obtained")
+        depth_scale = float(depth_frame.get_depth_scale())
+        # Copied out of the SDK frame buffer so recorders can keep it.
+        depth = np.frombuffer(depth_frame.get_data(), dtype=np.uint16).copy()
+        depth = depth.reshape((depth_frame.get_height(), depth_frame.get_width()))
+
+        # Keep the sensor grid (zeros for invalid pixels) like get_point_cloud does.
+        points = self._backprojector.backproject(depth,
+                                                 self.intrinsics,
+                                                 depth_scale=depth_scale,
+                                                 organized=True,
+                                                 distortion=self.distortion)
+        return PointCloud(points=points,
+                          intrinsics=self.intrinsics,
+                          depth_scale=depth_scale,
+                          depth=depth)
@@ -1,28 +1,102 @@
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import fields
 from pathlib import Path
 import numpy as np
-import open3d as o3d
 
-from src.app_types import PointCloud, Intrinsics
+from src.acquisition.backprojection import DepthBackprojector
+from src.acquisition.session import KIND_DEPTH, SessionReader, is_session
+from src.app_types import Distortion, PointCloud, Intrinsics
+
+DEPTH_KEY = "depth_data"
+
+
+class FrameCache:
+    """Thread-safe LRU of decoded frames bounded by the size of their point buffers."""
+
+    def __init__(self, budget_mb: float) -> None:
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames: OrderedDict[Path | int, tuple[PointCloud, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def get(self, path: Path | int) -> PointCloud | None:
+        with self._lock:
+            entry = self._frames.get(path)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(path)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, path: Path | int, frame: PointCloud) -> None:
+        size = frame.points.nbytes
+        if size > self.budget:
+            return
+        with self._lock:
+            old = self._frames.pop(path, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._frames[path] = (frame, size)
+            self.nbytes += size
+            while self.nbytes > self.budget:
+                _, (_, evicted) = self._frames.popitem(last=False)
+                self.nbytes -= evicted
 
 
 class ReplaySource:
+    """
+    Replays recorded frames: a directory of `.npz` files, a single `.npz`
+    file or a memory-mapped `.session` file (see `src.acquisition.session`).
+
+    ``prefetch`` > 0 decodes that many upcoming files ahead on ``workers``
+    background threads, so `read` only waits when the decoders fall behind.
+    ``cache_mb`` > 0 keeps decoded frames in an LRU cache of that size; a
+    looped replay then decodes each file once. The source is an iterator:
+    ``for frame in source`` runs until the files are exhausted.
+    """
+
+    # Frames come from disk, so readers may wait for the consumer instead of dropping them.
+    live = False
+
     def __init__(
         self,
         data_dir: str | Path = "data",
         pattern: str = "*.npz",
         loop: bool = True,
         config_path: str | Path = "configs/config.yaml",
+        prefetch: int = 0,
+        workers: int = 1,
+        cache_mb: float = 0.0,
     ):
         self.data_dir = Path(data_dir)
         self.pattern = pattern
         self.loop = loop
         self.config_path = Path(config_path)
-        self._paths: list[Path] = []
+        self.prefetch = max(0, int(prefetch))
+        self.cache = FrameCache(cache_mb) if cache_mb > 0 else None
+        self._pool: ThreadPoolExecutor | None = None
+        self._pending: deque[Future] = deque()
+        # File paths, or frame indices for a session file.
+        self._paths: list[Path] | list[int] = []
+        self._session: SessionReader | None = None
         self._single_frame: PointCloud | None = None
         self._single_frame_used = False
-        if self.data_dir.is_file():
+        if is_session(self.data_dir):
+            self._session = SessionReader(self.data_dir)
+            self._paths = list(range(len(self._session)))
+            if not self._paths:
+                raise FileNotFoundError(f"No frames in session {self.data_dir!s}")
+        elif self.data_dir.is_file():
             if not self.data_dir.exists():
                 raise FileNotFoundError(f"File not found: {self.data_dir!s}")
             self._paths = [self.data_dir]
@@ -35,12 +109,27 @@ class ReplaySource:
         self._index = 0
         self._intrinsics_cfg = None
         self._intrinsics_error = None
+        self._distortion_cfg: Distortion | None = None
+        self._backprojector = DepthBackprojector()
         try:
             self._intrinsics_cfg = self._load_intrinsics(self.config_path)
         except Exception as exc:
             self._intrinsics_error = exc
-        if self.data_dir.is_file():
+        try:
+            self._distortion_cfg = self._load_distortion(self.config_path)
+        except Exception:
+            self._distortion_cfg = None
+        if self._session is None and self.data_dir.is_file():
             self._single_frame = self._load_npz(self.data_dir)
+        elif self.prefetch:
+            self._pool = ThreadPoolExecutor(max(1, int(workers)), thread_name_prefix="replay")
+            self._fill()
+
+    def __iter__(self) -> ReplaySource:
+        return self
+
+    def __next__(self) -> PointCloud:
+        return self.read()
 
     def read(self) -> PointCloud:
         if self._single_frame is not None:
@@ -48,25 +137,84 @@ class ReplaySource:
                 raise StopIteration("No more depth frames to replay")
             self._single_frame_used = True
             return self._single_frame
-        if self._index >= len(self._paths):
-            if self.loop:
-                self._index = 0
-            else:
+        if self._pool is not None:
+            if not self._pending:
                 raise StopIteration("No more depth frames to replay")
+            frame = self._pending.popleft().result()
+            self._fill()
+            return frame
+        path = self._advance()
+        if path is None:
+            raise StopIteration("No more depth frames to replay")
+        return self._decode(path)
+
+    def close(self) -> None:
+        """Stop the prefetch threads and unmap a session; frames already read stay valid."""
+        if self._pool is not None:
+            for future in self._pending:
+                future.cancel()
+            self._pending.clear()
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._session is not None:
+            self._session.close()
+
+    def _advance(self) -> Path | int | None:
+        if self._index >= len(self._paths):
+            if not self.loop:
+                return None
+            self._index = 0
         path = self._paths[self._index]
         self._index += 1
-        return self._load_npz(path)
+        return path
+
+    def _fill(self) -> None:
+        while len(self._pending) < self.prefetch:
+            path = self._advance()
+            if path is None:
+                return
+            self._pending.append(self._pool.submit(self._decode, path))
+
+    def _decode(self, item: Path | int) -> PointCloud:
+        if self.cache is None:
+            return self._load(item)
+        frame = self.cache.get(item)
+        if frame is None:
+            frame = self._load(item)
+            self.cache.put(item, frame)
+        return frame
+
+    def _load(self, item: Path | int) -> PointCloud:
+        if self._session is not None:
+            return self._load_session_frame(item)
+        return self._load_npz(item)
+
+    def _load_session_frame(self, index: int) -> PointCloud:
+        rec = self._session.frame(index)
+        intrinsics = rec.intrinsics or self._intrinsics_from_config_checked(rec.width, rec.height)
+        if rec.kind == KIND_DEPTH:
+            # Recorded distortion wins over config.yaml, as for .npz files.
+            return self._make_frame(None, rec.data, intrinsics, rec.depth_scale, rec.timestamp_ns, rec.distortion)
+        return self._make_frame(rec.data, None, intrinsics, rec.depth_scale, rec.timestamp_ns)
 
     def _load_npz(self, path: Path) -> PointCloud:
         with np.load(path) as data:
-            if "points" not in data:
-                raise KeyError(f"Missing 'points' in {path!s}. Expected point cloud .npz format.")
-
-            points = data["points"]
-            if points.ndim != 2 or points.shape[1] != 3:
-                raise ValueError(f"points must be Nx3, got shape {points.shape} in {path!s}")
-            if points.dtype != np.float32:
-                points = points.astype(np.float32, copy=False)
+            depth = None
+            if "points" in data:
+                points = data["points"]
+                if points.ndim != 2 or points.shape[1] != 3:
+                    raise ValueError(f"points must be Nx3, got shape {points.shape} in {path!s}")
+                if points.dtype != np.float32:
+                    points = points.astype(np.float32, copy=False)
+            elif DEPTH_KEY in data:
+                depth = data[DEPTH_KEY]
+                if depth.ndim != 2:
+                    raise ValueError(f"{DEPTH_KEY} must be HxW, got shape {depth.shape} in {path!s}")
+            else:
+                raise KeyError(
+                    f"Missing 'points' or '{DEPTH_KEY}' in {path!s}. "
+                    "Expected point cloud or depth image .npz format."
+                )
 
             width = int(data["width"]) if "width" in data else None
             height = int(data["height"]) if "height" in data else None
@@ -74,27 +222,47 @@ class ReplaySource:
                 width = int(data["intr_width"])
             if height is None and "intr_height" in data:
                 height = int(data["intr_height"])
+            if depth is not None and (width is None or height is None):
+                height, width = depth.shape
             if width is None or height is None:
                 raise KeyError(f"Missing width/height metadata in {path!s}")
 
             depth_scale = float(data["depth_scale"]) if "depth_scale" in data else 1.0
             intrinsics = self._intrinsics_from_file_or_config(data, width, height)
             timestamp_ns = int(data["timestamp_ns"]) if "timestamp_ns" in data else None
+            distortion = self._distortion_from_file_or_config(data)
+
+        return self._make_frame(
+            points if depth is None else None, depth, intrinsics, depth_scale, timestamp_ns, distortion
+        )
+
+    def _make_frame(
+        self,
+        points: np.ndarray | None,
+        depth: np.ndarray | None,
+        intrinsics: Intrinsics,
+        depth_scale: float,
+        timestamp_ns: int | None,
+        distortion: Distortion | None = None,
+    ) -> PointCloud:
+        if depth is not None:
+            points = self._backprojector.backproject(
+                depth,
+                intrinsics,
+                depth_scale=depth_scale,
+                organized=True,
+                distortion=distortion or self._distortion_cfg,
+            )
 
-        points_o3d = self._convert_to_o3d_point_cloud(points)
         return PointCloud(
-            points=points_o3d,
+            # float32 as stored (session frames stay memmap views); backends convert where they need float64.
+            points=points,
             intrinsics=intrinsics,
             depth_scale=depth_scale,
             timestamp_ns=timestamp_ns,
+            depth=depth,
         )
 
-    @staticmethod
-    def _convert_to_o3d_point_cloud(points: np.ndarray) -> o3d.geometry.PointCloud:
-        pcd = o3d.geometry.PointCloud()
-        pcd.points = o3d.utility.Vector3dVector(points)
-        return pcd
-
     @staticmethod
     def _load_intrinsics(config_path: Path) -> dict[str, float]:
         try:
@@ -118,6 +286,24 @@ class ReplaySource:
             raise KeyError(f"Missing intrinsics keys in {config_path!s}: {', '.join(missing)}")
         return {k: float(intr[k]) for k in ("fx", "fy", "cx", "cy", "width", "height") if k in intr}
 
+    @staticmethod
+    def _load_distortion(config_path: Path) -> Distortion | None:
+        import yaml
+
+        with config_path.open("r", encoding="utf-8") as f:
+            cfg = yaml.safe_load(f) or {}
+
+        dist = (cfg.get("acquisition") or {}).get("distortion") or {}
+        if not dist:
+            return None
+        return Distortion(**{k: float(dist[k]) for k in (f.name for f in fields(Distortion)) if k in dist})
+
+    def _distortion_from_file_or_config(self, data: np.lib.npyio.NpzFile) -> Distortion | None:
+        names = [f.name for f in fields(Distortion)]
+        if not any(k in data for k in names):
+            return self._distortion_cfg
+        return Distortion(**{k: float(data[k]) for k in names if k in data})
+
     def _intrinsics_from_file_or_config(
         self,
         data: np.lib.npyio.NpzFile,
@@ -136,6 +322,9 @@ class ReplaySource:
                 height=intr_h,
             )
 
+        return self._intrinsics_from_config_checked(width, height)
+
+    def _intrinsics_from_config_checked(self, width: int, height: int) -> Intrinsics:
         if self._intrinsics_cfg is None:
             if self._intrinsics_error is not None:
                 raise self._intrinsics_error
@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+import numpy as np
+
+from src.app_types import Distortion, Intrinsics
+
+SESSION_SUFFIX = ".session"
+INDEX_SUFFIX = ".idx"
+FILE_MAGIC = b"MSESSION"
+FILE_VERSION = 2  # 2: per-frame distortion in the record header
+RECORD_MAGIC = 0x304D5246  # "FRM0"
+ALIGN = 64
+
+KIND_POINTS = 0  # (N, 3) float32 camera-frame points
+KIND_DEPTH = 1   # (H, W) uint16 depth image
+
+_FILE_HEADER = np.dtype([("magic", "S8"), ("version", "<u4"), ("reserved", "<u4")])
+_RECORD_V1 = [
+    ("magic", "<u4"),
+    ("kind", "<u4"),
+    ("width", "<u4"),
+    ("height", "<u4"),
+    ("count", "<u8"),          # points for KIND_POINTS, pixels for KIND_DEPTH
+    ("nbytes", "<u8"),         # payload size
+    ("timestamp_ns", "<i8"),   # -1 when unknown
+    ("depth_scale", "<f8"),
+    ("has_intrinsics", "<u4"),
+    ("intr_width", "<u4"),
+    ("intr_height", "<u4"),
+    ("reserved", "<u4"),
+    ("fx", "<f8"),
+    ("fy", "<f8"),
+    ("cx", "<f8"),
+    ("cy", "<f8"),
+]
+_DISTORTION_NAMES = tuple(f.name for f in fields(Distortion))
+_RECORD = np.dtype(
+    _RECORD_V1
+    + [("has_distortion", "<u4"), ("reserved2", "<u4")]
+    + [(name, "<f8") for name in _DISTORTION_NAMES]
+)
+_RECORD_DTYPES = {1: np.dtype(_RECORD_V1), 2: _RECORD}
+# Sidecar frame index: the byte offset of every record header, appended with the record.
+_INDEX = np.dtype("<u8")
+_PAYLOAD_DTYPES = {KIND_POINTS: np.dtype("<f4"), KIND_DEPTH: np.dtype("<u2")}
+
+
+def _padding(offset: int) -> int:
+    return -offset % ALIGN
+
+
+def _data_start() -> int:
+    return _FILE_HEADER.itemsize + _padding(_FILE_HEADER.itemsize)
+
+
+def index_path(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+@dataclass(frozen=True, slots=True)
+class SessionFrame:
+    """One recorded frame; ``data`` is a read-only view into the mapped file."""
+    kind: int
+    data: np.ndarray
+    width: int
+    height: int
+    depth_scale: float
+    timestamp_ns: int | None
+    intrinsics: Intrinsics | None
+    distortion: Distortion | None = None
+
+
+class SessionWriter:
+    """
+    Appends frames to a session file.
+
+    Layout: a 16-byte file header, then per frame a fixed-size record header
+    followed by the raw payload, both padded to 64 bytes so every payload can
+    be mapped as an aligned array. The offset of every record also goes to a
+    sidecar ``<name>.session.idx`` so readers need not walk the file. Nothing
+    is rewritten after it is appended, so a session cut short by a crash still
+    reads up to its last full frame; appending to it first truncates the cut
+    frame away, so new frames stay reachable.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size > 0:
+            version = _check_file_header(self.path)
+            if version != FILE_VERSION:
+                raise ValueError(
+                    f"Cannot append to session version {version} in {self.path!s}; "
+                    f"convert it to version {FILE_VERSION} first"
+                )
+            offsets, end = _locate_records(self.path, version)
+            self._file = self.path.open("r+b")
+            self._file.truncate(end)
+            self._file.seek(end)
+            self._index = index_path(self.path).open("wb")
+            self._index.write(np.asarray(offsets, dtype=_INDEX).tobytes())
+        else:
+            self._file = self.path.open("wb")
+            header = np.zeros((), dtype=_FILE_HEADER)
+            header["magic"] = FILE_MAGIC
+            header["version"] = FILE_VERSION
+            self._file.write(header.tobytes())
+            self._file.write(b"\0" * _padding(_FILE_HEADER.itemsize))
+            self._index = index_path(self.path).open("wb")
+        self.frames = 0
+
+    def __enter__(self) -> SessionWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def append_points(
+        self,
+        points: np.ndarray,
+        width: int,
+        height: int,
+        depth_scale: float = 1.0,
+        intrinsics: Intrinsics | None = None,
+        timestamp_ns: int | None = None,
+        distortion: Distortion | None = None,
+    ) -> None:
+        points = np.ascontiguousarray(points, dtype=np.float32)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError(f"points must be Nx3, got shape {points.shape}")
+        self._append(
+            KIND_POINTS, points, width, height, points.shape[0], depth_scale, intrinsics, timestamp_ns, distortion
+        )
+
+    def append_depth(
+        self,
+        depth: np.ndarray,
+        depth_scale: float = 1.0,
+        intrinsics: Intrinsics | None = None,
+        timestamp_ns: int | None = None,
+        distortion: Distortion | None = None,
+    ) -> None:
+        depth = np.ascontiguousarray(depth, dtype=np.uint16)
+        if depth.ndim != 2:
+            raise ValueError(f"depth must be HxW, got shape {depth.shape}")
+        height, width = depth.shape
+        self._append(KIND_DEPTH, depth, width, height, depth.size, depth_scale, intrinsics, timestamp_ns, distortion)
+
+    def _append(self, kind, payload, width, height, count, depth_scale, intrinsics, timestamp_ns, distortion) -> None:
+        offset = self._file.tell()
+        rec = np.zeros((), dtype=_RECORD)
+        rec["magic"] = RECORD_MAGIC
+        rec["kind"] = kind
+        rec["width"] = width
+        rec["height"] = height
+        rec["count"] = count
+        rec["nbytes"] = payload.nbytes
+        rec["timestamp_ns"] = -1 if timestamp_ns is None else timestamp_ns
+        rec["depth_scale"] = depth_scale
+        if intrinsics is not None:
+            rec["has_intrinsics"] = 1
+            rec["intr_width"] = intrinsics.width
+            rec["intr_height"] = intrinsics.height
+            rec["fx"], rec["fy"] = intrinsics.fx, intrinsics.fy
+            rec["cx"], rec["cy"] = intrinsics.cx, intrinsics.cy
+        if distortion is not None:
+            rec["has_distortion"] = 1
+            for name in _DISTORTION_NAMES:
+                rec[name] = getattr(distortion, name)
+        self._file.write(rec.tobytes())
+        self._file.write(b"\0" * _padding(_RECORD.itemsize))
+        self._file.write(payload.tobytes())
+        self._file.write(b"\0" * _padding(payload.nbytes))
+        # After the record: an index entry never points past what was written.
+        self._index.write(np.uint64(offset).tobytes())
+        self.frames += 1
+
+    def flush(self) -> None:
+        self._file.flush()
+        self._index.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        if not self._index.closed:
+            self._index.close()
+
+
+class SessionReader:
+    """
+    Random-access reader over a session file mapped with `np.memmap`.
+
+    Opening loads the sidecar frame index and walks only the records it does
+    not cover (all of them for a session without one); record headers are
+    read when their frame is, and payloads are returned as views into the
+    mapping, so only the pages a frame touches are read from disk.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        version = _check_file_header(self.path)
+        self._record = _RECORD_DTYPES[version]
+        self._map = np.memmap(self.path, dtype=np.uint8, mode="r")
+        self._offsets, _ = _locate_records(self.path, version, self._map)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def frame(self, index: int) -> SessionFrame:
+        pos = self._offsets[index]
+        rec = _read_record(self._map, pos, self._record, self.path)
+        start = pos + _header_size(self._record)
+        kind = int(rec["kind"])
+        data = self._map[start:start + int(rec["nbytes"])].view(_PAYLOAD_DTYPES[kind])
+        width, height = int(rec["width"]), int(rec["height"])
+        data = data.reshape((-1, 3) if kind == KIND_POINTS else (height, width))
+        intrinsics = None
+        if rec["has_intrinsics"]:
+            intrinsics = Intrinsics(
+                fx=float(rec["fx"]),
+                fy=float(rec["fy"]),
+                cx=float(rec["cx"]),
+                cy=float(rec["cy"]),
+                width=int(rec["intr_width"]),
+                height=int(rec["intr_height"]),
+            )
+        distortion = None
+        if "has_distortion" in rec.dtype.names and rec["has_distortion"]:
+            distortion = Distortion(**{name: float(rec[name]) for name in _DISTORTION_NAMES})
+        ts = int(rec["timestamp_ns"])
+        return SessionFrame(
+            kind=kind,
+            data=data,
+            width=width,
+            height=height,
+            depth_scale=float(rec["depth_scale"]),
+            timestamp_ns=None if ts < 0 else ts,
+            intrinsics=intrinsics,
+            distortion=distortion,
+        )
+
+    def close(self) -> None:
+        # Frames still referencing the mapping keep it alive until they are dropped.
+        self._map = None
+        self._offsets = []
+
+
+def _header_size(record: np.dtype) -> int:
+    return record.itemsize + _padding(record.itemsize)
+
+
+def _read_record(mm: np.ndarray, pos: int, record: np.dtype, path: Path) -> np.void:
+    rec = mm[pos:pos + record.itemsize].view(record)[0]
+    if rec["magic"] != RECORD_MAGIC:
+        raise ValueError(f"Corrupt session record at byte {pos} in {path!s}")
+    return rec
+
+
+def _locate_records(path: Path, version: int, mm: np.ndarray | None = None) -> tuple[list[int], int]:
+    """
+    Header offsets of the complete records and the byte where the last one ends.
+
+    Offsets come from the sidecar index up to its last record that is complete
+    in the file; a missing or short index (a crash between the record and its
+    entry, a version 1 session) is completed by walking the remaining records.
+    """
+    if mm is None:
+        mm = np.memmap(path, dtype=np.uint8, mode="r")
+    record = _RECORD_DTYPES[version]
+    size = mm.size
+    offsets: list[int] = []
+    pos = _data_start()
+    idx = index_path(path)
+    if idx.is_file():
+        raw = idx.read_bytes()
+        indexed = np.frombuffer(raw, dtype=_INDEX, count=len(raw) // _INDEX.itemsize).astype(np.int64)
+        # An index of another file (or none at all) does not start at the first record.
+        if indexed.size and indexed[0] == pos and (np.diff(indexed) > 0).all():
+            # Entries whose header or payload runs past the end were cut short.
+            n = int(np.searchsorted(indexed, size - _header_size(record), side="right"))
+            while n:
+                last = int(indexed[n - 1])
+                if mm[last:last + record.itemsize].view(record)[0]["magic"] != RECORD_MAGIC:
+                    n = 0  # stale index; walk the whole file instead
+                    break
+                end = _record_end(mm, last, record, path)
+                if end <= size:
+                    offsets = indexed[:n].tolist()
+                    pos = end
+                    break
+                n -= 1
+    while pos + _header_size(record) <= size:
+        end = _record_end(mm, pos, record, path)
+        if end > size:
+            break  # last frame was cut short
+        offsets.append(pos)
+        pos = end
+    return offsets, pos
+
+
+def _record_end(mm: np.ndarray, pos: int, record: np.dtype, path: Path) -> int:
+    nbytes = int(_read_record(mm, pos, record, path)["nbytes"])
+    return pos + _header_size(record) + nbytes + _padding(nbytes)
+
+
+def _check_file_header(path: Path) -> int:
+    with path.open("rb") as f:
+        raw = f.read(_FILE_HEADER.itemsize)
+    if len(raw) < _FILE_HEADER.itemsize:
+        raise ValueError(f"Not a session file: {path!s}")
+    header = np.frombuffer(raw, dtype=_FILE_HEADER)[0]
+    if header["magic"] != FILE_MAGIC:
+        raise ValueError(f"Not a session file: {path!s}")
+    version = int(header["version"])
+    if version not in _RECORD_DTYPES:
+        raise ValueError(f"Unsupported session version {version} in {path!s}")
+    return version
+
+
+def is_session(path: str | Path) -> bool:
+    path = Path(path)
+    return path.is_file() and path.suffix == SESSION_SUFFIX
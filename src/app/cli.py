@@ -1,5 +1,6 @@
 import argparse
 
+from src.core.backend import BACKENDS
 from src.core.pipeline import Pipeline
 from src.config import DimsAlgoConfig
 
@@ -8,21 +9,45 @@ def main():
     parser.add_argument("--replay", action="store_true", help="Replay depth frames from .npz files")
     parser.add_argument("--data-dir", default="data", help="Directory with .npz files for replay")
     parser.add_argument("--config", default="configs/config.yaml", help="Config with camera intrinsics")
+    parser.add_argument("--prefetch", type=int, default=2, help="Replay files decoded ahead on background threads")
+    parser.add_argument("--backend", choices=tuple(BACKENDS), default=None, help="Point-cloud backend (default: config)")
+    parser.add_argument("--profile", action="store_true", help="Print per-stage timings and point counts")
+    parser.add_argument("--trace", default=None, help="Write a Chrome-trace/JSON profile to this path on exit")
     args = parser.parse_args()
 
     if args.replay:
         from src.acquisition.replay import ReplaySource
-        src = ReplaySource(data_dir=args.data_dir, config_path=args.config, loop=False)
+        src = ReplaySource(
+            data_dir=args.data_dir, config_path=args.config, loop=False, prefetch=args.prefetch
+        )
     else:
         from src.acquisition.orbbec import OrbbecSource
         src = OrbbecSource()
-    pipe = Pipeline(DimsAlgoConfig())
+    cfg = DimsAlgoConfig()
+    if args.backend is not None:
+        cfg.backend = args.backend
+    pipe = Pipeline(cfg)
+    profiler = pipe.enable_profiling(args.profile or args.trace is not None)
 
-    while True:
-        frame = src.read()
-        res, _ = pipe.process(frame)
+    try:
+        while True:
+            try:
+                frame = src.read()
+            except StopIteration:
+                break
+            res = pipe.measure(frame)
 
-        print(f'Length: {res.length}, Width: {res.width}, Height: {res.height}')
+            print(f'Length: {res.length}, Width: {res.width}, Height: {res.height}')
+            if args.profile:
+                print(f'  {profiler.last.format()}')
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if hasattr(src, "close"):
+            src.close()
+        if args.trace is not None:
+            path = profiler.export(args.trace)
+            print(f'Trace saved: {path}')
 
 if __name__ == "__main__":
     main()
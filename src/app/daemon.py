@@ -0,0 +1,272 @@
+"""
+Resident measurement service on a Unix domain socket.
+
+    python -m src.app.daemon serve --socket /tmp/measurmentify.sock
+    python -m src.app.daemon serve --replay data            # no camera
+    python -m src.app.daemon measure --socket /tmp/measurmentify.sock
+
+The pipeline and the frame source stay warm between requests. The protocol
+is one JSON object per line in each direction:
+
+    -> {"id": 7, "op": "measure"}
+    <- {"id": 7, "ok": true, "dims": {"length": ..., "width": ..., "height": ...,
+        "units": "mm", "bbox_type": "obb"}, "frame": 12, "coalesced": 3,
+        "timing": {"queue_ms": ..., "read_ms": ..., "process_ms": ..., "total_ms": ...,
+        "stages_ms": {...}}}
+
+``op`` is "measure", "ping" or "stats". Measure requests that are waiting
+when a frame is captured are all answered from that one frame.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict
+from pathlib import Path
+
+from src.config import DimsAlgoConfig
+from src.core.backend import BACKENDS
+from src.core.pipeline import Pipeline
+
+DEFAULT_SOCKET = "/tmp/measurmentify.sock"
+
+
+class MeasureService:
+    """
+    Owns the source and the pipeline on one measurement thread.
+
+    `submit` queues a request and returns a Future. The thread takes every
+    pending request as one batch, reads one new frame, measures it once and
+    resolves the whole batch with the same result, so concurrent callers
+    coalesce onto shared frames instead of queueing a frame each.
+    """
+
+    def __init__(self, source, pipeline: Pipeline) -> None:
+        self._source = source
+        self._pipeline = pipeline
+        self._profiler = pipeline.enable_profiling(True, history=1)
+        self._pending: list[tuple[float, Future]] = []
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: threading.Thread | None = None
+        self.frames = 0
+        self.requests = 0
+        self.started = time.time()
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="measure", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        close = getattr(self._source, "close", None)
+        if close is not None:
+            close()
+
+    def submit(self) -> Future:
+        future: Future = Future()
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("service is stopping")
+            self._pending.append((time.perf_counter(), future))
+            self.requests += 1
+            self._cond.notify()
+        return future
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "frames": self.frames,
+            "requests": self.requests,
+            "uptime_s": round(time.time() - self.started, 1),
+        }
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._running:
+                    batch, self._pending = self._pending, []
+                    for _, future in batch:
+                        future.set_exception(RuntimeError("service stopped"))
+                    return
+                batch, self._pending = self._pending, []
+            try:
+                reply = self._measure_once(batch)
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for queued_at, future in batch:
+                future.set_result(reply(queued_at))
+
+    def _measure_once(self, batch: list[tuple[float, Future]]):
+        t0 = time.perf_counter()
+        frame = self._source.read()
+        t1 = time.perf_counter()
+        dims = self._pipeline.measure(frame)
+        t2 = time.perf_counter()
+        self.frames += 1
+        profile = self._profiler.last
+        stages = {name: round(ms, 3) for name, ms in profile.stage_ms().items()} if profile else {}
+        body = {
+            "dims": {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in asdict(dims).items()},
+            "frame": self.frames,
+            "frame_ts_ns": frame.timestamp_ns,
+            "coalesced": len(batch),
+        }
+
+        def reply(queued_at: float) -> dict[str, object]:
+            return {
+                "ok": True,
+                **body,
+                "timing": {
+                    "queue_ms": round((t0 - queued_at) * 1e3, 3),
+                    "read_ms": round((t1 - t0) * 1e3, 3),
+                    "process_ms": round((t2 - t1) * 1e3, 3),
+                    "total_ms": round((t2 - queued_at) * 1e3, 3),
+                    "stages_ms": stages,
+                },
+            }
+
+        return reply
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        service: MeasureService = self.server.service
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            request: dict = {}
+            try:
+                request = json.loads(line)
+                response = self._dispatch(service, request)
+            except Exception as exc:
+                response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            if isinstance(request, dict) and "id" in request:
+                response = {"id": request["id"], **response}
+            self.wfile.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+            self.wfile.flush()
+
+    @staticmethod
+    def _dispatch(service: MeasureService, request: dict) -> dict[str, object]:
+        op = request.get("op", "measure")
+        if op == "measure":
+            return service.submit().result(timeout=request.get("timeout"))
+        if op == "ping":
+            return {"ok": True}
+        if op == "stats":
+            return {"ok": True, **service.stats()}
+        raise ValueError(f"unknown op {op!r}")
+
+
+class MeasureServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str | Path, service: MeasureService) -> None:
+        self.service = service
+        path = Path(path)
+        if path.exists():
+            # A socket left over from a killed daemon; refuse to take over a live one.
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(path))
+            except OSError:
+                path.unlink()
+            else:
+                raise RuntimeError(f"another daemon is listening on {path!s}")
+            finally:
+                probe.close()
+        super().__init__(str(path), _Handler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def request(path: str | Path, payload: dict, timeout: float | None = 30.0) -> dict:
+    """Send one request to a running daemon and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(path))
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("daemon closed the connection")
+    return json.loads(line)
+
+
+def _open_source(args):
+    if args.replay is not None:
+        from src.acquisition.replay import ReplaySource
+        return ReplaySource(data_dir=args.replay, config_path=args.config, loop=True, prefetch=2, cache_mb=512)
+    from src.acquisition.orbbec import OrbbecSource
+    return OrbbecSource()
+
+
+def serve(args) -> int:
+    cfg = DimsAlgoConfig()
+    if args.backend is not None:
+        cfg.backend = args.backend
+    service = MeasureService(_open_source(args), Pipeline(cfg))
+    server = MeasureServer(args.socket, service)
+    service.start()
+    # serve_forever blocks this thread, so shutdown() has to come from another one.
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    print(f"listening on {args.socket}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+    return 0
+
+
+def measure(args) -> int:
+    response = request(args.socket, {"op": args.op})
+    print(json.dumps(response, indent=2))
+    return 0 if response.get("ok") else 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="Run the measurement daemon")
+    p_serve.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    p_serve.add_argument("--replay", default=None, help="Serve from .npz/.session recordings instead of the camera")
+    p_serve.add_argument("--config", default="configs/config.yaml", help="Config with camera intrinsics")
+    p_serve.add_argument("--backend", choices=tuple(BACKENDS), default=None, help="Point-cloud backend (default: config)")
+    p_serve.set_defaults(func=serve)
+
+    p_measure = sub.add_parser("measure", help="Send one request to a running daemon")
+    p_measure.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    p_measure.add_argument("--op", default="measure", choices=("measure", "ping", "stats"))
+    p_measure.set_defaults(func=measure)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Literal
+from typing import TYPE_CHECKING, Optional, Literal
 import numpy as np
 from numpy.typing import NDArray
-import open3d as o3d
+
+if TYPE_CHECKING:
+    import open3d as o3d
 
 @dataclass(frozen=True, slots=True)
 class Intrinsics:
@@ -15,12 +17,24 @@ class Intrinsics:
     width: int
     height: int
 
+@dataclass(frozen=True, slots=True)
+class Distortion:
+    k1: float = 0.0
+    k2: float = 0.0
+    k3: float = 0.0
+    k4: float = 0.0
+    k5: float = 0.0
+    k6: float = 0.0
+    p1: float = 0.0
+    p2: float = 0.0
+
 @dataclass(frozen=True, slots=True)
 class PointCloud:
-    points: o3d.utility.Vector3dVector
+    points: NDArray[np.floating] | o3d.utility.Vector3dVector | o3d.geometry.PointCloud
     intrinsics: Intrinsics
     depth_scale: float
     timestamp_ns: Optional[int] = None
+    depth: Optional[NDArray[np.uint16]] = None   # raw (H, W) depth when the points were backprojected from it
 
 @dataclass(frozen=True, slots=True)
 class DimsResult:
@@ -28,4 +42,4 @@ class DimsResult:
     width: float
     height: float
     units: Literal["m","mm", "cms"] = "mm"
-    bbox_type: Literal["aabb", "obb", "plane"] = "obb"
\ No newline at end of file
+    bbox_type: Literal["aabb", "obb", "min_rect", "plane"] = "obb"
\ No newline at end of file
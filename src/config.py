@@ -2,15 +2,27 @@ from dataclasses import dataclass
 
 @dataclass
 class DimsAlgoConfig:
+    # --- backend ---
+    backend: str = "open3d"        # "open3d", "open3d_tensor" (open3d.t, float32, DLPack) или "numpy" (NumPy + SciPy, без Open3D)
+
     # --- point cloud preprocessing ---
     voxel_size: float = 1          # 5 мм
     nb_neighbors: int = 50
     std_ratio: float = 2.0
+    organized: bool = False        # обработка на сетке (H, W) вместо voxel + KD-tree
+
+    # --- outlier removal ---
+    outlier_scope: str = "object"      # "object" (только кандидаты над плоскостью) или "scene" (весь ROI до RANSAC)
+    outlier_method: str = "statistical"  # "statistical" (nb_neighbors, std_ratio), "radius", "voxel" или "none"
+    outlier_radius: float = 5.0        # мм: радиус поиска ("radius") или ребро вокселя ("voxel")
+    outlier_min_points: int = 5        # минимум соседей в радиусе / точек в вокселе
 
     # --- plane (table) ---
+    plane_engine: str = "open3d"     # "open3d" (segment_plane бэкенда) или "numpy" (пакетный RANSAC)
     plane_dist_thresh: float = 5.0   # 4 мм: допуск точек к плоскости
-    ransac_n: int = 20
+    ransac_n: int = 20               # точек на гипотезу (>3 — плоскость МНК), оба движка
     ransac_iters: int = 1000
+    ransac_seed: int = 0             # зерно RANSAC: одинаковый кадр -> одинаковая плоскость; -1 — случайное
     plane_max_tilt_deg: float = 15.0
     plane_min_inliers: int = 150
     plane_min_inlier_ratio: float = 0.03
@@ -29,12 +41,27 @@ class DimsAlgoConfig:
 
     # --- clustering ---
     use_dbscan: bool = True
+    cluster_method: str = "dbscan"   # "dbscan" (бэкенд) или "grid" (связные компоненты на сетке dbscan_eps)
     dbscan_eps: float = 25           # 1 см
     dbscan_min_points: int = 30
 
+    # --- фоновая модель пустой сцены (вместо RANSAC + DBSCAN) ---
+    bg_frames: int = 30                # кадров для обучения фона
+    bg_k_sigma: float = 3.0            # порог переднего плана в std
+    bg_min_diff: float = 5.0           # мм, минимальный порог переднего плана
+    bg_stale_ratio: float = 0.2        # доля пикселей "дальше фона" -> модель устарела
+
+    # --- накопление кадров в режиме USE (вместо усреднения L/W/H) ---
+    use_fusion: bool = False           # объединять точки кадров в воксельной хэш-сетке
+    fusion_voxel: float = 2.0          # мм, размер вокселя накопителя
+    fusion_min_hits: float = 0.5       # доля кадров, в которых воксель должен встречаться
+    fusion_margin: float = 20.0        # мм, запас вокруг объекта первого кадра (XY)
+    fusion_max_voxels: int = 200000    # ограничение памяти накопителя
+
     # --- robust extents ---
     q_low: float = 0
     q_high: float = 1
+    bbox_type: str = "obb"          # "obb" (оси PCA), "min_rect" (выпуклая оболочка + мин. прямоугольник), "aabb"
 
     # --- signed distance
     sd_thresh = 3
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import numbers
+import re
+from dataclasses import asdict
+from pathlib import Path
+
+CONFIG_PATH = Path(__file__).resolve().parent / "config.py"
+
+
+def config_values(cfg) -> dict[str, object]:
+    """`asdict` plus the unannotated class-level settings (e.g. `sd_thresh`)."""
+    values = asdict(cfg)
+    for name, value in vars(type(cfg)).items():
+        if not name.startswith("_") and name not in values and isinstance(value, (bool, int, float, str)):
+            values[name] = getattr(cfg, name)
+    return values
+
+
+def field_kind(cfg, name: str) -> str:
+    """Annotated type name of a config field; several float fields have integer defaults."""
+    annotation = type(cfg).__annotations__.get(name, type(getattr(cfg, name)))
+    return annotation if isinstance(annotation, str) else annotation.__name__
+
+
+def parse_field(cfg, name: str, text: str):
+    """Parse ``text`` for field ``name`` of ``cfg`` following its annotation."""
+    current = getattr(cfg, name)
+    if field_kind(cfg, name) == "float" and not isinstance(current, bool):
+        return float(text)
+    return parse_value(current, text)
+
+
+def parse_value(current: object, text: str):
+    """Parse ``text`` into the type of the current `DimsAlgoConfig` value."""
+    if isinstance(current, bool):
+        return text.strip().lower() in {"1", "true", "yes", "y", "on"}
+    if isinstance(current, numbers.Integral):
+        return int(float(text))
+    if isinstance(current, str):
+        return text.strip()
+    return float(text)
+
+
+def to_literal(value: object) -> str:
+    if isinstance(value, bool):
+        return "True" if value else "False"
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    if isinstance(value, numbers.Real):
+        return repr(float(value))
+    return repr(value)
+
+
+def write_config_values(values: dict[str, object], path: str | Path = CONFIG_PATH) -> None:
+    """
+    Rewrite the defaults of `DimsAlgoConfig` in ``config.py`` in place.
+    Only the value of each known field changes; annotations and inline
+    comments are kept.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"config.py not found at {path}")
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+
+    annotated_re = re.compile(r"^(\s*)(\w+)\s*:\s*([^=]+?)\s*=\s*(.+?)(\s+#.*)?$")
+    simple_re = re.compile(r"^(\s*)(\w+)\s*=\s*(.+?)(\s+#.*)?$")
+
+    in_class = False
+    class_indent = 0
+    for idx, line in enumerate(lines):
+        stripped = line.lstrip()
+        indent = len(line) - len(stripped)
+        if not in_class:
+            if stripped.startswith("class DimsAlgoConfig"):
+                in_class = True
+                class_indent = indent
+            continue
+
+        if stripped and indent <= class_indent:
+            in_class = False
+            continue
+
+        if not stripped.strip() or stripped.lstrip().startswith("#"):
+            continue
+
+        m = annotated_re.match(line)
+        if m:
+            name = m.group(2)
+            if name in values:
+                annotation = m.group(3).strip()
+                comment = m.group(5) or ""
+                new_val = to_literal(values[name])
+                new_line = f"{m.group(1)}{name}: {annotation} = {new_val}{comment}"
+                if line.endswith("\n"):
+                    new_line += "\n"
+                lines[idx] = new_line
+            continue
+
+        m = simple_re.match(line)
+        if m:
+            name = m.group(2)
+            if name in values:
+                comment = m.group(4) or ""
+                new_val = to_literal(values[name])
+                new_line = f"{m.group(1)}{name} = {new_val}{comment}"
+                if line.endswith("\n"):
+                    new_line += "\n"
+                lines[idx] = new_line
+
+    path.write_text("".join(lines), encoding="utf-8")
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import copy
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from src.config import DimsAlgoConfig
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigSnapshot:
+    """A published config version. ``cfg`` is never modified after publishing."""
+    version: int
+    cfg: DimsAlgoConfig
+
+
+class ConfigStore:
+    """
+    Copy-on-write holder of the current `DimsAlgoConfig`.
+
+    Readers take `current()` once per frame and keep using that snapshot, so
+    they never see a half-applied edit and never lock. Writers copy the
+    current config, apply their changes and publish the copy under a new
+    version with a single reference swap; the lock only orders writers.
+    """
+
+    def __init__(self, cfg: DimsAlgoConfig) -> None:
+        self._snapshot = ConfigSnapshot(0, copy.copy(cfg))
+        self._write_lock = threading.Lock()
+
+    def current(self) -> ConfigSnapshot:
+        return self._snapshot
+
+    @property
+    def cfg(self) -> DimsAlgoConfig:
+        """Current config; treat it as read-only."""
+        return self._snapshot.cfg
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def update(self, values: Mapping[str, object]) -> ConfigSnapshot:
+        """Publish a copy of the current config with ``values`` applied."""
+        with self._write_lock:
+            cfg = copy.copy(self._snapshot.cfg)
+            for name, value in values.items():
+                setattr(cfg, name, value)
+            self._snapshot = ConfigSnapshot(self._snapshot.version + 1, cfg)
+            return self._snapshot
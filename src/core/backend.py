@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import importlib
+from typing import Protocol
+
+import numpy as np
+
+# `DimsAlgoConfig.backend` values -> "module:class". Modules are imported on
+# first use, so a process that never selects "open3d" never loads Open3D.
+BACKENDS: dict[str, str] = {
+    "open3d": "src.core.backend_open3d:Open3DBackend",
+    "numpy": "src.core.backend_numpy:NumpyBackend",
+    "open3d_tensor": "src.core.backend_open3d_tensor:Open3DTensorBackend",
+}
+
+_instances: dict[str, PointBackend] = {}
+
+
+class PointBackend(Protocol):
+    """
+    The spatial-index primitives the core stages need. Everything else in
+    `Pipeline` is plain NumPy; a backend only has to provide these on
+    (N, 3) camera-frame points in millimeters. Inputs may be float32 or
+    float64, and returned arrays may be read-only.
+    """
+
+    name: str
+
+    def voxel_down_sample(self, points: np.ndarray, voxel_size: float) -> np.ndarray:
+        """Mean of the points in every occupied ``voxel_size`` voxel."""
+        ...
+
+    def statistical_outlier_mask(self, points: np.ndarray, nb_neighbors: int, std_ratio: float) -> np.ndarray:
+        """Points whose mean distance to their ``nb_neighbors`` nearest is within ``std_ratio`` std of the cloud mean."""
+        ...
+
+    def radius_outlier_mask(self, points: np.ndarray, radius: float, min_points: int) -> np.ndarray:
+        """Points with more than ``min_points`` points (themselves included) within ``radius``."""
+        ...
+
+    def segment_plane(
+        self, points: np.ndarray, dist_thresh: float, ransac_n: int, iters: int, seed: int | None = None
+    ) -> np.ndarray | None:
+        """RANSAC plane [a, b, c, d] of ``points``, or None if no plane was found; a ``seed`` makes it repeatable."""
+        ...
+
+    def cluster_dbscan(self, points: np.ndarray, eps: float, min_points: int) -> np.ndarray:
+        """DBSCAN labels per point, -1 for noise."""
+        ...
+
+
+def get_backend(name: str) -> PointBackend:
+    """Shared instance of the backend registered as ``name``."""
+    backend = _instances.get(name)
+    if backend is not None:
+        return backend
+    try:
+        module_name, class_name = BACKENDS[name].split(":")
+    except KeyError:
+        raise ValueError(f"Unknown backend {name!r}; expected one of {', '.join(BACKENDS)}") from None
+    backend = getattr(importlib.import_module(module_name), class_name)()
+    _instances[name] = backend
+    return backend
+
+
+def as_points(points: object) -> np.ndarray:
+    """(N, 3) view of `PointCloud.points`: an array, an Open3D Vector3dVector or an Open3D PointCloud."""
+    return np.asarray(getattr(points, "points", points))
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+from src.core.ransac import ransac_planes
+
+
+def voxel_down_sample(points: np.ndarray, voxel_size: float) -> np.ndarray:
+    """Mean of the points in every occupied voxel, on the same grid origin as Open3D."""
+    lo = points.min(axis=0) - voxel_size * 0.5
+    cells = np.floor((points - lo) / voxel_size).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    out = np.empty((counts.size, 3), dtype=np.float64)
+    for axis in range(3):
+        out[:, axis] = np.bincount(inverse, weights=points[:, axis], minlength=counts.size) / counts
+    return out
+
+
+def statistical_outlier_mask(points: np.ndarray, nb_neighbors: int, std_ratio: float) -> np.ndarray:
+    """
+    Open3D's rule: a point is kept when its mean distance to the
+    ``nb_neighbors`` nearest points (itself included) is below the cloud mean
+    of that distance plus ``std_ratio`` sample standard deviations.
+    """
+    dist, _ = cKDTree(points).query(points, k=nb_neighbors, workers=-1)
+    mean_dist = dist.mean(axis=1)
+    limit = mean_dist.mean() + std_ratio * mean_dist.std(ddof=1)
+    return (mean_dist > 0) & (mean_dist < limit)
+
+
+def radius_outlier_mask(points: np.ndarray, radius: float, min_points: int) -> np.ndarray:
+    """Open3D's rule: kept when more than ``min_points`` points, itself included, lie within ``radius``."""
+    counts = cKDTree(points).query_ball_point(points, radius, workers=-1, return_length=True)
+    return counts > min_points
+
+
+class NumpyBackend:
+    """NumPy + SciPy implementation of `PointBackend`; no Open3D import."""
+
+    name = "numpy"
+
+    def voxel_down_sample(self, points: np.ndarray, voxel_size: float) -> np.ndarray:
+        return voxel_down_sample(np.asarray(points, dtype=np.float64), voxel_size)
+
+    def statistical_outlier_mask(self, points: np.ndarray, nb_neighbors: int, std_ratio: float) -> np.ndarray:
+        return statistical_outlier_mask(points, nb_neighbors, std_ratio)
+
+    def radius_outlier_mask(self, points: np.ndarray, radius: float, min_points: int) -> np.ndarray:
+        return radius_outlier_mask(points, radius, min_points)
+
+    def segment_plane(
+        self, points: np.ndarray, dist_thresh: float, ransac_n: int, iters: int, seed: int | None = None
+    ) -> np.ndarray | None:
+        all_idx = np.arange(points.shape[0], dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        return ransac_planes(points, [all_idx], dist_thresh=dist_thresh, max_iters=iters, rng=rng, sample_size=ransac_n)[0]
+
+    def cluster_dbscan(self, points: np.ndarray, eps: float, min_points: int) -> np.ndarray:
+        n = points.shape[0]
+        labels = np.full(n, -1, dtype=np.int64)
+        if n == 0:
+            return labels
+        pairs = cKDTree(points).query_pairs(eps, output_type="ndarray")
+        # Neighbour counts include the point itself, as in Open3D.
+        core = np.bincount(pairs.ravel(), minlength=n) + 1 >= min_points
+        if not core.any():
+            return labels
+        core_a, core_b = core[pairs[:, 0]], core[pairs[:, 1]]
+        links = pairs[core_a & core_b]
+        graph = coo_matrix((np.ones(links.shape[0], dtype=np.bool_), (links[:, 0], links[:, 1])), shape=(n, n))
+        _, components = connected_components(graph, directed=False)
+        # Renumber the core components 0..k-1; non-core points are singleton components.
+        _, labels[core] = np.unique(components[core], return_inverse=True)
+        # A border point joins the cluster of one of its core neighbours.
+        border = pairs[core_a ^ core_b]
+        from_a = core[border[:, 0]]
+        labels[np.where(from_a, border[:, 1], border[:, 0])] = labels[np.where(from_a, border[:, 0], border[:, 1])]
+        return labels
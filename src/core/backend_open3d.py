@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import numpy as np
+import open3d as o3d
+
+
+def _cloud(points: np.ndarray) -> o3d.geometry.PointCloud:
+    # Vector3dVector copies float64 in one pass but converts float32 element by element.
+    return o3d.geometry.PointCloud(o3d.utility.Vector3dVector(np.asarray(points, dtype=np.float64)))
+
+
+def _mask(n: int, kept: list[int]) -> np.ndarray:
+    mask = np.zeros(n, dtype=np.bool_)
+    mask[np.asarray(kept, dtype=np.int64)] = True
+    return mask
+
+
+class Open3DBackend:
+    """Legacy `open3d.geometry.PointCloud` implementation of `PointBackend`."""
+
+    name = "open3d"
+
+    def voxel_down_sample(self, points: np.ndarray, voxel_size: float) -> np.ndarray:
+        return np.asarray(_cloud(points).voxel_down_sample(voxel_size).points)
+
+    def statistical_outlier_mask(self, points: np.ndarray, nb_neighbors: int, std_ratio: float) -> np.ndarray:
+        _, kept = _cloud(points).remove_statistical_outlier(nb_neighbors=nb_neighbors, std_ratio=std_ratio)
+        return _mask(points.shape[0], kept)
+
+    def radius_outlier_mask(self, points: np.ndarray, radius: float, min_points: int) -> np.ndarray:
+        _, kept = _cloud(points).remove_radius_outlier(nb_points=min_points, radius=radius)
+        return _mask(points.shape[0], kept)
+
+    def segment_plane(
+        self, points: np.ndarray, dist_thresh: float, ransac_n: int, iters: int, seed: int | None = None
+    ) -> np.ndarray | None:
+        if seed is not None:
+            # segment_plane samples from Open3D's global generator.
+            o3d.utility.random.seed(seed)
+        try:
+            plane_model, _ = _cloud(points).segment_plane(
+                distance_threshold=dist_thresh,
+                ransac_n=ransac_n,
+                num_iterations=iters,
+            )
+        except Exception:
+            return None
+        return np.asarray(plane_model, dtype=np.float64)
+
+    def cluster_dbscan(self, points: np.ndarray, eps: float, min_points: int) -> np.ndarray:
+        return np.asarray(_cloud(points).cluster_dbscan(eps=eps, min_points=min_points))
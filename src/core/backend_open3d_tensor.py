@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import numpy as np
+import open3d as o3d
+
+CPU = o3d.core.Device("CPU:0")
+
+
+def _cloud(points: np.ndarray) -> o3d.t.geometry.PointCloud:
+    """Tensor cloud over ``points`` as float32; shares the buffer when ``points`` already is writable contiguous float32."""
+    arr = np.ascontiguousarray(points, dtype=np.float32)
+    if not arr.flags.writeable:
+        # DLPack before 1.0 cannot mark a buffer read-only, so NumPy refuses to export one.
+        arr = arr.copy()
+    pcd = o3d.t.geometry.PointCloud(CPU)
+    pcd.point.positions = o3d.core.Tensor.from_dlpack(arr)
+    return pcd
+
+
+def _array(tensor: o3d.core.Tensor) -> np.ndarray:
+    # Read-only NumPy view that keeps the tensor's buffer alive.
+    return np.from_dlpack(tensor)
+
+
+class Open3DTensorBackend:
+    """
+    `open3d.t.geometry.PointCloud` implementation of `PointBackend`.
+
+    Points cross the NumPy boundary through DLPack in both directions, so
+    float32 input and the masks and labels are shared rather than copied;
+    those are read-only views of Open3D's buffers.
+    """
+
+    name = "open3d_tensor"
+
+    def voxel_down_sample(self, points: np.ndarray, voxel_size: float) -> np.ndarray:
+        # The tensor op bins from the coordinate origin, the legacy one (and the
+        # interface) from half a voxel below the cloud minimum: shift onto that grid and back.
+        pts = np.asarray(points, dtype=np.float32)
+        if pts.shape[0] == 0:
+            return np.empty((0, 3), dtype=np.float32)
+        lo = pts.min(axis=0) - np.float32(voxel_size * 0.5)
+        return _array(_cloud(pts - lo).voxel_down_sample(voxel_size).point.positions) + lo
+
+    def statistical_outlier_mask(self, points: np.ndarray, nb_neighbors: int, std_ratio: float) -> np.ndarray:
+        _, mask = _cloud(points).remove_statistical_outliers(nb_neighbors=nb_neighbors, std_ratio=std_ratio)
+        return _array(mask)
+
+    def radius_outlier_mask(self, points: np.ndarray, radius: float, min_points: int) -> np.ndarray:
+        # The tensor op keeps ``count >= nb_points``; the legacy one (and the interface) ``count > nb_points``.
+        _, mask = _cloud(points).remove_radius_outliers(nb_points=min_points + 1, search_radius=radius)
+        return _array(mask)
+
+    def segment_plane(
+        self, points: np.ndarray, dist_thresh: float, ransac_n: int, iters: int, seed: int | None = None
+    ) -> np.ndarray | None:
+        if seed is not None:
+            # segment_plane samples from Open3D's global generator.
+            o3d.utility.random.seed(seed)
+        try:
+            plane_model, _ = _cloud(points).segment_plane(
+                distance_threshold=dist_thresh,
+                ransac_n=ransac_n,
+                num_iterations=iters,
+            )
+        except Exception:
+            return None
+        return _array(plane_model).astype(np.float64)
+
+    def cluster_dbscan(self, points: np.ndarray, eps: float, min_points: int) -> np.ndarray:
+        return _array(_cloud(points).cluster_dbscan(eps=eps, min_points=min_points))
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from enum import Enum
+
+import numpy as np
+
+
+class BackgroundState(str, Enum):
+    OFF = "off"
+    LEARNING = "learning"
+    READY = "ready"
+    STALE = "stale"
+
+
+class BackgroundModel:
+    """
+    Per-pixel depth model of the empty scene for a fixed camera.
+
+    Frames are accumulated with Welford's running mean/variance per pixel, so
+    learning costs a few vectorized ops per frame. Once ``target_frames`` have
+    been seen the model is ready and foreground pixels are found by comparing
+    the current depth against the background mean in one pass.
+    """
+
+    def __init__(self, shape: tuple[int, int], target_frames: int) -> None:
+        self.shape = shape
+        self.target_frames = max(1, int(target_frames))
+        self.frames = 0
+        self.state = BackgroundState.LEARNING
+        self.plane_model: np.ndarray | None = None
+        self.stale_ratio = 0.0
+        self._count = np.zeros(shape, dtype=np.int32)
+        self._mean = np.zeros(shape, dtype=np.float64)
+        self._m2 = np.zeros(shape, dtype=np.float64)
+        self._mean_xyz = np.zeros((*shape, 3), dtype=np.float64)
+        self._std: np.ndarray | None = None
+        self._known: np.ndarray | None = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == BackgroundState.READY
+
+    def accumulate(self, grid: np.ndarray) -> None:
+        z = grid[..., 2]
+        valid = z > 0
+        self._count += valid
+        n = np.maximum(self._count, 1)
+        delta = np.where(valid, z - self._mean, 0.0)
+        self._mean += delta / n
+        self._m2 += delta * np.where(valid, z - self._mean, 0.0)
+        self._mean_xyz += np.where(valid[..., None], grid - self._mean_xyz, 0.0) / n[..., None]
+        self.frames += 1
+
+    @property
+    def learned(self) -> bool:
+        return self.frames >= self.target_frames
+
+    def known_mask(self) -> np.ndarray:
+        """Pixels that had valid depth in at least half of the learning frames."""
+        return self._count >= max(1, self.frames // 2)
+
+    def std(self) -> np.ndarray:
+        return np.sqrt(self._m2 / np.maximum(self._count - 1, 1))
+
+    def mean_points(self) -> np.ndarray:
+        """Mean background point of every known pixel, camera frame."""
+        return self._mean_xyz[self.known_mask()]
+
+    def finalize(self, plane_model: np.ndarray) -> None:
+        self._std = self.std()
+        self._known = self.known_mask()
+        self.plane_model = plane_model
+        self.state = BackgroundState.READY
+
+    def foreground_mask(self, z: np.ndarray, valid: np.ndarray, k_sigma: float, min_diff: float) -> np.ndarray:
+        """
+        Pixels closer to the camera than the background by more than
+        ``max(k_sigma * std, min_diff)``. Pixels without a learned background are
+        reported as foreground and left to the height filter.
+        """
+        tol = np.maximum(k_sigma * self._std, min_diff)
+        closer = z < (self._mean - tol)
+        return valid & (closer | ~self._known)
+
+    def update_staleness(self, z: np.ndarray, valid: np.ndarray, k_sigma: float, min_diff: float, max_ratio: float) -> bool:
+        """
+        Objects can only bring depth closer; a known background pixel that now
+        reads farther away means the camera or the table has moved. The model
+        turns stale once the share of such pixels exceeds ``max_ratio``.
+        """
+        check = valid & self._known
+        n = int(check.sum())
+        if n == 0:
+            return False
+        tol = np.maximum(k_sigma * self._std, min_diff)
+        farther = check & (z > (self._mean + tol))
+        self.stale_ratio = float(farther.sum()) / n
+        if self.stale_ratio > max_ratio:
+            self.state = BackgroundState.STALE
+            return True
+        return False
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+
+# 26-connectivity; the forward half is enough to enumerate every cell pair once.
+NEIGHBOR_OFFSETS = np.array(
+    [d for d in itertools.product((-1, 0, 1), repeat=3) if d != (0, 0, 0)],
+    dtype=np.int64,
+)
+FORWARD_OFFSETS = NEIGHBOR_OFFSETS[13:]
+
+
+def _linear_keys(points: np.ndarray, cell: float) -> tuple[np.ndarray, np.ndarray]:
+    """Cell coordinates flattened to int64 keys; a one-cell border keeps neighbor keys from wrapping."""
+    coords = np.floor((points - points.min(axis=0)) / cell).astype(np.int64) + 1
+    dims = coords.max(axis=0) + 2
+    strides = np.array([dims[1] * dims[2], dims[2], 1], dtype=np.int64)
+    return coords @ strides, strides
+
+
+def _lookup(cell_keys: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Index of each key in the sorted ``cell_keys`` or -1."""
+    pos = np.searchsorted(cell_keys, keys)
+    pos = np.minimum(pos, cell_keys.size - 1)
+    return np.where(cell_keys[pos] == keys, pos, -1)
+
+
+def _propagate_min_labels(n: int, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Connected components of an edge list: min-label propagation with pointer jumping."""
+    labels = np.arange(n, dtype=np.int64)
+    if u.size == 0:
+        return labels
+    while True:
+        low = np.minimum(labels[u], labels[v])
+        new = labels.copy()
+        np.minimum.at(new, u, low)
+        np.minimum.at(new, v, low)
+        new = new[new]
+        if np.array_equal(new, labels):
+            return labels
+        labels = new
+
+
+def grid_components(points: np.ndarray, cell: float, min_points: int) -> np.ndarray:
+    """
+    DBSCAN-like labels from a 3D occupancy grid with ``cell``-sized voxels.
+
+    Points within ``cell`` of each other always fall into the same or
+    adjacent voxels, so voxel adjacency stands in for the eps-neighborhood.
+    A voxel is a core voxel when its 27-neighborhood holds at least
+    ``min_points`` points; core voxels are joined into components and
+    adjacent non-core voxels attach to a neighboring core component as
+    border points. Returns one label per point, -1 for noise.
+    """
+    n = points.shape[0]
+    if n == 0 or cell <= 0:
+        return np.full(n, -1, dtype=np.int64)
+
+    keys, strides = _linear_keys(points, float(cell))
+    cell_keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    n_cells = cell_keys.size
+
+    offsets = NEIGHBOR_OFFSETS @ strides
+    neighbors = np.stack([_lookup(cell_keys, cell_keys + off) for off in offsets], axis=1)  # (C, 26)
+    found = neighbors >= 0
+    support = counts + np.where(found, counts[np.maximum(neighbors, 0)], 0).sum(axis=1)
+    core = support >= min_points
+
+    forward = neighbors[:, 13:]
+    src, k = np.nonzero((forward >= 0) & core[:, None])
+    dst = forward[src, k]
+    keep = core[dst]
+    cell_labels = _propagate_min_labels(n_cells, src[keep], dst[keep])
+    cell_labels[~core] = -1
+
+    # Border voxels join the component of any adjacent core voxel.
+    border = np.flatnonzero(~core)
+    if border.size:
+        nb = neighbors[border]
+        nb_core = (nb >= 0) & core[np.maximum(nb, 0)]
+        has_core = nb_core.any(axis=1)
+        first = nb[np.arange(border.size), nb_core.argmax(axis=1)]
+        cell_labels[border[has_core]] = cell_labels[first[has_core]]
+
+    return cell_labels[inverse]
+
+
+def largest_label(labels: np.ndarray) -> int | None:
+    """Label with the most points (ties go to the lowest label), None if all noise."""
+    valid = labels[labels >= 0]
+    if valid.size == 0:
+        return None
+    return int(np.bincount(valid).argmax())
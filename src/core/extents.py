@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def select_quantile(v: np.ndarray, q: float) -> float:
+    """
+    ``np.quantile(v, q)`` (linear interpolation) with one O(n) partition
+    instead of a sort; q = 0 / 1 reduce to min / max.
+    """
+    n = v.shape[0]
+    if q <= 0.0:
+        return float(v.min())
+    if q >= 1.0:
+        return float(v.max())
+    pos = q * (n - 1)
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, n - 1)
+    part = np.partition(v, (lo, hi))
+    frac = pos - lo
+    return float(part[lo] + (part[hi] - part[lo]) * frac)
+
+
+def _octagon_prefilter(xy: np.ndarray) -> np.ndarray:
+    """
+    Akl-Toussaint heuristic: drop points strictly inside the polygon spanned by
+    the extreme points along x, y, x+y and x-y; none of them can be on the hull.
+    """
+    x, y = xy[:, 0], xy[:, 1]
+    # Counter-clockwise: left, bottom-left, bottom, bottom-right, right, top-right, top, top-left.
+    extremes = [x.argmin(), (x + y).argmin(), y.argmin(), (x - y).argmax(),
+                x.argmax(), (x + y).argmax(), y.argmax(), (x - y).argmin()]
+    poly = xy[extremes]
+    keep = np.zeros(xy.shape[0], dtype=bool)
+    for i in range(len(poly)):
+        a = poly[i]
+        b = poly[(i + 1) % len(poly)]
+        if np.allclose(a, b):
+            continue
+        cross = (b[0] - a[0]) * (y - a[1]) - (b[1] - a[1]) * (x - a[0])
+        keep |= cross <= 0.0
+    return xy[keep]
+
+
+def convex_hull_2d(xy: np.ndarray) -> np.ndarray:
+    """Convex hull vertices (counter-clockwise) of 2D points, Andrew's monotone chain."""
+    pts = _octagon_prefilter(xy) if xy.shape[0] > 64 else xy
+    pts = pts[np.lexsort((pts[:, 1], pts[:, 0]))]
+    if pts.shape[0] > 1:
+        dup = np.all(pts[1:] == pts[:-1], axis=1)
+        pts = pts[np.concatenate(([True], ~dup))]
+    if pts.shape[0] < 3:
+        return pts
+    pts_list = pts.tolist()
+
+    def half(points: list) -> list:
+        chain: list = []
+        for p in points:
+            while len(chain) >= 2:
+                (ax, ay), (bx, by) = chain[-2], chain[-1]
+                if (bx - ax) * (p[1] - ay) - (by - ay) * (p[0] - ax) > 0:
+                    break
+                chain.pop()
+            chain.append(p)
+        return chain
+
+    lower = half(pts_list)
+    upper = half(pts_list[::-1])
+    return np.asarray(lower[:-1] + upper[:-1], dtype=np.float64)
+
+
+def min_area_rect(hull: np.ndarray) -> tuple[float, float, float]:
+    """
+    Minimum-area enclosing rectangle of a convex polygon. One side of the
+    optimal rectangle is collinear with a hull edge (the rotating-calipers
+    candidates), so every edge direction is tried at once: (E, 2) edge axes
+    against (V, 2) vertices. Returns (length, width, angle of the long side).
+    """
+    if hull.shape[0] < 3:
+        if hull.shape[0] == 2:
+            d = hull[1] - hull[0]
+            return float(np.hypot(*d)), 0.0, float(np.arctan2(d[1], d[0]))
+        return 0.0, 0.0, 0.0
+
+    edges = np.roll(hull, -1, axis=0) - hull
+    norms = np.hypot(edges[:, 0], edges[:, 1])
+    ok = norms > 1e-12
+    u = edges[ok] / norms[ok, None]
+    v = np.column_stack([-u[:, 1], u[:, 0]])
+    pu = hull @ u.T  # (V, E)
+    pv = hull @ v.T
+    extent_u = pu.max(axis=0) - pu.min(axis=0)
+    extent_v = pv.max(axis=0) - pv.min(axis=0)
+    best = int(np.argmin(extent_u * extent_v))
+    a, b = float(extent_u[best]), float(extent_v[best])
+    axis = u[best] if a >= b else v[best]
+    return max(a, b), min(a, b), float(np.arctan2(axis[1], axis[0]))
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+_KEY_BITS = 21
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+_KEY_MASK = (1 << _KEY_BITS) - 1
+
+
+def _pack_keys(cells: np.ndarray) -> np.ndarray:
+    c = (cells + _KEY_OFFSET) & _KEY_MASK
+    return (c[:, 0] << (2 * _KEY_BITS)) | (c[:, 1] << _KEY_BITS) | c[:, 2]
+
+
+@dataclass(frozen=True, slots=True)
+class PlaneLock:
+    """Table frame and object footprint fixed by the first fused frame."""
+    R: np.ndarray
+    p0: np.ndarray
+    xy_min: np.ndarray
+    xy_max: np.ndarray
+
+
+class VoxelFusion:
+    """
+    Memory-bounded voxel-hash accumulator for multi-frame point fusion.
+
+    Voxels are kept as sorted int64 keys with per-voxel point counts, coordinate
+    sums (running mean = sum / count) and the number of frames that hit the
+    voxel. Inserting a frame is a `np.unique` over its points plus a sorted
+    merge. When more than ``max_voxels`` voxels are held, the least frequently
+    hit ones are evicted. `points` returns the voxel means seen in enough
+    frames, which drops the per-frame speckle a single frame carries.
+    """
+
+    def __init__(self, voxel_size: float, max_voxels: int) -> None:
+        if voxel_size <= 0:
+            raise ValueError("voxel_size must be positive")
+        self.voxel_size = float(voxel_size)
+        self.max_voxels = max(1, int(max_voxels))
+        self.frames = 0
+        self._keys = np.empty(0, dtype=np.int64)
+        self._count = np.empty(0, dtype=np.int64)
+        self._sum = np.empty((0, 3), dtype=np.float64)
+        self._hits = np.empty(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return int(self._keys.size)
+
+    def insert(self, points: np.ndarray) -> None:
+        self.frames += 1
+        if points.shape[0] == 0:
+            return
+        cells = np.floor(points / self.voxel_size).astype(np.int64)
+        keys, inverse = np.unique(_pack_keys(cells), return_inverse=True)
+        count = np.bincount(inverse, minlength=keys.size)
+        sums = np.column_stack([
+            np.bincount(inverse, weights=points[:, i], minlength=keys.size) for i in range(3)
+        ])
+
+        pos = np.searchsorted(self._keys, keys)
+        found = pos < self._keys.size
+        found[found] = self._keys[pos[found]] == keys[found]
+        hit = pos[found]
+        self._count[hit] += count[found]
+        self._sum[hit] += sums[found]
+        self._hits[hit] += 1
+
+        new = ~found
+        if new.any():
+            self._keys = np.concatenate([self._keys, keys[new]])
+            self._count = np.concatenate([self._count, count[new]])
+            self._sum = np.concatenate([self._sum, sums[new]])
+            self._hits = np.concatenate([self._hits, np.ones(int(new.sum()), dtype=np.int32)])
+            order = np.argsort(self._keys, kind="stable")
+            self._reorder(order)
+
+        if self._keys.size > self.max_voxels:
+            # Keep the most frequently hit voxels, ties broken by point count.
+            rank = self._hits.astype(np.float64) + self._count / (self._count.max() + 1.0)
+            keep = np.sort(np.argpartition(-rank, self.max_voxels - 1)[: self.max_voxels])
+            self._reorder(keep)
+
+    def _reorder(self, idx: np.ndarray) -> None:
+        self._keys = self._keys[idx]
+        self._count = self._count[idx]
+        self._sum = self._sum[idx]
+        self._hits = self._hits[idx]
+
+    def points(self, min_hits: int = 1) -> np.ndarray:
+        """Mean point of every voxel hit in at least ``min_hits`` frames."""
+        keep = self._hits >= max(1, int(min_hits))
+        return self._sum[keep] / self._count[keep, None]
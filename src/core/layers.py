@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Collection, Iterator, Mapping
+from enum import Enum
+
+import numpy as np
+
+EMPTY_POINTS = np.empty((0, 3), dtype=np.float64)
+EMPTY_POINTS.setflags(write=False)
+
+
+class ViewLayer(str, Enum):
+    RAW = "raw"
+    DOWNSAMPLED = "downsampled"
+    TABLE = "table"
+    OBJECT = "object"
+    FILTERED = "filtered"
+
+
+class LayerViews(Mapping[ViewLayer, np.ndarray]):
+    """
+    Pipeline layers kept as (base array, selector) pairs.
+
+    The selector is a boolean mask or an index array into the base cloud, so
+    building a layer costs nothing; the Nx3 array is only gathered when a
+    consumer reads the layer, and then cached. Layers that need extra work
+    can be registered as factories, which run on first read.
+
+    ``requested`` limits which layers are kept at all (None keeps every layer,
+    an empty collection none), so headless callers skip visualization work.
+    """
+
+    def __init__(self, requested: Collection[ViewLayer] | None = None) -> None:
+        self._requested = None if requested is None else frozenset(requested)
+        self._sources: dict[ViewLayer, tuple[np.ndarray, np.ndarray | None]] = {}
+        self._factories: dict[ViewLayer, Callable[[], np.ndarray]] = {}
+        self._cache: dict[ViewLayer, np.ndarray] = {}
+
+    def wants(self, layer: ViewLayer) -> bool:
+        return self._requested is None or layer in self._requested
+
+    def set(self, layer: ViewLayer, base: np.ndarray, selector: np.ndarray | None = None) -> None:
+        if not self.wants(layer):
+            return
+        self._sources[layer] = (base, selector)
+        self._factories.pop(layer, None)
+        self._cache.pop(layer, None)
+
+    def set_lazy(self, layer: ViewLayer, factory: Callable[[], np.ndarray]) -> None:
+        if not self.wants(layer):
+            return
+        self._factories[layer] = factory
+        self._sources.pop(layer, None)
+        self._cache.pop(layer, None)
+
+    def count(self, layer: ViewLayer) -> int:
+        """Number of points in ``layer``; only factory layers are materialized for this."""
+        if layer in self._factories:
+            return int(self[layer].shape[0])
+        base, selector = self._sources[layer]
+        if selector is None:
+            return int(base.shape[0])
+        if selector.dtype == np.bool_:
+            return int(np.count_nonzero(selector))
+        return int(selector.size)
+
+    def __getitem__(self, layer: ViewLayer) -> np.ndarray:
+        cached = self._cache.get(layer)
+        if cached is not None:
+            return cached
+        factory = self._factories.get(layer)
+        if factory is not None:
+            points = factory()
+        else:
+            base, selector = self._sources[layer]
+            points = base if selector is None else base[selector]
+        self._cache[layer] = points
+        return points
+
+    def __contains__(self, layer: object) -> bool:
+        return layer in self._sources or layer in self._factories
+
+    def __iter__(self) -> Iterator[ViewLayer]:
+        yield from self._sources
+        yield from self._factories
+
+    def __len__(self) -> int:
+        return len(self._sources) + len(self._factories)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from src.app_types import Intrinsics
+
+MIN_SUPPORT_FRACTION = 0.25
+DEPTH_QUANT_MM = 2.0
+
+
+def as_grid(points: np.ndarray, intrinsics: Intrinsics) -> np.ndarray | None:
+    """Return an (H, W, 3) view of ``points`` if they still form the sensor grid."""
+    h, w = int(intrinsics.height), int(intrinsics.width)
+    if points.ndim != 2 or points.shape[1] != 3 or points.shape[0] != h * w:
+        return None
+    return points.reshape(h, w, 3)
+
+
+def block_size_for_voxel(grid: np.ndarray, valid: np.ndarray, voxel_size: float, fx: float) -> int:
+    """Pick the pixel block whose footprint at the median depth matches ``voxel_size``."""
+    if voxel_size <= 0 or fx <= 0 or not valid.any():
+        return 1
+    z_med = float(np.median(grid[..., 2][valid]))
+    pixel_pitch = z_med / fx
+    if pixel_pitch <= 0:
+        return 1
+    return max(1, int(round(voxel_size / pixel_pitch)))
+
+
+def block_decimate(grid: np.ndarray, valid: np.ndarray, block: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Average valid points inside non-overlapping ``block`` x ``block`` tiles.
+    Returns the decimated grid and its validity mask.
+    """
+    if block <= 1:
+        return grid, valid
+    h, w = valid.shape
+    hb, wb = h // block, w // block
+    g = grid[: hb * block, : wb * block].reshape(hb, block, wb, block, 3)
+    m = valid[: hb * block, : wb * block].reshape(hb, block, wb, block)
+    counts = m.sum(axis=(1, 3))
+    sums = np.where(m[..., None], g, 0.0).sum(axis=(1, 3), dtype=np.float64)
+    out = sums / np.maximum(counts, 1)[..., None]
+    return out, counts > 0
+
+
+def window_radius_for_neighbors(nb_neighbors: int) -> int:
+    """Smallest square window radius that holds at least ``nb_neighbors`` neighbours."""
+    side = math.ceil(math.sqrt(max(1, nb_neighbors) + 1))
+    return max(1, side // 2)
+
+
+def neighborhood_outlier_mask(
+    grid: np.ndarray,
+    valid: np.ndarray,
+    radius: int,
+    std_ratio: float,
+    fx: float,
+) -> np.ndarray:
+    """
+    Image-neighbourhood counterpart of ``remove_statistical_outlier``.
+
+    A neighbour in the (2r+1) x (2r+1) pixel window supports a point when their
+    depth difference fits ``std_ratio`` pixel pitches per ring of separation
+    (plus the sensor depth quantization). Points supported by fewer than
+    ``MIN_SUPPORT_FRACTION`` of their valid neighbours are rejected, which drops
+    flying pixels and speckle while keeping object silhouettes.
+
+    ``fx`` is the focal length in pixels of ``grid`` itself: for a grid
+    decimated by `block_decimate` pass ``fx / block``.
+    """
+    h, w = valid.shape
+    z = np.where(valid, grid[..., 2], np.nan).astype(np.float32)
+    pitch = z / np.float32(fx)
+    zp = np.pad(z, radius, constant_values=np.nan)
+
+    support = np.zeros((h, w), dtype=np.int16)
+    total = np.zeros((h, w), dtype=np.int16)
+    for ring in range(1, radius + 1):
+        tol = pitch * np.float32(std_ratio * ring) + np.float32(DEPTH_QUANT_MM)
+        for dv in range(-ring, ring + 1):
+            for du in range(-ring, ring + 1):
+                if max(abs(du), abs(dv)) != ring:
+                    continue
+                zn = zp[radius + dv : radius + dv + h, radius + du : radius + du + w]
+                total += ~np.isnan(zn)
+                support += np.abs(zn - z) <= tol
+
+    return valid & (support > 0) & (support >= MIN_SUPPORT_FRACTION * total)
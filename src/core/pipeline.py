@@ -1,8 +1,25 @@
+from collections.abc import Collection
+
 from src.app_types import PointCloud, DimsResult
 from src.config import DimsAlgoConfig
-import open3d as o3d
 import numpy as np
-from src.ui.app_state import ViewLayer
+from src.core.backend import PointBackend, as_points, get_backend
+from src.core.layers import EMPTY_POINTS, LayerViews, ViewLayer
+from src.core.profiling import NULL_PROFILER, NullProfiler, StageProfiler
+from src.core.ransac import ransac_planes
+from src.core.stages import StageCache
+from src.core.background import BackgroundModel, BackgroundState
+from src.core.clustering import grid_components, largest_label
+from src.core.fusion import PlaneLock, VoxelFusion
+from src.core.outliers import voxel_occupancy_mask
+from src.core.extents import convex_hull_2d, min_area_rect, select_quantile
+from src.core.organized import (
+    as_grid,
+    block_decimate,
+    block_size_for_voxel,
+    neighborhood_outlier_mask,
+    window_radius_for_neighbors,
+)
 
 PLANE_FAR_QUANTILES = (0.97, 0.94, 0.90, 0.85)
 
@@ -10,33 +27,222 @@ PLANE_FAR_QUANTILES = (0.97, 0.94, 0.90, 0.85)
 class Pipeline:
     def __init__(self, config: DimsAlgoConfig):
         self.cfg = config
+        self._background: BackgroundModel | None = None
+        self._background_request = False
+        self.profiler: StageProfiler | NullProfiler = NULL_PROFILER
+        self._stages = StageCache()
+        self._fusion: VoxelFusion | None = None
+        self._fusion_lock: PlaneLock | None = None
+        # Last frame inserted into the fusion and the indices it contributed.
+        self._fused: tuple[object, np.ndarray] | None = None
+        self._fusion_stalled = False
+
+    def enable_profiling(self, enabled: bool = True, history: int = 1000) -> StageProfiler | NullProfiler:
+        """Attach a fresh `StageProfiler` (or the no-op one) and return it."""
+        self.profiler = StageProfiler(history=history) if enabled else NULL_PROFILER
+        return self.profiler
+
+    @property
+    def recomputed(self) -> tuple[str, ...]:
+        """Stages that actually ran in the last `process` call (the rest came from the cache)."""
+        return tuple(self._stages.recomputed)
+
+    @property
+    def stage_cost_ms(self) -> float:
+        """Time the last `process` call would have taken without the stage cache."""
+        return self._stages.cost_ms
+
+    def invalidate(self) -> None:
+        """Drop the cached stage outputs; the next frame runs every stage."""
+        self._stages.clear()
+
+    @property
+    def background_state(self) -> BackgroundState:
+        if self._background is not None:
+            return self._background.state
+        if self._background_request:
+            return BackgroundState.LEARNING
+        return BackgroundState.OFF
+
+    def learn_background(self) -> None:
+        """
+        Start capturing `bg_frames` frames of the empty scene on the next
+        frames. The next frame raises `ValueError` (and the request is dropped)
+        if it is not organized.
+        """
+        self._background = None
+        self._background_request = True
 
-    def _downsample(self, o3d_points) -> o3d.geometry.PointCloud:
-        if isinstance(o3d_points, o3d.geometry.PointCloud):
-            pcd = o3d_points
-        else:
-            pcd = o3d.geometry.PointCloud(o3d_points)
-        n_points = np.asarray(pcd.points).shape[0]
-        if n_points == 0:
-            return pcd
-        if self.cfg.voxel_size > 0:
-            pcd = pcd.voxel_down_sample(self.cfg.voxel_size)
-        n_points = np.asarray(pcd.points).shape[0]
-        if n_points > self.cfg.nb_neighbors:
-            pcd, _ = pcd.remove_statistical_outlier(
-                nb_neighbors=self.cfg.nb_neighbors,
-                std_ratio=self.cfg.std_ratio
-            )
-        return pcd
+    def clear_background(self) -> None:
+        self._background = None
+        self._background_request = False
 
-    def _raw_roi_filter(self, points_xyz: np.ndarray) -> np.ndarray:
-        if points_xyz.size == 0:
-            return points_xyz
+    @property
+    def fusion_frames(self) -> int:
+        """Frames accumulated since `begin_fusion` (0 until the plane is locked)."""
+        return self._fusion.frames if self._fusion is not None else 0
+
+    @property
+    def fusion_stalled(self) -> bool:
+        """The last frame was the one already fused (frozen frame, single-file replay); no new frames will add to it."""
+        return self._fusion_stalled
+
+    def begin_fusion(self) -> None:
+        """
+        Start fusing frames into one voxel-hashed cloud. The next frame runs
+        the full pipeline and locks the table plane and the object footprint;
+        later frames only pay for ROI, transform and insertion.
+        """
+        self._fusion = VoxelFusion(self.cfg.fusion_voxel, self.cfg.fusion_max_voxels)
+        self._fusion_lock = None
+        self._fused = None
+        self._fusion_stalled = False
+
+    def cancel_fusion(self) -> None:
+        self._fusion = None
+        self._fusion_lock = None
+        self._fused = None
+        self._fusion_stalled = False
+
+    def finish_fusion(self) -> tuple[DimsResult, np.ndarray]:
+        """Dimensions of the fused cloud, computed once, and its object points (camera frame)."""
+        fusion, lock = self._fusion, self._fusion_lock
+        self.cancel_fusion()
+        if fusion is None or lock is None:
+            nan = float("nan")
+            return DimsResult(length=nan, width=nan, height=nan, bbox_type=self.cfg.bbox_type), EMPTY_POINTS
+        min_hits = int(np.ceil(self.cfg.fusion_min_hits * fusion.frames))
+        fused = fusion.points(min_hits)
+        obj = fused[self._object_extraction(fused)]
+        l, w, h = self._compute_upright_dims(obj)
+        return DimsResult(length=l, width=w, height=h, bbox_type=self.cfg.bbox_type), obj @ lock.R.T + lock.p0
+
+    def _lock_fusion(self, plane_model: np.ndarray, obj_pts_table: np.ndarray) -> None:
+        R, p0, _ = self._make_table_frame(plane_model=plane_model)
+        xy = obj_pts_table[:, :2]
+        self._fusion_lock = PlaneLock(R=R, p0=p0, xy_min=xy.min(axis=0), xy_max=xy.max(axis=0))
+
+    def _fusion_insert(self, frame: PointCloud, raw_all: np.ndarray, roi_keep: np.ndarray) -> np.ndarray:
+        """
+        Insert the frame's object-region points; returns their indices into
+        ``raw_all``. The same frame object again is not inserted twice.
+        """
+        if self._fused is not None and self._fused[0] is frame:
+            self._fusion_stalled = True
+            return self._fused[1]
+        self._fusion_stalled = False
+        lock = self._fusion_lock
+        roi_idx = np.flatnonzero(roi_keep)
+        pts = self._transform_cam_to_table(raw_all[roi_idx], lock.R, lock.p0)
+        margin = self.cfg.fusion_margin
+        keep = self._height_filter(pts)
+        keep &= np.all((pts[:, :2] >= lock.xy_min - margin) & (pts[:, :2] <= lock.xy_max + margin), axis=1)
+        self._fusion.insert(pts[keep])
+        self._fused = (frame, roi_idx[keep])
+        return self._fused[1]
+
+    @property
+    def backend(self) -> PointBackend:
+        """Backend named by ``cfg.backend``; imported the first time it is selected."""
+        return get_backend(self.cfg.backend)
+
+    def _downsample(self, points: np.ndarray) -> np.ndarray:
+        if self.cfg.voxel_size <= 0:
+            return points
+        return self.backend.voxel_down_sample(points, self.cfg.voxel_size)
+
+    def _downsample_organized(
+        self,
+        grid: np.ndarray,
+        valid: np.ndarray,
+        fx: float,
+    ) -> tuple[np.ndarray, np.ndarray, int]:
+        """
+        Same role as `_downsample`, but keeps the (H, W) sensor layout: block
+        binning replaces the voxel grid. Returns the decimated grid, its
+        validity mask and the block size. The block is the pixel footprint of
+        ``voxel_size`` at the median depth, so at the default 1 mm it is 1 and
+        nothing is decimated.
+        """
+        valid = valid & (grid[..., 2] > 0)
+        block = block_size_for_voxel(grid, valid, self.cfg.voxel_size, fx)
+        grid, valid = block_decimate(grid, valid, block)
+        return grid, valid, block
+
+    def _outlier_mask(self, points: np.ndarray) -> np.ndarray:
+        """Mask of the points ``outlier_method`` keeps."""
+        method = self.cfg.outlier_method
+        n = points.shape[0]
+        if method == "none" or n == 0 or (method == "statistical" and n <= self.cfg.nb_neighbors):
+            return np.ones(n, dtype=np.bool_)
+        if method == "statistical":
+            return self.backend.statistical_outlier_mask(points, self.cfg.nb_neighbors, self.cfg.std_ratio)
+        if method == "radius":
+            return self.backend.radius_outlier_mask(points, self.cfg.outlier_radius, self.cfg.outlier_min_points)
+        if method == "voxel":
+            return voxel_occupancy_mask(points, self.cfg.outlier_radius, self.cfg.outlier_min_points)
+        raise ValueError(f"Unknown outlier_method {method!r}")
+
+    def _scene_outliers(
+        self,
+        pts: np.ndarray,
+        decimated: tuple[np.ndarray, np.ndarray, int] | None,
+        fx: float,
+    ) -> np.ndarray:
+        """
+        Outlier removal over the whole downsampled cloud (``outlier_scope = "scene"``).
+        On the sensor grid a pixel-window support test replaces the KD-tree
+        statistical filter.
+        """
+        if decimated is not None and self.cfg.outlier_method == "statistical":
+            grid, valid, block = decimated
+            if int(valid.sum()) > self.cfg.nb_neighbors:
+                radius = window_radius_for_neighbors(self.cfg.nb_neighbors)
+                # Neighbouring cells of the decimated grid are ``block`` sensor pixels apart.
+                valid = neighborhood_outlier_mask(grid, valid, radius, self.cfg.std_ratio, fx / block)
+            return grid[valid]
+        return pts[self._outlier_mask(pts)]
+
+    def _object_outliers(
+        self,
+        pts: np.ndarray,
+        candidate_idx: np.ndarray,
+        decimated: tuple[np.ndarray, np.ndarray, int] | None,
+        fx: float,
+    ) -> np.ndarray:
+        """
+        Outlier removal over the above-plane candidates (``outlier_scope = "object"``);
+        returns the kept subset of ``candidate_idx``. On the sensor grid the
+        statistical filter is the pixel-window support test of `_scene_outliers`
+        with only the candidate pixels valid, run on their bounding box.
+        """
+        if decimated is None or self.cfg.outlier_method != "statistical":
+            return candidate_idx[self._outlier_mask(pts[candidate_idx])]
+        if candidate_idx.size <= self.cfg.nb_neighbors:
+            return candidate_idx
+        grid, valid, block = decimated
+        # ``pts`` is ``grid[valid]``, so candidates map back to pixels through the valid mask.
+        rows, cols = np.divmod(np.flatnonzero(valid)[candidate_idx], valid.shape[1])
+        r0, c0 = rows.min(), cols.min()
+        rows, cols = rows - r0, cols - c0
+        candidates = np.zeros((rows.max() + 1, cols.max() + 1), dtype=np.bool_)
+        candidates[rows, cols] = True
+        box = grid[r0 : r0 + candidates.shape[0], c0 : c0 + candidates.shape[1]]
+        radius = window_radius_for_neighbors(self.cfg.nb_neighbors)
+        keep = neighborhood_outlier_mask(box, candidates, radius, self.cfg.std_ratio, fx / block)
+        return candidate_idx[keep[rows, cols]]
+
+    def _raw_roi_mask(self, points_xyz: np.ndarray) -> np.ndarray:
         x = points_xyz[:, 0]
         y = points_xyz[:, 1]
         keep = (x > self.cfg.roi_x_min) & (x < self.cfg.roi_x_max)
         keep &= (y > self.cfg.roi_y_min) & (y < self.cfg.roi_y_max)
-        return points_xyz[keep]
+        return keep
+
+    def _raw_roi_filter(self, points_xyz: np.ndarray) -> np.ndarray:
+        if points_xyz.size == 0:
+            return points_xyz
+        return points_xyz[self._raw_roi_mask(points_xyz)]
 
     def _normalize_plane_model(self, plane_model: np.ndarray) -> tuple[np.ndarray, float]:
         a, b, c, d = plane_model
@@ -56,8 +262,8 @@ class Pipeline:
         cosang = float(np.clip(abs(np.dot(n, z_axis)), 0.0, 1.0))
         return float(np.degrees(np.arccos(cosang)))
     
-    def _table_plane_estimation(self, pcd: o3d.geometry.PointCloud) -> tuple[o3d.geometry.PointCloud, o3d.geometry.PointCloud, np.ndarray]:
-        pts_all = np.asarray(pcd.points)
+    def _table_plane_estimation(self, pts_all: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the table inlier mask over ``pts_all`` and the normalized plane model."""
         n_points = pts_all.shape[0]
         min_points = max(self.cfg.ransac_n * 3, 50)
         if n_points < min_points:
@@ -67,25 +273,14 @@ class Pipeline:
         best_strict = None
         best_relaxed = None
 
-        quantile_candidates = [None, *PLANE_FAR_QUANTILES]
-        for q in quantile_candidates:
-            if q is None:
-                candidate_idx = np.arange(n_points, dtype=np.int64)
-            else:
-                z_cut = float(np.quantile(pts_all[:, 2], q))
-                candidate_idx = np.where(pts_all[:, 2] >= z_cut)[0]
+        # One partial sort serves every far-quantile cut.
+        z_cuts = np.quantile(pts_all[:, 2], PLANE_FAR_QUANTILES)
+        candidates = [np.arange(n_points, dtype=np.int64)]
+        candidates += [np.flatnonzero(pts_all[:, 2] >= z_cut) for z_cut in z_cuts]
+        candidates = [idx for idx in candidates if idx.size >= min_points]
 
-            if candidate_idx.size < min_points:
-                continue
-
-            candidate_cloud = pcd.select_by_index(candidate_idx.tolist())
-            try:
-                plane_model_raw, _ = candidate_cloud.segment_plane(
-                    distance_threshold=self.cfg.plane_dist_thresh,
-                    ransac_n=self.cfg.ransac_n,
-                    num_iterations=self.cfg.ransac_iters,
-                )
-            except Exception:
+        for plane_model_raw in self._fit_plane_candidates(pts_all, candidates):
+            if plane_model_raw is None:
                 continue
             n, d = self._normalize_plane_model(np.asarray(plane_model_raw, dtype=np.float64))
 
@@ -94,8 +289,8 @@ class Pipeline:
                 continue
 
             sd_all = pts_all @ n + d
-            inliers_all = np.where(np.abs(sd_all) <= self.cfg.plane_dist_thresh)[0]
-            inlier_count = int(inliers_all.size)
+            inliers_all = np.abs(sd_all) <= self.cfg.plane_dist_thresh
+            inlier_count = int(np.count_nonzero(inliers_all))
             if inlier_count < min_inliers:
                 continue
 
@@ -113,34 +308,61 @@ class Pipeline:
         selected = best_strict if best_strict is not None else best_relaxed
         if selected is None:
             # Fallback to unconstrained segmentation to keep the pipeline alive.
-            plane_model_raw, inliers = pcd.segment_plane(
-                distance_threshold=self.cfg.plane_dist_thresh,
-                ransac_n=self.cfg.ransac_n,
-                num_iterations=self.cfg.ransac_iters,
-            )
+            all_idx = np.arange(n_points, dtype=np.int64)
+            plane_model_raw = self._fit_plane_candidates(pts_all, [all_idx], constrain_tilt=False)[0]
+            if plane_model_raw is None:
+                raise ValueError("Plane segmentation failed")
             n, d = self._normalize_plane_model(np.asarray(plane_model_raw, dtype=np.float64))
             plane_model = np.array([n[0], n[1], n[2], d], dtype=np.float64)
-            table_cloud = pcd.select_by_index(inliers)
-            object_cloud = pcd.select_by_index(inliers, invert=True)
-            return table_cloud, object_cloud, plane_model
+            inliers = np.abs(pts_all @ n + d) <= self.cfg.plane_dist_thresh
+            return inliers, plane_model
 
         plane_model, inliers, _, _ = selected
-        table_cloud = pcd.select_by_index(inliers.tolist())
-        object_cloud = pcd.select_by_index(inliers.tolist(), invert=True)
-        return table_cloud, object_cloud, plane_model
+        return inliers, plane_model
     
-    def _signed_distance_filter(self, plane_model: np.ndarray, object_pcd: o3d.geometry.PointCloud):
-        n, d = self._normalize_plane_model(plane_model)
-        sd_pts = np.asarray(object_pcd.points)
-        sd = sd_pts @ n + d
+    def _fit_plane_candidates(
+        self,
+        pts_all: np.ndarray,
+        candidates: list[np.ndarray],
+        constrain_tilt: bool = True,
+    ) -> list[np.ndarray | None]:
+        """
+        Fit one plane per candidate index set, ``ransac_n`` points per
+        hypothesis. The numpy engine shares sampled hypotheses between
+        candidates (adaptive stop, least-squares refit); the open3d engine runs
+        the backend's `segment_plane` per candidate. Both draw from ``ransac_seed`` (unseeded when
+        negative), so a repeated frame gets the same plane.
+        """
+        seed = self.cfg.ransac_seed if self.cfg.ransac_seed >= 0 else None
+        if self.cfg.plane_engine == "numpy":
+            return ransac_planes(
+                pts_all,
+                candidates,
+                dist_thresh=self.cfg.plane_dist_thresh,
+                max_iters=self.cfg.ransac_iters,
+                max_tilt_deg=self.cfg.plane_max_tilt_deg if constrain_tilt else None,
+                rng=np.random.default_rng(seed),
+                sample_size=self.cfg.ransac_n,
+            )
 
-        object_points = sd_pts[sd > self.cfg.sd_thresh]
+        backend = self.backend
+        return [
+            backend.segment_plane(
+                pts_all[candidate_idx],
+                dist_thresh=self.cfg.plane_dist_thresh,
+                ransac_n=self.cfg.ransac_n,
+                iters=self.cfg.ransac_iters,
+                seed=seed,
+            )
+            for candidate_idx in candidates
+        ]
 
-        object_points_o3d = o3d.utility.Vector3dVector(object_points)
-        object_pcd_filtered = o3d.geometry.PointCloud(object_points_o3d)
+    def _signed_distance_filter(self, plane_model: np.ndarray, points: np.ndarray, table_mask: np.ndarray) -> np.ndarray:
+        """Mask of non-table points lying more than `sd_thresh` above the plane."""
+        n, d = self._normalize_plane_model(plane_model)
+        sd = points @ n + d
+        return ~table_mask & (sd > self.cfg.sd_thresh)
 
-        return object_pcd_filtered
-        
     def _normalize(self, v: np.ndarray) -> np.ndarray:
         n = np.linalg.norm(v)
         if n < 1e-12:
@@ -168,46 +390,47 @@ class Pipeline:
         """
         return (R.T @ (points_xyz - p0).T).T
 
-    def _object_extraction(self, pts_object: np.ndarray) -> np.ndarray:
+    def _height_filter(self, pts_object: np.ndarray) -> np.ndarray:
         z = pts_object[:, 2]
-        keep = (z > self.cfg.h_min) & (z < self.cfg.h_max)
-        pts_object = pts_object[keep]
-        if pts_object.size == 0:
-            return pts_object
-
-        if self.cfg.use_dbscan:
-            pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(pts_object))
-            labels = np.array(pcd.cluster_dbscan(eps=self.cfg.dbscan_eps,
-                                                    min_points=self.cfg.dbscan_min_points))
-            if labels.size == 0 or labels.max() < 0:
-                return pts_object
-
-            # выбрать самый крупный кластер
-            best = None
-            best_count = -1
-            for lbl in range(labels.max() + 1):
-                cnt = np.sum(labels == lbl)
-                if cnt > best_count:
-                    best_count = cnt
-                    best = lbl
-            pts_object = pts_object[labels == best]
-
-        return pts_object
-
-    def _robust_range(self, v: np.ndarray, q_low: float, q_high: float):
-        lo = np.quantile(v, q_low)
-        hi = np.quantile(v, q_high)
-        return lo, hi
-    
+        return (z > self.cfg.h_min) & (z < self.cfg.h_max)
+
+    def _object_extraction(self, pts_object: np.ndarray) -> np.ndarray:
+        """Indices into ``pts_object`` (table frame) of the extracted object."""
+        idx = np.flatnonzero(self._height_filter(pts_object))
+        if idx.size == 0:
+            return idx
+
+        if not self.cfg.use_dbscan:
+            return idx
+
+        pts = pts_object[idx]
+        if self.cfg.cluster_method == "grid":
+            labels = grid_components(pts, self.cfg.dbscan_eps, self.cfg.dbscan_min_points)
+        else:
+            labels = self.backend.cluster_dbscan(pts, self.cfg.dbscan_eps, self.cfg.dbscan_min_points)
+        # выбрать самый крупный кластер
+        best = largest_label(labels)
+        if best is None:
+            return idx
+        idx = idx[labels == best]
+
+        return idx
+
     def _compute_upright_dims(self, obj_pts: np.ndarray) -> tuple[float, float, float]:
         if obj_pts.shape[0] < 3:
             return float("nan"), float("nan"), float("nan")
-        z = obj_pts[:, 2]
-        z0, z1 = self._robust_range(z, self.cfg.q_low, self.cfg.q_high)
-        height = z1
-
+        height = select_quantile(obj_pts[:, 2], self.cfg.q_high)
 
         xy = obj_pts[:, :2]
+        if self.cfg.bbox_type == "min_rect":
+            length, width, _ = min_area_rect(convex_hull_2d(xy))
+            return length, width, height
+        if self.cfg.bbox_type == "aabb":
+            len_ = float(xy[:, 0].max() - xy[:, 0].min())
+            wid_ = float(xy[:, 1].max() - xy[:, 1].min())
+            length, width = (len_, wid_) if len_ >= wid_ else (wid_, len_)
+            return length, width, height
+
         mu = xy.mean(axis=0)
         xy0 = xy - mu
 
@@ -220,11 +443,8 @@ class Pipeline:
         u = xy0 @ v1
         v = xy0 @ v2
 
-        u0, u1 = self._robust_range(u, 0, 1)
-        v0, v1r = self._robust_range(v, 0, 1)
-
-        len_ = float(u1 - u0)
-        wid_ = float(v1r - v0)
+        len_ = float(u.max() - u.min())
+        wid_ = float(v.max() - v.min())
 
         # Normalize: length >= width
         length, width = (len_, wid_) if len_ >= wid_ else (wid_, len_)
@@ -232,49 +452,212 @@ class Pipeline:
         return length, width, height
 
 
-    def process(self, frame: PointCloud) -> tuple[DimsResult, dict[ViewLayer, np.ndarray]]:
-
-        o3d_points = frame.points
-        if isinstance(o3d_points, o3d.geometry.PointCloud):
-            raw_points = np.asarray(o3d_points.points)
-        else:
-            raw_points = np.asarray(o3d_points)
-
-        raw_points = self._raw_roi_filter(raw_points)
-        if raw_points.shape[0] < max(self.cfg.ransac_n * 3, 10):
+    def _background_step(
+        self,
+        grid: np.ndarray,
+        roi_valid: np.ndarray,
+        views: LayerViews,
+        fx: float,
+    ) -> DimsResult | None:
+        """
+        Learn or apply the empty-scene model. Returns None when the regular
+        plane + clustering path has to run for this frame (still learning,
+        model stale or unusable).
+        """
+        if self._background_request:
+            self._background = BackgroundModel(grid.shape[:2], self.cfg.bg_frames)
+            self._background_request = False
+        bg = self._background
+        if bg is None or bg.state == BackgroundState.STALE:
+            return None
+
+        if bg.state == BackgroundState.LEARNING:
+            bg.accumulate(grid)
+            if bg.learned:
+                bg_points = self._raw_roi_filter(bg.mean_points())
+                try:
+                    _, plane_model = self._table_plane_estimation(bg_points)
+                except ValueError:
+                    self._background = None
+                    return None
+                bg.finalize(plane_model)
+            return None
+
+        z = grid[..., 2]
+        valid = roi_valid & (z > 0)
+        if bg.update_staleness(z, valid, self.cfg.bg_k_sigma, self.cfg.bg_min_diff, self.cfg.bg_stale_ratio):
+            return None
+
+        fg = bg.foreground_mask(z, valid, self.cfg.bg_k_sigma, self.cfg.bg_min_diff)
+        fg = neighborhood_outlier_mask(grid, fg, 1, self.cfg.std_ratio, fx)
+
+        R, p0, _ = self._make_table_frame(plane_model=bg.plane_model)
+        fg_idx = np.flatnonzero(fg)
+        points = grid.reshape(-1, 3)
+        fg_pts_table = self._transform_cam_to_table(points[fg_idx], R, p0)
+        keep = self._height_filter(fg_pts_table)
+
+        l, w, h = self._compute_upright_dims(fg_pts_table[keep])
+        views.set(ViewLayer.DOWNSAMPLED, grid, valid)
+        views.set_lazy(ViewLayer.TABLE, lambda: grid[valid & ~fg])
+        views.set(ViewLayer.FILTERED, points, fg_idx)
+        views.set(ViewLayer.OBJECT, points, fg_idx[keep])
+        return DimsResult(length=l, width=w, height=h, bbox_type=self.cfg.bbox_type)
+
+    def measure(self, frame: PointCloud) -> DimsResult:
+        """Dimensions only; no visualization layer is kept."""
+        res, _ = self.process(frame, layers=())
+        return res
+
+    def process(
+        self,
+        frame: PointCloud,
+        layers: Collection[ViewLayer] | None = None,
+    ) -> tuple[DimsResult, LayerViews]:
+        """
+        Measure one frame. ``layers`` selects which visualization layers to
+        return (None for all, empty for none). Layers come back as views into
+        the frame's point arrays (see `LayerViews`) and are only gathered when
+        read. Stage timings go to `self.profiler` when one is set.
+
+        Stage outputs are cached per frame object (see `StageCache`): calling
+        this again with the same frame after a config change only reruns the
+        stages that read the changed fields.
+        """
+        prof = self.profiler
+        prof.begin_frame()
+        try:
+            return self._process(frame, layers, prof)
+        finally:
+            prof.end_frame()
+
+    def _process(
+        self,
+        frame: PointCloud,
+        layers: Collection[ViewLayer] | None,
+        prof: StageProfiler | NullProfiler,
+    ) -> tuple[DimsResult, LayerViews]:
+        raw_all = as_points(frame.points)
+
+        background_active = self._background_request or (
+            self._background is not None and self._background.state != BackgroundState.STALE
+        )
+        stages = self._stages
+        if background_active:
+            # The background model is stateful per frame; never replay its inputs.
+            # A stale model is not used, so the regular path keeps its cache.
+            stages.clear()
+        stages.bind(frame, self.cfg)
+
+        views = LayerViews(layers)
+        with prof.stage("roi"):
+            use_grid = self.cfg.organized or background_active
+            grid, roi_keep = stages.run("roi", lambda: (
+                as_grid(raw_all, frame.intrinsics) if use_grid else None,
+                self._raw_roi_mask(raw_all),
+            ))
+            views.set(ViewLayer.RAW, raw_all, roi_keep)
+            n_roi = int(np.count_nonzero(roi_keep))
+            prof.points(n_roi)
+        if self._background_request and grid is None:
+            # The model is learned per pixel; a filtered or cropped cloud has no pixel grid.
+            self._background_request = False
+            raise ValueError("Background learning needs organized frames with one point per depth pixel")
+        if n_roi < max(self.cfg.ransac_n * 3, 10):
             nan_result = DimsResult(length=float("nan"), width=float("nan"), height=float("nan"))
-            clouds = {
-                ViewLayer.RAW: raw_points,
-                ViewLayer.DOWNSAMPLED: raw_points,
-                ViewLayer.TABLE: np.empty((0, 3), dtype=np.float64),
-                ViewLayer.OBJECT: np.empty((0, 3), dtype=np.float64),
-                ViewLayer.FILTERED: np.empty((0, 3), dtype=np.float64),
-            }
-            return nan_result, clouds
-        raw_pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(raw_points))
-        pcd = self._downsample(o3d_points=raw_pcd)
-
-        table_pcd, object_pcd, plane_model = self._table_plane_estimation(pcd=pcd)
-
-        object_pcd_sd = self._signed_distance_filter(plane_model=plane_model,
-                                                     object_pcd=object_pcd)
-        
-        R, p0, n = self._make_table_frame(plane_model=plane_model)
-
-        obj_pts_sd = np.asarray(object_pcd_sd.points)
-        obj_pts_sd = self._transform_cam_to_table(obj_pts_sd, R, p0)
-
-        obj_pts_extracted = self._object_extraction(obj_pts_sd)
-        obj_pts_extracted_cam = (R @ obj_pts_extracted.T).T + p0
-
-        l, w, h = self._compute_upright_dims(obj_pts_extracted)
-
-        res = DimsResult(length=l, width=w, height=h)
-        clouds = {
-            ViewLayer.RAW: raw_points,
-            ViewLayer.DOWNSAMPLED: np.asarray(pcd.points),
-            ViewLayer.TABLE: np.asarray(table_pcd.points),
-            ViewLayer.OBJECT: np.asarray(obj_pts_extracted_cam),
-            ViewLayer.FILTERED: np.asarray(object_pcd_sd.points),
-        }
-        return res, clouds
+            views.set(ViewLayer.DOWNSAMPLED, raw_all, roi_keep)
+            views.set(ViewLayer.TABLE, EMPTY_POINTS)
+            views.set(ViewLayer.OBJECT, EMPTY_POINTS)
+            views.set(ViewLayer.FILTERED, EMPTY_POINTS)
+            return nan_result, views
+
+        if self._fusion is not None and self._fusion_lock is not None:
+            with prof.stage("fusion"):
+                fused_idx = self._fusion_insert(frame, raw_all, roi_keep)
+                if not self._fusion_stalled:
+                    stages.mark("fusion")
+                views.set(ViewLayer.OBJECT, raw_all, fused_idx)
+                prof.points(fused_idx.size)
+            nan = float("nan")
+            return DimsResult(length=nan, width=nan, height=nan, bbox_type=self.cfg.bbox_type), views
+
+        if grid is not None and background_active:
+            with prof.stage("background"):
+                roi_grid = roi_keep.reshape(grid.shape[:2])
+                res = self._background_step(grid, roi_grid, views, frame.intrinsics.fx)
+                if res is not None and prof.enabled:
+                    prof.points(views.count(ViewLayer.OBJECT) if ViewLayer.OBJECT in views else 0)
+            if res is not None:
+                return res, views
+
+        fx = frame.intrinsics.fx if frame.intrinsics is not None else 0.0
+        object_outliers = self.cfg.outlier_scope != "scene"
+        with prof.stage("downsample"):
+            pts, decimated = stages.run("downsample", lambda: self._downsample_stage(raw_all, roi_keep, grid, fx))
+            prof.points(pts.shape[0])
+        if not object_outliers:
+            with prof.stage("outliers"):
+                pts = stages.run("outliers", lambda: self._scene_outliers(pts, decimated, fx))
+                prof.points(pts.shape[0])
+        # Either way, the cloud the plane is fitted to.
+        views.set(ViewLayer.DOWNSAMPLED, pts)
+
+        with prof.stage("plane"):
+            table_mask, plane_model = stages.run("plane", lambda: self._table_plane_estimation(pts))
+            views.set(ViewLayer.TABLE, pts, table_mask)
+            if prof.enabled:
+                # Counting is a pass over the mask; skip it when nobody records it.
+                prof.points(np.count_nonzero(table_mask))
+
+        with prof.stage("sd_filter"):
+            candidate_idx = stages.run("sd_filter", lambda: np.flatnonzero(
+                self._signed_distance_filter(plane_model, pts, table_mask)
+            ))
+            prof.points(candidate_idx.size)
+
+        if object_outliers:
+            # Only the points above the plane; the KNN cost follows the object, not the scene.
+            with prof.stage("outliers"):
+                filtered_idx = stages.run("outliers", lambda: self._object_outliers(pts, candidate_idx, decimated, fx))
+                prof.points(filtered_idx.size)
+        else:
+            filtered_idx = candidate_idx
+        views.set(ViewLayer.FILTERED, pts, filtered_idx)
+
+        with prof.stage("transform"):
+            obj_pts_sd = stages.run("transform", lambda: self._transform_stage(plane_model, pts[filtered_idx]))
+
+        with prof.stage("extraction"):
+            obj_idx = stages.run("extraction", lambda: self._object_extraction(obj_pts_sd))
+            # The table frame is a rigid transform of the camera frame, so the
+            # object layer is just a subset of the downsampled cloud.
+            views.set(ViewLayer.OBJECT, pts, filtered_idx[obj_idx])
+            prof.points(obj_idx.size)
+
+        with prof.stage("extents"):
+            l, w, h = stages.run("extents", lambda: self._compute_upright_dims(obj_pts_sd[obj_idx]))
+
+        if self._fusion is not None and self._fusion_lock is None and obj_idx.size >= 3:
+            with prof.stage("fusion"):
+                self._lock_fusion(plane_model, obj_pts_sd[obj_idx])
+                self._fusion_insert(frame, raw_all, roi_keep)
+
+        res = DimsResult(length=l, width=w, height=h, bbox_type=self.cfg.bbox_type)
+        return res, views
+
+    def _downsample_stage(
+        self,
+        raw_all: np.ndarray,
+        roi_keep: np.ndarray,
+        grid: np.ndarray | None,
+        fx: float,
+    ) -> tuple[np.ndarray, tuple[np.ndarray, np.ndarray, int] | None]:
+        """Downsampled points and, on the sensor grid, the decimated (grid, valid, block) they were taken from."""
+        if grid is not None and self.cfg.organized:
+            decimated = self._downsample_organized(grid, roi_keep.reshape(grid.shape[:2]), fx)
+            return decimated[0][decimated[1]], decimated
+        return self._downsample(raw_all[roi_keep]), None
+
+    def _transform_stage(self, plane_model: np.ndarray, points: np.ndarray) -> np.ndarray:
+        R, p0, _ = self._make_table_frame(plane_model=plane_model)
+        return self._transform_cam_to_table(points, R, p0)
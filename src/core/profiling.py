@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass(slots=True)
+class StageRecord:
+    name: str
+    start_ns: int
+    duration_ns: int = 0
+    points: int | None = None
+
+    @property
+    def ms(self) -> float:
+        return self.duration_ns / 1e6
+
+
+@dataclass(slots=True)
+class FrameProfile:
+    index: int
+    start_ns: int
+    duration_ns: int = 0
+    stages: list[StageRecord] = field(default_factory=list)
+
+    @property
+    def ms(self) -> float:
+        return self.duration_ns / 1e6
+
+    def stage_ms(self) -> dict[str, float]:
+        out: dict[str, float] = {}
+        for rec in self.stages:
+            out[rec.name] = out.get(rec.name, 0.0) + rec.ms
+        return out
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "index": self.index,
+            "total_ms": self.ms,
+            "stages": [
+                {"name": rec.name, "ms": rec.ms, "points": rec.points}
+                for rec in self.stages
+            ],
+        }
+
+    def format(self) -> str:
+        parts = []
+        for rec in self.stages:
+            pts = f" ({rec.points} pts)" if rec.points is not None else ""
+            parts.append(f"{rec.name} {rec.ms:.1f}ms{pts}")
+        return f"total {self.ms:.1f}ms | " + ", ".join(parts)
+
+
+class StageProfiler:
+    """
+    Per-stage wall-clock timers and point counts for `Pipeline.process`.
+
+    Usage inside the pipeline::
+
+        with prof.stage("plane"):
+            ...
+            prof.points(n)
+
+    Frames are kept in a bounded history for Chrome-trace / JSON export.
+    """
+
+    enabled = True
+
+    def __init__(self, history: int = 1000) -> None:
+        self.frames: deque[FrameProfile] = deque(maxlen=history)
+        self._frame: FrameProfile | None = None
+        self._stage: StageRecord | None = None
+        self._next_index = 0
+        self._origin_ns = time.perf_counter_ns()
+
+    @property
+    def last(self) -> FrameProfile | None:
+        return self.frames[-1] if self.frames else None
+
+    def begin_frame(self) -> None:
+        self._frame = FrameProfile(index=self._next_index, start_ns=time.perf_counter_ns())
+        self._next_index += 1
+
+    def end_frame(self) -> None:
+        frame = self._frame
+        if frame is None:
+            return
+        frame.duration_ns = time.perf_counter_ns() - frame.start_ns
+        self.frames.append(frame)
+        self._frame = None
+
+    def stage(self, name: str) -> StageProfiler:
+        self._stage = StageRecord(name=name, start_ns=time.perf_counter_ns())
+        return self
+
+    def points(self, n: int) -> None:
+        if self._stage is not None:
+            self._stage.points = int(n)
+
+    def __enter__(self) -> StageProfiler:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        rec = self._stage
+        if rec is None:
+            return
+        rec.duration_ns = time.perf_counter_ns() - rec.start_ns
+        if self._frame is not None:
+            self._frame.stages.append(rec)
+        self._stage = None
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Mean / max milliseconds per stage over the recorded frames."""
+        acc: dict[str, list[float]] = {}
+        for frame in self.frames:
+            for name, ms in frame.stage_ms().items():
+                acc.setdefault(name, []).append(ms)
+            acc.setdefault("total", []).append(frame.ms)
+        return {
+            name: {"mean_ms": sum(v) / len(v), "max_ms": max(v), "frames": len(v)}
+            for name, v in acc.items()
+        }
+
+    def to_chrome_trace(self) -> dict[str, object]:
+        events: list[dict[str, object]] = []
+        for frame in self.frames:
+            events.append({
+                "name": f"frame {frame.index}",
+                "ph": "X",
+                "ts": (frame.start_ns - self._origin_ns) / 1e3,
+                "dur": frame.duration_ns / 1e3,
+                "pid": 0,
+                "tid": 0,
+            })
+            for rec in frame.stages:
+                events.append({
+                    "name": rec.name,
+                    "ph": "X",
+                    "ts": (rec.start_ns - self._origin_ns) / 1e3,
+                    "dur": rec.duration_ns / 1e3,
+                    "pid": 0,
+                    "tid": 1,
+                    "args": {"points": rec.points, "frame": frame.index},
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str | Path) -> Path:
+        """Write a Chrome trace (``chrome://tracing`` / Perfetto) with the per-stage summary and frame records."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        trace = self.to_chrome_trace()
+        trace["summary"] = self.summary()
+        trace["frames"] = [frame.to_dict() for frame in self.frames]
+        path.write_text(json.dumps(trace, indent=1), encoding="utf-8")
+        return path
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every call is a no-op."""
+
+    enabled = False
+    last = None
+
+    def begin_frame(self) -> None:
+        pass
+
+    def end_frame(self) -> None:
+        pass
+
+    def stage(self, name: str) -> NullProfiler:
+        return self
+
+    def points(self, n: int) -> None:
+        pass
+
+    def __enter__(self) -> NullProfiler:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+NULL_PROFILER = NullProfiler()
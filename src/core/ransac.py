@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+SAMPLE_SIZE = 3
+BATCH_SIZE = 64
+SCORE_POINTS = 8192
+CONFIDENCE = 0.999
+
+
+def fit_plane_lstsq(points: np.ndarray) -> np.ndarray:
+    """Least-squares plane [a, b, c, d] (unit normal) through ``points``."""
+    centroid = points.mean(axis=0)
+    centered = points - centroid
+    _, eigvecs = np.linalg.eigh(centered.T @ centered)
+    n = eigvecs[:, 0]
+    return np.array([n[0], n[1], n[2], -float(n @ centroid)], dtype=np.float64)
+
+
+def _planes_from_samples(samples: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Planes through (B, k, 3) point samples: exact through triplets, least
+    squares for k > 3. Returns unit normals, offsets and a validity mask.
+    """
+    if samples.shape[1] == SAMPLE_SIZE:
+        n = np.cross(samples[:, 1] - samples[:, 0], samples[:, 2] - samples[:, 0])
+        norm = np.linalg.norm(n, axis=1)
+        ok = norm > 1e-9
+        n = n / np.where(ok, norm, 1.0)[:, None]
+        d = -np.einsum("ij,ij->i", n, samples[:, 0])
+        return n, d, ok
+    centroid = samples.mean(axis=1)
+    centered = samples - centroid[:, None]
+    eigvals, eigvecs = np.linalg.eigh(np.einsum("bki,bkj->bij", centered, centered))
+    n = eigvecs[:, :, 0]
+    # Collinear samples have a second eigenvalue of zero as well.
+    ok = eigvals[:, 1] > 1e-9 * np.maximum(eigvals[:, 2], 1e-12)
+    d = -np.einsum("ij,ij->i", n, centroid)
+    return n, d, ok
+
+
+def _adaptive_iterations(inlier_ratio: float, confidence: float, sample_size: int) -> float:
+    if inlier_ratio <= 0.0:
+        return math.inf
+    if inlier_ratio >= 1.0:
+        return 1.0
+    # log1p keeps the tiny all-inlier probability of large samples from rounding to zero.
+    log_miss = math.log1p(-(inlier_ratio ** sample_size))
+    if log_miss == 0.0:
+        return math.inf
+    return math.log(1.0 - confidence) / log_miss
+
+
+def ransac_planes(
+    points: np.ndarray,
+    candidates: list[np.ndarray],
+    dist_thresh: float,
+    max_iters: int,
+    max_tilt_deg: float | None = None,
+    rng: np.random.Generator | None = None,
+    sample_size: int = SAMPLE_SIZE,
+    batch_size: int = BATCH_SIZE,
+    confidence: float = CONFIDENCE,
+    score_points: int = SCORE_POINTS,
+) -> list[np.ndarray | None]:
+    """
+    Batched multi-hypothesis RANSAC over several candidate subsets of one cloud.
+
+    Every batch draws ``sample_size``-point hypotheses (at least 3; planes
+    through more points are least-squares fits, as in Open3D's
+    ``segment_plane`` with ``ransac_n``) from each candidate subset and
+    scores all of them against all candidates at once: the (N, B) inlier matrix
+    is reduced per candidate with a single matrix product. Hypotheses are scored
+    on a fixed random subset of at most ``score_points`` points. Sampling stops once
+    every candidate has reached its adaptive iteration count (or ``max_iters``
+    hypotheses per candidate were drawn); each winner is refit by least squares
+    on its inliers. Returns one plane [a, b, c, d] per candidate, or None.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    sample_size = max(SAMPLE_SIZE, int(sample_size))
+    n_cand = len(candidates)
+    if n_cand == 0 or points.shape[0] < sample_size:
+        return [None] * n_cand
+
+    pts = np.asarray(points, dtype=np.float32)
+    n_points = pts.shape[0]
+    if n_points > score_points:
+        score_idx = np.sort(rng.choice(n_points, size=score_points, replace=False))
+    else:
+        score_idx = np.arange(n_points)
+    score_pts = pts[score_idx]
+    masks = np.zeros((n_cand, n_points), dtype=np.float32)
+    for i, idx in enumerate(candidates):
+        masks[i, idx] = 1.0
+    masks = np.ascontiguousarray(masks[:, score_idx])
+    sizes = masks.sum(axis=1)
+
+    min_cos = math.cos(math.radians(max_tilt_deg)) if max_tilt_deg is not None else None
+    per_cand = max(1, batch_size // n_cand)
+    best_count = np.zeros(n_cand, dtype=np.float32)
+    best_n = np.zeros((n_cand, 3), dtype=np.float32)
+    best_d = np.zeros(n_cand, dtype=np.float32)
+    has_best = np.zeros(n_cand, dtype=bool)
+
+    iters = 0
+    while iters < max_iters:
+        sample_idx = []
+        for idx in candidates:
+            if idx.size >= sample_size:
+                sample_idx.append(idx[rng.integers(0, idx.size, size=(per_cand, sample_size))])
+        if not sample_idx:
+            break
+        sample_idx = np.concatenate(sample_idx, axis=0)
+        iters += per_cand
+
+        n, d, ok = _planes_from_samples(pts[sample_idx])
+        if min_cos is not None:
+            ok &= np.abs(n[:, 2]) >= min_cos
+        if not ok.any():
+            continue
+        n, d = n[ok], d[ok]
+
+        inliers = (np.abs(score_pts @ n.T + d) <= dist_thresh).astype(np.float32)  # (N, B)
+        counts = masks @ inliers  # (C, B)
+        j = counts.argmax(axis=1)
+        cand_best = counts[np.arange(n_cand), j]
+        improved = cand_best > best_count
+        best_count[improved] = cand_best[improved]
+        best_n[improved] = n[j[improved]]
+        best_d[improved] = d[j[improved]]
+        has_best |= improved
+
+        needed = max(
+            _adaptive_iterations(float(best_count[i]) / max(1.0, float(sizes[i])), confidence, sample_size)
+            for i in range(n_cand)
+        )
+        if iters >= needed:
+            break
+
+    planes: list[np.ndarray | None] = []
+    for i, idx in enumerate(candidates):
+        if not has_best[i]:
+            planes.append(None)
+            continue
+        sub = pts[idx]
+        inl = np.abs(sub @ best_n[i] + best_d[i]) <= dist_thresh
+        if int(inl.sum()) < SAMPLE_SIZE:
+            planes.append(None)
+            continue
+        planes.append(fit_plane_lstsq(np.asarray(sub[inl], dtype=np.float64)))
+    return planes
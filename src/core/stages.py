@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+# Pipeline stages in execution order and the `DimsAlgoConfig` fields each one reads.
+STAGE_FIELDS: dict[str, tuple[str, ...]] = {
+    "roi": ("organized", "roi_x_min", "roi_x_max", "roi_y_min", "roi_y_max"),
+    # The backend also serves the outlier filter, the open3d plane engine and DBSCAN downstream.
+    "downsample": ("backend", "voxel_size", "outlier_scope"),
+    "plane": (
+        "plane_engine",
+        "plane_dist_thresh",
+        "ransac_n",
+        "ransac_iters",
+        "ransac_seed",
+        "plane_max_tilt_deg",
+        "plane_min_inliers",
+        "plane_min_inlier_ratio",
+        "plane_depth_margin",
+        "plane_min_closer_ratio",
+    ),
+    "sd_filter": ("sd_thresh",),
+    # Runs on the above-plane candidates; with outlier_scope = "scene" it runs
+    # right after "downsample" instead (keys follow the order stages run in).
+    "outliers": ("outlier_method", "nb_neighbors", "std_ratio", "outlier_radius", "outlier_min_points"),
+    "transform": (),
+    "extraction": ("h_min", "h_max", "use_dbscan", "cluster_method", "dbscan_eps", "dbscan_min_points"),
+    "extents": ("q_low", "q_high", "bbox_type"),
+}
+STAGE_ORDER = tuple(STAGE_FIELDS)
+
+
+class StageCache:
+    """
+    Outputs of the pipeline stages for the current frame.
+
+    The stages form a chain, so each output is keyed by the values of the
+    config fields read by its stage and by every stage upstream of it. When a
+    field changes only the stages from the first one that reads it onwards
+    are recomputed; a new frame object drops everything.
+    """
+
+    def __init__(self) -> None:
+        self._frame: object | None = None
+        self._cfg: object | None = None
+        self._key: tuple = ()
+        self._entries: dict[str, tuple[tuple, Any, float]] = {}
+        self.recomputed: list[str] = []
+        self.cost_ms = 0.0
+
+    def bind(self, frame: object, cfg: object) -> None:
+        """Start a run for ``frame`` with the settings in ``cfg``."""
+        if frame is not self._frame:
+            self._entries.clear()
+            self._frame = frame
+        self._cfg = cfg
+        self._key = ()
+        self.recomputed = []
+        self.cost_ms = 0.0
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._frame = None
+
+    def mark(self, stage: str) -> None:
+        """Record a stage that ran outside the cache (e.g. frame fusion)."""
+        self.recomputed.append(stage)
+
+    def run(self, stage: str, compute: Callable[[], Any]) -> Any:
+        """
+        Cached output of ``stage`` or the result of ``compute()``.
+        `cost_ms` accumulates what the run would have cost without the cache.
+        """
+        self._key += tuple(getattr(self._cfg, name) for name in STAGE_FIELDS[stage])
+        entry = self._entries.get(stage)
+        if entry is not None and entry[0] == self._key:
+            self.cost_ms += entry[2]
+            return entry[1]
+        t0 = time.perf_counter()
+        out = compute()
+        ms = (time.perf_counter() - t0) * 1e3
+        self._entries[stage] = (self._key, out, ms)
+        self.recomputed.append(stage)
+        self.cost_ms += ms
+        return out
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from enum import Enum
 
+from src.core.layers import ViewLayer  # defined in the core, re-exported for the UI
+
 
 class AppMode(str, Enum):
     DEBUG = "debug"
@@ -14,12 +16,14 @@ class SourceMode(str, Enum):
     FILE = "file"
 
 
-class ViewLayer(str, Enum):
-    RAW = "raw"
-    DOWNSAMPLED = "downsampled"
-    TABLE = "table"
-    OBJECT = "object"
-    FILTERED = "filtered"
+class DropPolicy(str, Enum):
+    LATEST = "latest"            # consumer takes the newest item, older ones are dropped
+    DROP_OLDEST = "drop_oldest"  # FIFO; a full queue drops its oldest item
+
+
+class LodMethod(str, Enum):
+    STRIDE = "stride"  # every k-th point; cheapest, keeps the sensor-order density
+    VOXEL = "voxel"    # one point per occupied voxel; even density over the surface
 
 
 @dataclass
@@ -29,3 +33,13 @@ class AppState:
     layer: ViewLayer = ViewLayer.RAW
     camera_connected: bool = False
     last_file: str | None = None
+    frozen: bool = False
+    acq_queue_size: int = 2
+    drop_policy: DropPolicy = DropPolicy.LATEST
+    point_budget: int = 100_000
+    lod_method: LodMethod = LodMethod.STRIDE
+    recording: bool = False
+    record_layers: bool = False
+    record_dir: str = "data/recordings"
+    record_queue_size: int = 8
+    record_budget_mb_s: float = 200.0
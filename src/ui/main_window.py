@@ -14,9 +14,10 @@ from PySide6.QtWidgets import (
     QWidget,
     QComboBox,
     QSpinBox,
+    QCheckBox,
 )
 
-from src.ui.app_state import AppMode, SourceMode, ViewLayer
+from src.ui.app_state import AppMode, DropPolicy, LodMethod, SourceMode, ViewLayer
 from src.ui.viewmodels.app_controller import AppController
 from src.ui.widgets.params_panel import ParamsPanel
 from src.ui.widgets.point_cloud_view import PointCloudView
@@ -33,6 +34,8 @@ class MainWindow(QMainWindow):
         self._defaults = self._controller.get_defaults()
         self._status_text = "Starting..."
         self._fps_value: float | None = None
+        self._profile_text = ""
+        self._queue_text = ""
 
         self._build_ui()
         self._wire()
@@ -50,7 +53,7 @@ class MainWindow(QMainWindow):
         left_layout = QVBoxLayout(left)
         left_layout.setContentsMargins(0, 0, 0, 0)
         left_layout.addWidget(self._build_controls())
-        self.point_view = PointCloudView()
+        self.point_view = PointCloudView(point_budget=self._controller.state.point_budget)
         left_layout.addWidget(self.point_view, 1)
         splitter.addWidget(left)
 
@@ -73,6 +76,8 @@ class MainWindow(QMainWindow):
         self._set_combo_to_value(self.mode_combo, self._controller.state.mode)
         self._set_combo_to_value(self.source_combo, self._controller.state.source)
         self._set_combo_to_value(self.layer_combo, self._controller.state.layer)
+        self._set_combo_to_value(self.drop_combo, self._controller.state.drop_policy)
+        self._set_combo_to_value(self.lod_combo, self._controller.state.lod_method)
         self._apply_mode(self._controller.state.mode)
         self._apply_source(self._controller.state.source)
 
@@ -95,9 +100,23 @@ class MainWindow(QMainWindow):
         self.layer_combo.addItem("Object", ViewLayer.OBJECT)
         self.layer_combo.addItem("Filtered", ViewLayer.FILTERED)
 
+        self.drop_combo = QComboBox()
+        self.drop_combo.addItem("Latest frame", DropPolicy.LATEST)
+        self.drop_combo.addItem("Drop oldest", DropPolicy.DROP_OLDEST)
+
+        self.lod_combo = QComboBox()
+        self.lod_combo.addItem("Stride", LodMethod.STRIDE)
+        self.lod_combo.addItem("Voxel", LodMethod.VOXEL)
+
         self.connect_btn = QPushButton("Connect Camera")
         self.load_btn = QPushButton("Load .npz")
         self.measure_btn = QPushButton("Measure")
+        self.background_btn = QPushButton("Learn background")
+        self.freeze_check = QCheckBox("Freeze frame")
+        self.record_check = QCheckBox("Record")
+        self.record_layers_check = QCheckBox("Record layers")
+        self.profile_check = QCheckBox("Profile stages")
+        self.trace_btn = QPushButton("Export trace")
         self.measure_count = QSpinBox()
         self.measure_count.setRange(1, 100)
         self.measure_count.setValue(self._controller.get_measure_target())
@@ -114,6 +133,16 @@ class MainWindow(QMainWindow):
         layout.addWidget(QLabel("Avg frames"), 5, 0)
         layout.addWidget(self.measure_count, 5, 1)
         layout.addWidget(self.measure_btn, 6, 0, 1, 2)
+        layout.addWidget(self.background_btn, 7, 0)
+        layout.addWidget(self.freeze_check, 7, 1)
+        layout.addWidget(self.profile_check, 8, 0)
+        layout.addWidget(self.trace_btn, 8, 1)
+        layout.addWidget(QLabel("Frame drops"), 9, 0)
+        layout.addWidget(self.drop_combo, 9, 1)
+        layout.addWidget(self.record_check, 10, 0)
+        layout.addWidget(self.record_layers_check, 10, 1)
+        layout.addWidget(QLabel("Point LOD"), 11, 0)
+        layout.addWidget(self.lod_combo, 11, 1)
 
         return group
 
@@ -121,10 +150,18 @@ class MainWindow(QMainWindow):
         self.mode_combo.currentIndexChanged.connect(self._on_mode_changed)
         self.source_combo.currentIndexChanged.connect(self._on_source_changed)
         self.layer_combo.currentIndexChanged.connect(self._on_layer_changed)
+        self.drop_combo.currentIndexChanged.connect(self._on_drop_policy_changed)
+        self.lod_combo.currentIndexChanged.connect(self._on_lod_changed)
 
         self.connect_btn.clicked.connect(lambda _=False: self._controller.connect_camera())
         self.load_btn.clicked.connect(lambda _=False: self._on_load_clicked())
         self.measure_btn.clicked.connect(lambda _=False: self._controller.measure())
+        self.background_btn.clicked.connect(lambda _=False: self._controller.learn_background())
+        self.freeze_check.toggled.connect(self._controller.set_frozen)
+        self.profile_check.toggled.connect(self._controller.set_profiling)
+        self.record_check.toggled.connect(self._controller.set_recording)
+        self.record_layers_check.toggled.connect(self._controller.set_record_layers)
+        self.trace_btn.clicked.connect(lambda _=False: self._on_export_trace_clicked())
         self.measure_count.valueChanged.connect(self._controller.set_measure_target)
 
         self.params_panel.param_changed.connect(self._controller.set_param)
@@ -133,6 +170,9 @@ class MainWindow(QMainWindow):
 
         self._controller.status_changed.connect(self._on_status_changed)
         self._controller.fps_changed.connect(self._on_fps_changed)
+        self._controller.profile_changed.connect(self._on_profile_changed)
+        self._controller.queue_changed.connect(self._on_queue_changed)
+        self._controller.recording_changed.connect(self._on_recording_changed)
         self._controller.points_changed.connect(self.point_view.set_points)
         self._controller.result_changed.connect(self.results_panel.set_results)
 
@@ -144,11 +184,28 @@ class MainWindow(QMainWindow):
         self._fps_value = fps
         self._update_statusbar()
 
+    def _on_profile_changed(self, text: str) -> None:
+        self._profile_text = text
+        self._update_statusbar()
+
+    def _on_queue_changed(self, text: str) -> None:
+        self._queue_text = text
+        self._update_statusbar()
+
+    def _on_recording_changed(self, recording: bool) -> None:
+        self.record_check.blockSignals(True)
+        self.record_check.setChecked(recording)
+        self.record_check.blockSignals(False)
+
     def _update_statusbar(self) -> None:
         if self._fps_value is None:
             msg = self._status_text
         else:
             msg = f"{self._status_text} | FPS: {self._fps_value:.1f}"
+        if self._queue_text:
+            msg = f"{msg} | {self._queue_text}"
+        if self._profile_text:
+            msg = f"{msg} | {self._profile_text}"
         self.statusBar().showMessage(msg)
 
     def _set_combo_to_value(self, combo: QComboBox, value: object) -> None:
@@ -188,16 +245,38 @@ class MainWindow(QMainWindow):
             return
         self._controller.set_layer(layer)
 
+    def _on_lod_changed(self, _index: int | None = None) -> None:
+        method = self.lod_combo.currentData()
+        if method is None:
+            return
+        self._controller.set_lod_method(method)
+
+    def _on_drop_policy_changed(self, _index: int | None = None) -> None:
+        policy = self.drop_combo.currentData()
+        if policy is None:
+            return
+        self._controller.set_drop_policy(policy)
+
     def _on_load_clicked(self) -> None:
         path, _ = QFileDialog.getOpenFileName(
             self,
-            "Open .npz",
+            "Open recording",
             "",
-            "NPZ Files (*.npz);;All Files (*)",
+            "Recordings (*.npz *.session);;NPZ Files (*.npz);;Session Files (*.session);;All Files (*)",
         )
         if path:
             self._controller.load_file(path)
 
+    def _on_export_trace_clicked(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export trace",
+            "trace.json",
+            "JSON Files (*.json);;All Files (*)",
+        )
+        if path:
+            self._controller.export_profile(path)
+
     def _on_reset_params(self) -> None:
         self.params_panel.set_values(self._defaults)
         self._controller.reset_params()
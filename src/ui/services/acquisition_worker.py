@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from src.ui.services.frame_ring import FrameRing
+
+
+class AcquisitionWorker(QObject):
+    """
+    Reads frames from the source into a `FrameRing`. Live sources never wait
+    for the consumer (the ring drops frames); ``block=True`` makes replay wait
+    for space instead of spinning over already-decoded frames.
+    """
+
+    status = Signal(str)
+    error = Signal(str)
+    finished = Signal()
+
+    def __init__(self, source, frames: FrameRing, block: bool = False) -> None:
+        super().__init__()
+        self._source = source
+        self._frames = frames
+        self._block = block
+        self._running = False
+
+    @Slot()
+    def run(self) -> None:
+        self._running = True
+        while self._running:
+            try:
+                frame = self._source.read()
+            except StopIteration:
+                self.status.emit("No more frames.")
+                break
+            except Exception as exc:
+                self.error.emit(f"Read error: {exc}")
+                break
+            self._frames.put(frame, block=self._block)
+
+        # Lets the processing stage drain what is queued and stop.
+        self._frames.close()
+        self.finished.emit()
+
+    def stop(self) -> None:
+        self._running = False
+        self._frames.close()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any
+
+from src.ui.app_state import DropPolicy
+
+
+class FrameRing:
+    """
+    Bounded, thread-safe hand-off between two streaming stages.
+
+    A full ring does not block a live producer: `put` drops the oldest queued
+    item. Replay producers pass ``block=True`` and wait for space instead.
+    With `DropPolicy.LATEST` the consumer also skips to the newest item on
+    `get`, so the consumer always works on the freshest frame; with
+    `DropPolicy.DROP_OLDEST` items are consumed in order. Every discarded
+    item is counted in `dropped`.
+    """
+
+    def __init__(self, capacity: int = 2, policy: DropPolicy = DropPolicy.LATEST) -> None:
+        self.capacity = max(1, int(capacity))
+        self.policy = DropPolicy(policy)
+        self.dropped = 0
+        self._items: deque[Any] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, item: Any, block: bool = False) -> bool:
+        """
+        Queue ``item``. Returns True when the ring was empty, i.e. the consumer
+        has caught up and needs a wake-up; otherwise a pending one covers it.
+        """
+        with self._cond:
+            if block:
+                while len(self._items) >= self.capacity and not self._closed:
+                    self._cond.wait()
+            if self._closed:
+                return False
+            was_empty = not self._items
+            while len(self._items) >= self.capacity:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+            return was_empty
+
+    def get(self, timeout: float | None = None) -> Any | None:
+        """Next item per the drop policy; None on timeout or once closed and drained."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            if self.policy == DropPolicy.LATEST:
+                item = self._items.pop()
+                self.dropped += len(self._items)
+                self._items.clear()
+            else:
+                item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def get_nowait(self) -> Any | None:
+        return self.get(timeout=0)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.ui.app_state import LodMethod
+
+
+@dataclass(frozen=True, slots=True)
+class RenderPoints:
+    """Display-ready cloud: at most the point budget, float32, centered on ``center``."""
+    pos: np.ndarray
+    center: np.ndarray
+    total: int
+
+
+EMPTY_RENDER = RenderPoints(
+    pos=np.zeros((0, 3), dtype=np.float32),
+    center=np.zeros(3, dtype=np.float32),
+    total=0,
+)
+
+
+def _stride(points: np.ndarray, budget: int) -> np.ndarray:
+    step = -(-points.shape[0] // budget)
+    return points[::step]
+
+
+def _voxel(points: np.ndarray, budget: int) -> np.ndarray:
+    """
+    First point of every occupied voxel. The voxel edge assumes a surface-like
+    cloud (occupied cells ~ extent^2 / edge^2); if the guess still leaves more
+    than ``budget`` voxels, the representatives are strided down.
+    """
+    lo = points.min(axis=0)
+    extent = float((points.max(axis=0) - lo).max())
+    if extent <= 0:
+        return points[:1]
+    cell = extent / np.sqrt(budget)
+    cells = ((points - lo) / cell).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    _, first = np.unique(keys, return_index=True)
+    first.sort()
+    reps = points[first]
+    return reps if reps.shape[0] <= budget else _stride(reps, budget)
+
+
+def prepare_points(points: np.ndarray | None, budget: int, method: LodMethod = LodMethod.STRIDE) -> RenderPoints:
+    """Decimate ``points`` to ``budget`` and center them; meant to run off the GUI thread."""
+    if points is None or len(points) == 0:
+        return EMPTY_RENDER
+    pts = np.asarray(points)
+    total = pts.shape[0]
+    budget = max(1, int(budget))
+    if method == LodMethod.STRIDE and total > budget:
+        pts = _stride(pts, budget)
+    valid = np.isfinite(pts).all(axis=1)
+    if not valid.all():
+        pts = pts[valid]
+        if pts.shape[0] == 0:
+            return RenderPoints(EMPTY_RENDER.pos, EMPTY_RENDER.center, total)
+    if method == LodMethod.VOXEL and pts.shape[0] > budget:
+        pts = _voxel(pts, budget)
+    pts = pts.astype(np.float32)
+    center = pts.mean(axis=0)
+    pts -= center
+    return RenderPoints(pos=pts, center=center, total=total)
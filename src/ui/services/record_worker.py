@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import csv
+import time
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from src.acquisition.session import SESSION_SUFFIX, SessionWriter
+from src.core.backend import as_points
+from src.core.layers import EMPTY_POINTS
+from src.ui.app_state import ViewLayer
+from src.ui.services.frame_ring import FrameRing
+
+IDLE_INTERVAL_S = 0.25
+# The budget and the written-bytes counter shown in the status bar share this unit.
+MIB = 1024 * 1024
+# The raw cloud is the session itself; the other layers go to side files.
+LAYERS = tuple(layer for layer in ViewLayer if layer != ViewLayer.RAW)
+
+
+class ThroughputBudget:
+    """Token bucket over bytes: ``mb_per_s`` MiB per second, bursts up to one second's worth."""
+
+    def __init__(self, mb_per_s: float) -> None:
+        self.rate = max(0.0, mb_per_s) * MIB
+        self._tokens = self.rate
+        self._last = time.monotonic()
+
+    def take(self, nbytes: int) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if nbytes > self._tokens:
+            return False
+        self._tokens -= nbytes
+        return True
+
+
+class RecordWorker(QObject):
+    """
+    Writes frames tapped from the stream to a session file on its own thread.
+
+    The processing stage only puts (PointCloud, DimsResult, LayerViews) items
+    into a bounded ring, so a slow disk shows up as frames dropped by the ring
+    (``queue_dropped``) or skipped to stay within the throughput budget
+    (``budget_dropped``), never as a stalled stream. Results go to a CSV next
+    to the session; with ``layers`` every pipeline layer gets its own
+    ``<name>.<layer>.session`` with the same frame numbering.
+    """
+
+    status = Signal(str)
+    error = Signal(str)
+    finished = Signal()
+
+    def __init__(self, path: Path, frames: FrameRing, budget_mb_s: float, layers: bool = False) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self._frames = frames
+        self._budget = ThroughputBudget(budget_mb_s)
+        self.layers = layers
+        self.written = 0
+        self.bytes_written = 0
+        self.budget_dropped = 0
+
+    @property
+    def queue_dropped(self) -> int:
+        return self._frames.dropped
+
+    @Slot()
+    def run(self) -> None:
+        writer: SessionWriter | None = None
+        writers: dict[ViewLayer, SessionWriter] = {}
+        results = None
+        try:
+            writer = SessionWriter(self.path)
+            if self.layers:
+                writers = {
+                    layer: SessionWriter(self.path.with_suffix(f".{layer.value}{SESSION_SUFFIX}"))
+                    for layer in LAYERS
+                }
+            results = self.path.with_suffix(".csv").open("w", newline="", encoding="utf-8")
+            table = csv.writer(results)
+            table.writerow(["frame", "timestamp_ns", "length", "width", "height"])
+            while True:
+                item = self._frames.get(timeout=IDLE_INTERVAL_S)
+                if item is None:
+                    if self._frames.closed:
+                        break
+                    continue
+                frame, dims, clouds = item
+                # Frames backprojected from a depth image are stored as the 2-byte depth itself.
+                depth = frame.depth
+                points = None if depth is not None else as_points(frame.points)
+                layer_points = {
+                    layer: clouds[layer] if clouds is not None and layer in clouds else EMPTY_POINTS
+                    for layer in writers
+                }
+                nbytes = depth.nbytes if depth is not None else points.shape[0] * 12
+                nbytes += sum(p.shape[0] * 12 for p in layer_points.values())
+                if not self._budget.take(nbytes):
+                    self.budget_dropped += 1
+                    continue
+
+                intr = frame.intrinsics
+                if depth is not None:
+                    writer.append_depth(depth, frame.depth_scale, intr, frame.timestamp_ns)
+                else:
+                    writer.append_points(points, intr.width, intr.height, frame.depth_scale, intr, frame.timestamp_ns)
+                for layer, pts in layer_points.items():
+                    writers[layer].append_points(pts, intr.width, intr.height, frame.depth_scale, intr, frame.timestamp_ns)
+                table.writerow([self.written, frame.timestamp_ns or "", dims.length, dims.width, dims.height])
+                self.written += 1
+                self.bytes_written += nbytes
+        except Exception as exc:
+            self.error.emit(f"Recording error: {exc}")
+        finally:
+            # Stop accepting frames so the stream does not keep feeding a dead writer.
+            self._frames.close()
+            if writer is not None:
+                writer.close()
+            for w in writers.values():
+                w.close()
+            if results is not None:
+                results.close()
+        self.status.emit(
+            f"Recording saved: {self.path} ({self.written} frames, "
+            f"dropped {self.queue_dropped} queue / {self.budget_dropped} budget)."
+        )
+        self.finished.emit()
+
+    def stop(self) -> None:
+        """Finish writing what is queued, then exit."""
+        self._frames.close()
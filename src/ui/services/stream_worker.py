@@ -1,46 +1,187 @@
 from __future__ import annotations
 
 import threading
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
 
 from PySide6.QtCore import QObject, Signal, Slot
 
+from src.config_store import ConfigStore
+from src.ui.app_state import LodMethod, ViewLayer
+from src.ui.services.frame_ring import FrameRing
+from src.ui.services.point_lod import RenderPoints, prepare_points
+
+# How long to wait for a parameter change before re-emitting a frame whose
+# stages all came from the cache (frozen frame, single-file replay).
+IDLE_INTERVAL_S = 0.25
+
+
+@dataclass(frozen=True, slots=True)
+class StreamResult:
+    """
+    What the GUI gets per frame: the dimensions, only the displayed layer
+    ready to draw, and the version of the config snapshot that produced them.
+    """
+    dims: object
+    profile: object | None
+    layer: ViewLayer
+    render: RenderPoints | None
+    config_version: int
+
 
 class StreamWorker(QObject):
-    processed = Signal(object, object)  # DimsResult, dict[ViewLayer, np.ndarray]
+    """
+    Processing stage: takes frames from the acquisition ring, runs the
+    pipeline keeping only the displayed layer, decimates and centers it and
+    publishes a `StreamResult` into a single-slot mailbox (a one-item
+    `FrameRing` with the latest-wins policy). A newer result replaces an
+    unread one, and `ready` is only emitted when the mailbox was empty, so a
+    slow GUI sees neither queued results nor queued notifications.
+
+    The pipeline belongs to this thread. Other threads change its state
+    (fusion, background, profiler) with `post`, which runs the change
+    between two frames instead of waiting for the frame in flight.
+    """
+
+    ready = Signal()
+    applied = Signal(object, object)  # (done callback, action result)
     status = Signal(str)
     error = Signal(str)
     finished = Signal()
 
-    def __init__(self, source, pipeline, cfg_lock: threading.Lock) -> None:
+    def __init__(
+        self,
+        frames: FrameRing,
+        results: FrameRing,
+        pipeline,
+        configs: ConfigStore,
+    ) -> None:
         super().__init__()
-        self._source = source
+        self._frames = frames
+        self._results = results
         self._pipeline = pipeline
-        self._cfg_lock = cfg_lock
+        self._configs = configs
+        self._actions: deque[tuple[Callable, Callable | None]] = deque()
+        self._actions_lock = threading.Lock()
+        self._actions_closed = False
         self._running = False
+        self._frozen = False
+        self._frame = None
+        self._refresh = threading.Event()
+        self._tap: FrameRing | None = None
+        self._tap_layers = False
+        self._tapped = None
+        self._layer = ViewLayer.RAW
+        self._point_budget = 100_000
+        self._lod = LodMethod.STRIDE
+
+    def set_frozen(self, frozen: bool) -> None:
+        """Keep reprocessing the last frame instead of taking new ones."""
+        self._frozen = bool(frozen)
+        self._refresh.set()
+
+    def set_render(self, layer: ViewLayer, point_budget: int, lod: LodMethod) -> None:
+        """Layer to prepare for display and its decimation; applies from the next frame."""
+        self._layer = layer
+        self._point_budget = point_budget
+        self._lod = lod
+
+    def set_tap(self, tap: FrameRing | None, layers: bool = False) -> None:
+        """
+        Also hand each new processed frame to ``tap`` (e.g. the recorder) as
+        (PointCloud, DimsResult, LayerViews); never blocks. ``layers`` keeps
+        every layer for the tap instead of only the displayed one.
+        """
+        self._tap = tap
+        self._tap_layers = layers
+        self._tapped = None
+
+    def refresh(self) -> None:
+        """Wake up an idle loop, e.g. after a parameter change."""
+        self._refresh.set()
+
+    def post(self, action: Callable, done: Callable | None = None) -> bool:
+        """
+        Run ``action(pipeline)`` on this thread before the next frame; its
+        result is sent to ``done`` through `applied`. Returns False once the
+        loop has exited, in which case the caller owns the pipeline again.
+        """
+        with self._actions_lock:
+            if self._actions_closed:
+                return False
+            self._actions.append((action, done))
+        self._refresh.set()
+        return True
 
     @Slot()
     def run(self) -> None:
         self._running = True
         while self._running:
-            try:
-                frame = self._source.read()
-            except StopIteration:
-                self.status.emit("No more frames.")
-                break
-            except Exception as exc:
-                self.error.emit(f"Read error: {exc}")
-                break
+            self._apply_actions()
+            if self._frozen and self._frame is not None:
+                frame = self._frame
+            else:
+                frame = self._frames.get(timeout=IDLE_INTERVAL_S)
+                if frame is None:
+                    if self._frames.closed:
+                        break
+                    continue
+                self._frame = frame
 
+            layer = self._layer
+            tap = self._tap
+            requested = None if tap is not None and self._tap_layers else (layer,)
+            # One config version for the whole frame; edits published meanwhile apply to the next one.
+            snapshot = self._configs.current()
             try:
-                with self._cfg_lock:
-                    dims, clouds = self._pipeline.process(frame)
+                self._pipeline.cfg = snapshot.cfg
+                dims, clouds = self._pipeline.process(frame, layers=requested)
+                recomputed = self._pipeline.recomputed
+                profile = self._pipeline.profiler.last
             except Exception as exc:
                 self.error.emit(f"Processing error: {exc}")
+                if self._frozen:
+                    self._wait_for_refresh()
                 continue
 
-            self.processed.emit(dims, clouds)
+            if tap is not None and frame is not self._tapped:
+                tap.put((frame, dims, clouds))
+                self._tapped = frame
+            render = None
+            if layer in clouds:
+                render = prepare_points(clouds[layer], self._point_budget, self._lod)
+            if self._results.put(StreamResult(dims, profile, layer, render, snapshot.version)):
+                self.ready.emit()
+            if not recomputed and not self._actions:
+                self._wait_for_refresh()
 
+        # Requests posted while stopping still run; later ones are refused.
+        with self._actions_lock:
+            self._actions_closed = True
+            self._apply_actions()
+        self._results.close()
         self.finished.emit()
 
+    def _apply_actions(self) -> None:
+        if not self._actions:
+            return
+        # Actions such as begin_fusion read the config, so give them the latest snapshot.
+        self._pipeline.cfg = self._configs.current().cfg
+        while self._actions:
+            action, done = self._actions.popleft()
+            try:
+                out = action(self._pipeline)
+            except Exception as exc:
+                self.error.emit(f"Pipeline request failed: {exc}")
+                continue
+            if done is not None:
+                self.applied.emit(done, out)
+
+    def _wait_for_refresh(self) -> None:
+        self._refresh.wait(IDLE_INTERVAL_S)
+        self._refresh.clear()
+
     def stop(self) -> None:
         self._running = False
+        self._refresh.set()
@@ -1,23 +1,37 @@
 from __future__ import annotations
 
-import numbers
-import re
-import threading
 import time
-from dataclasses import asdict
+from collections.abc import Callable
+from datetime import datetime, timezone
 from pathlib import Path
 
 from PySide6.QtCore import QObject, QThread, Signal
 
 from src.config import DimsAlgoConfig
+from src.config_io import config_values, parse_field, write_config_values
+from src.config_store import ConfigStore
+from src.core.background import BackgroundState
 from src.core.pipeline import Pipeline
-from src.ui.app_state import AppMode, AppState, SourceMode, ViewLayer
+from src.ui.app_state import AppMode, AppState, DropPolicy, LodMethod, SourceMode, ViewLayer
+from src.ui.services.acquisition_worker import AcquisitionWorker
+from src.ui.services.frame_ring import FrameRing
+from src.ui.services.point_lod import RenderPoints
+from src.ui.services.record_worker import MIB, RecordWorker
 from src.ui.services.stream_worker import StreamWorker
 
+# Looped replay in the GUI: files decoded ahead and kept decoded across passes.
+REPLAY_PREFETCH = 2
+REPLAY_CACHE_MB = 512
+# How long stopping the stream may block the GUI thread per stage thread.
+STOP_WAIT_MS = 1000
+
 
 class AppController(QObject):
     status_changed = Signal(str)
     fps_changed = Signal(float)
+    profile_changed = Signal(str)
+    queue_changed = Signal(str)
+    recording_changed = Signal(bool)
     result_changed = Signal(float, float, float)
     points_changed = Signal(object)
     mode_changed = Signal(AppMode)
@@ -27,22 +41,33 @@ class AppController(QObject):
     def __init__(self) -> None:
         super().__init__()
         self.state = AppState()
-        self._config = DimsAlgoConfig()
-        self._defaults = asdict(self._config)
-        self._pipeline = Pipeline(self._config)
+        self._configs = ConfigStore(DimsAlgoConfig())
+        self._defaults = config_values(self._configs.cfg)
+        self._pipeline = Pipeline(self._configs.cfg)
+        self._shown_version = 0
         self._source = None
         self._thread: QThread | None = None
         self._worker: StreamWorker | None = None
-        self._cfg_lock = threading.Lock()
-        self._latest_clouds: dict[ViewLayer, object] | None = None
+        self._acq_thread: QThread | None = None
+        self._acq_worker: AcquisitionWorker | None = None
+        self._frames: FrameRing | None = None
+        self._results: FrameRing | None = None
+        self._rec_thread: QThread | None = None
+        self._rec_worker: RecordWorker | None = None
+        self._rec_ring: FrameRing | None = None
+        # Stage threads that outlived STOP_WAIT_MS, kept with their workers until they finish.
+        self._stopping: list[tuple[QThread, QObject]] = []
+        self._latest_render: tuple[ViewLayer, RenderPoints] | None = None
         self._latest_dims = None
         self._measure_active = False
         self._measure_target = 5
         self._measure_count = 0
         self._measure_sum = [0.0, 0.0, 0.0]
+        self._measure_fused = False
         self._fps_last = time.monotonic()
         self._fps_count = 0
         self._fps_value = 0.0
+        self._background_state = BackgroundState.OFF
 
     def bootstrap(self) -> None:
         self.status_changed.emit("Ready.")
@@ -55,7 +80,7 @@ class AppController(QObject):
         if self.state.mode == mode:
             return
         self.state.mode = mode
-        self._measure_active = False
+        self._cancel_measurement()
         self.mode_changed.emit(mode)
         self.status_changed.emit(f"Mode set to: {mode.value}")
 
@@ -81,10 +106,19 @@ class AppController(QObject):
         self.state.layer = layer
         self.layer_changed.emit(layer)
         self.status_changed.emit(f"Layer set to: {layer.value}")
+        self._apply_render_settings()
         self._emit_current_layer()
 
+    def set_lod_method(self, method: LodMethod) -> None:
+        method = self._coerce_enum(LodMethod, method)
+        if method is None or method == self.state.lod_method:
+            return
+        self.state.lod_method = method
+        self._apply_render_settings()
+
     def connect_camera(self) -> None:
         self._stop_stream()
+        self._release_source()
         try:
             from src.acquisition.orbbec import OrbbecSource
         except Exception as exc:
@@ -101,13 +135,20 @@ class AppController(QObject):
 
     def load_file(self, path: str) -> None:
         self._stop_stream()
+        self._release_source()
         try:
             from src.acquisition.replay import ReplaySource
         except Exception as exc:
             self.status_changed.emit(f"Failed to import replay source: {exc}")
             return
         try:
-            self._source = ReplaySource(data_dir=path, loop=True, config_path="configs/config.yaml")
+            self._source = ReplaySource(
+                data_dir=path,
+                loop=True,
+                config_path="configs/config.yaml",
+                prefetch=REPLAY_PREFETCH,
+                cache_mb=REPLAY_CACHE_MB,
+            )
         except Exception as exc:
             self.status_changed.emit(f"Failed to open file: {exc}")
             return
@@ -119,13 +160,112 @@ class AppController(QObject):
         if self.state.mode != AppMode.USE:
             self.status_changed.emit("Measurement is available in USE mode.")
             return
-        self._measure_active = True
-        self._measure_count = 0
-        self._measure_sum = [0.0, 0.0, 0.0]
+        self._start_measurement()
         self.status_changed.emit(
             f"Measurement started. Collecting {self._measure_target} frames."
         )
 
+    def learn_background(self) -> None:
+        self._on_pipeline(lambda pipeline: pipeline.learn_background())
+        frames = self._configs.cfg.bg_frames
+        self._background_state = BackgroundState.LEARNING
+        self.status_changed.emit(
+            f"Learning background: keep the table empty for {frames} frames."
+        )
+
+    def set_frozen(self, frozen: bool) -> None:
+        frozen = bool(frozen)
+        if self.state.frozen == frozen:
+            return
+        self.state.frozen = frozen
+        if self._worker is not None:
+            self._worker.set_frozen(frozen)
+        if frozen:
+            self.status_changed.emit("Frame frozen: parameter changes rerun only the affected stages.")
+        else:
+            self.status_changed.emit("Frame unfrozen.")
+
+    def set_drop_policy(self, policy: DropPolicy) -> None:
+        policy = self._coerce_enum(DropPolicy, policy)
+        if policy is None:
+            return
+        self.state.drop_policy = policy
+        if self._frames is not None:
+            self._frames.policy = policy
+
+    def set_recording(self, enabled: bool) -> None:
+        enabled = bool(enabled)
+        if enabled == (self._rec_worker is not None and not self._rec_ring.closed):
+            return
+        if not enabled:
+            self.state.recording = False
+            if self._worker is not None:
+                self._worker.set_tap(None)
+            self._rec_worker.stop()
+            self.status_changed.emit("Finishing recording...")
+            return
+
+        if self._rec_thread is not None:
+            # The previous recording is still flushing; join it before starting a new one.
+            self._join_recorder()
+        ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = Path(self.state.record_dir) / f"session_{ts}.session"
+        n = 1
+        while path.exists():
+            # Toggled again within the same second.
+            path = path.with_name(f"session_{ts}_{n}.session")
+            n += 1
+        self._rec_ring = FrameRing(self.state.record_queue_size, DropPolicy.DROP_OLDEST)
+        self._rec_thread = QThread()
+        self._rec_worker = RecordWorker(
+            path, self._rec_ring, self.state.record_budget_mb_s, layers=self.state.record_layers
+        )
+        self._rec_worker.moveToThread(self._rec_thread)
+        self._rec_thread.started.connect(self._rec_worker.run)
+        self._rec_worker.status.connect(self.status_changed)
+        self._rec_worker.error.connect(self.status_changed)
+        self._rec_worker.finished.connect(self._on_record_finished)
+        self._rec_worker.finished.connect(self._rec_thread.quit)
+        # No deleteLater: `_join_recorder` waits for the thread and drops both objects itself.
+        self._rec_thread.start()
+
+        self.state.recording = True
+        if self._worker is not None:
+            self._worker.set_tap(self._rec_ring, layers=self._rec_worker.layers)
+        self.status_changed.emit(f"Recording to {path}")
+
+    def set_record_layers(self, enabled: bool) -> None:
+        """Applies to the next recording."""
+        self.state.record_layers = bool(enabled)
+
+    def set_profiling(self, enabled: bool) -> None:
+        enabled = bool(enabled)
+        self._on_pipeline(lambda pipeline: pipeline.enable_profiling(enabled))
+        if not enabled:
+            self.profile_changed.emit("")
+        self.status_changed.emit(f"Stage profiling {'enabled' if enabled else 'disabled'}.")
+
+    def export_profile(self, path: str) -> None:
+        """Export between frames; the outcome is reported on the status bar."""
+        if not self._pipeline.profiler.enabled:
+            self.status_changed.emit("Enable stage profiling before exporting a trace.")
+            return
+
+        def export(pipeline: Pipeline) -> tuple[Path | None, Exception | None]:
+            try:
+                return pipeline.profiler.export(path), None
+            except Exception as exc:
+                return None, exc
+
+        self._on_pipeline(export, self._on_profile_exported)
+
+    def _on_profile_exported(self, outcome: tuple[Path | None, Exception | None]) -> None:
+        out, exc = outcome
+        if exc is not None:
+            self.status_changed.emit(f"Failed to export trace: {exc}")
+        else:
+            self.status_changed.emit(f"Trace saved: {out}")
+
     def set_measure_target(self, count: int) -> None:
         try:
             value = int(count)
@@ -138,8 +278,7 @@ class AppController(QObject):
             return
         self._measure_target = value
         if self._measure_active:
-            self._measure_count = 0
-            self._measure_sum = [0.0, 0.0, 0.0]
+            self._start_measurement()
             self.status_changed.emit(
                 f"Measurement count updated to {value}. Restarting measurement."
             )
@@ -150,32 +289,30 @@ class AppController(QObject):
         return int(self._measure_target)
 
     def set_param(self, name: str, value: str) -> None:
-        if not hasattr(self._config, name):
+        cfg = self._configs.cfg
+        if not hasattr(cfg, name):
             self.status_changed.emit(f"Unknown parameter: {name}")
             return
-        current = getattr(self._config, name)
         try:
-            parsed = self._parse_value(current, value)
+            parsed = parse_field(cfg, name, value)
         except ValueError as exc:
             self.status_changed.emit(f"Invalid value for {name}: {exc}")
             return
-        with self._cfg_lock:
-            setattr(self._config, name, parsed)
-            self._pipeline.cfg = self._config
-        self.status_changed.emit(f"Param updated: {name}={parsed}")
+        # Never waits for the worker: the frame in flight keeps its snapshot.
+        snapshot = self._configs.update({name: parsed})
+        self._request_refresh()
+        self.status_changed.emit(f"Param updated: {name}={parsed} (v{snapshot.version})")
 
     def reset_params(self) -> None:
-        with self._cfg_lock:
-            for key, value in self._defaults.items():
-                setattr(self._config, key, value)
-            self._pipeline.cfg = self._config
-        self.status_changed.emit("Parameters reset to defaults.")
+        snapshot = self._configs.update(self._defaults)
+        self._request_refresh()
+        self.status_changed.emit(f"Parameters reset to defaults (v{snapshot.version}).")
 
     def save_params(self) -> bool:
-        with self._cfg_lock:
-            values = asdict(self._config)
+        # Same fields as `tune --write`, including class-level settings such as sd_thresh.
+        values = config_values(self._configs.cfg)
         try:
-            self._write_config_values(values)
+            write_config_values(values)
         except Exception as exc:
             self.status_changed.emit(f"Failed to save config.py: {exc}")
             return False
@@ -188,13 +325,49 @@ class AppController(QObject):
 
     def shutdown(self) -> None:
         self._stop_stream()
+        # Closing the source also unblocks a pending camera read.
+        self._release_source()
+        for thread, _ in self._stopping:
+            thread.wait()
+        self._stopping.clear()
+        if self._rec_thread is not None:
+            self._join_recorder()
+
+    def _release_source(self) -> None:
+        close = getattr(self._source, "close", None)
+        if close is not None:
+            close()
+        self._source = None
 
-    def _parse_value(self, current: object, text: str):
-        if isinstance(current, bool):
-            return text.strip().lower() in {"1", "true", "yes", "y", "on"}
-        if isinstance(current, numbers.Integral):
-            return int(float(text))
-        return float(text)
+    def _start_measurement(self) -> None:
+        self._measure_active = True
+        self._measure_count = 0
+        self._measure_sum = [0.0, 0.0, 0.0]
+        self._measure_fused = bool(self._configs.cfg.use_fusion)
+        if self._measure_fused:
+            self._on_pipeline(lambda pipeline: pipeline.begin_fusion())
+        else:
+            self._on_pipeline(lambda pipeline: pipeline.cancel_fusion())
+
+    def _cancel_measurement(self) -> None:
+        self._measure_active = False
+        if self._measure_fused:
+            self._on_pipeline(lambda pipeline: pipeline.cancel_fusion())
+            self._measure_fused = False
+
+    def _on_pipeline(self, action: Callable[[Pipeline], object], done: Callable[[object], None] | None = None) -> None:
+        """
+        Change pipeline state without waiting for the frame in flight: the
+        worker applies ``action`` between frames, the same way it picks up
+        config snapshots. Without a running worker it is applied right away.
+        ``done`` gets the result on the GUI thread.
+        """
+        if self._worker is not None and self._worker.post(action, done):
+            return
+        self._pipeline.cfg = self._configs.cfg
+        out = action(self._pipeline)
+        if done is not None:
+            done(out)
 
     def _coerce_enum(self, enum_cls, value):
         if isinstance(value, enum_cls):
@@ -217,12 +390,32 @@ class AppController(QObject):
             return
         self._fps_last = time.monotonic()
         self._fps_count = 0
+        self._frames = FrameRing(self.state.acq_queue_size, self.state.drop_policy)
+        # Single-slot mailbox: an unread result is replaced by the next one.
+        self._results = FrameRing(1, DropPolicy.LATEST)
+
+        self._acq_thread = QThread()
+        # Replay waits for the pipeline instead of dropping frames it decoded itself.
+        block = not getattr(self._source, "live", True)
+        self._acq_worker = AcquisitionWorker(self._source, self._frames, block=block)
+        self._acq_worker.moveToThread(self._acq_thread)
+        self._acq_thread.started.connect(self._acq_worker.run)
+        self._acq_worker.status.connect(self.status_changed)
+        self._acq_worker.error.connect(self.status_changed)
+        self._acq_worker.finished.connect(self._acq_thread.quit)
+        self._acq_worker.finished.connect(self._acq_worker.deleteLater)
+        self._acq_thread.finished.connect(self._acq_thread.deleteLater)
+
         self._thread = QThread()
-        self._worker = StreamWorker(self._source, self._pipeline, self._cfg_lock)
+        self._worker = StreamWorker(self._frames, self._results, self._pipeline, self._configs)
+        self._worker.set_frozen(self.state.frozen)
+        self._worker.set_render(self.state.layer, self.state.point_budget, self.state.lod_method)
+        if self.state.recording:
+            self._worker.set_tap(self._rec_ring, layers=self._rec_worker.layers)
         self._worker.moveToThread(self._thread)
-
         self._thread.started.connect(self._worker.run)
-        self._worker.processed.connect(self._on_processed)
+        self._worker.ready.connect(self._on_ready)
+        self._worker.applied.connect(self._on_applied)
         self._worker.status.connect(self.status_changed)
         self._worker.error.connect(self.status_changed)
         self._worker.finished.connect(self._thread.quit)
@@ -230,26 +423,87 @@ class AppController(QObject):
         self._thread.finished.connect(self._thread.deleteLater)
 
         self._thread.start()
+        self._acq_thread.start()
+
+    def _request_refresh(self) -> None:
+        if self._worker is not None:
+            self._worker.refresh()
 
     def _stop_stream(self) -> None:
+        if self._acq_worker is not None:
+            self._acq_worker.stop()
         if self._worker is not None:
             self._worker.stop()
-        if self._thread is not None:
-            self._thread.quit()
-            self._thread.wait(1000)
+        # Wait out a frame in flight, but not a camera read that can block for
+        # seconds; destroying a running QThread aborts the process, so one that
+        # is still busy stays referenced until it finishes.
+        for thread, worker in ((self._acq_thread, self._acq_worker), (self._thread, self._worker)):
+            if thread is None:
+                continue
+            thread.quit()
+            if not thread.wait(STOP_WAIT_MS):
+                self._stopping.append((thread, worker))
+                thread.finished.connect(self._on_stopped_thread)
+                self.status_changed.emit("A stream thread is still busy; it will stop in the background.")
+        self._acq_thread = None
+        self._acq_worker = None
         self._thread = None
         self._worker = None
+        self._frames = None
+        self._results = None
+
+    def _on_stopped_thread(self) -> None:
+        thread = self.sender()
+        self._stopping = [entry for entry in self._stopping if entry[0] is not thread]
 
-    def _on_processed(self, dims, clouds: dict[ViewLayer, object]) -> None:
+    def _join_recorder(self) -> None:
+        """Stop the recorder, wait for its thread and drop it; a running QThread must never lose its last reference."""
+        if self._worker is not None:
+            self._worker.set_tap(None)
+        self._rec_worker.stop()
+        self._rec_thread.quit()
+        self._rec_thread.wait()
+        self._rec_thread = None
+        self._rec_worker = None
+        self._rec_ring = None
+
+    def _on_record_finished(self) -> None:
+        if self._rec_thread is None:
+            return  # already joined by set_recording or shutdown
+        if not self._rec_ring.closed:
+            return  # a newer recording is already running
+        self._join_recorder()
+        if self.state.recording:
+            # The writer stopped on its own (disk error).
+            self.state.recording = False
+        self.recording_changed.emit(False)
+
+    def _on_ready(self) -> None:
+        # Results published before the GUI got here were already replaced in the mailbox.
+        if self._results is None:
+            return
+        result = self._results.get_nowait()
+        if result is None:
+            return
+        if result.render is not None:
+            self._latest_render = (result.layer, result.render)
+        self._shown_version = result.config_version
+        self._on_processed(result.dims)
+        if result.profile is not None:
+            self._on_profiled(result.profile)
+
+    def _on_processed(self, dims) -> None:
         self._latest_dims = dims
-        self._latest_clouds = clouds
         self._emit_current_layer()
         self._update_fps()
+        self._check_background_state()
 
         if self.state.mode == AppMode.DEBUG:
             self._emit_result(dims)
             return
-        if self._measure_active:
+        if self._measure_active and self._measure_fused:
+            self._on_fused_frame()
+        elif self._measure_active:
             self._measure_sum[0] += dims.length
             self._measure_sum[1] += dims.width
             self._measure_sum[2] += dims.height
@@ -270,12 +524,58 @@ class AppController(QObject):
                     f"Measuring... {self._measure_count}/{self._measure_target}"
                 )
 
-    def _emit_current_layer(self) -> None:
-        if not self._latest_clouds:
+    def _on_fused_frame(self) -> None:
+        frames = self._pipeline.fusion_frames
+        # A frozen frame or single-file replay brings nothing new; finish with what was fused.
+        if frames < self._measure_target and not self._pipeline.fusion_stalled:
+            self.status_changed.emit(f"Fusing... {frames}/{self._measure_target}")
+            return
+        # Results that arrive before the worker finishes the fusion must not request it again.
+        self._measure_active = False
+        self._measure_fused = False
+        self._on_pipeline(
+            lambda pipeline: (pipeline.fusion_frames, *pipeline.finish_fusion()),
+            self._on_fusion_finished,
+        )
+
+    def _on_fusion_finished(self, outcome) -> None:
+        frames, dims, fused = outcome
+        self.result_changed.emit(dims.length, dims.width, dims.height)
+        self.status_changed.emit(
+            f"Measurement captured (fused {frames} frames, {fused.shape[0]} points)."
+        )
+
+    def _on_applied(self, done: Callable[[object], None], out: object) -> None:
+        # A bound slot, so the worker's `applied` is queued to the GUI thread.
+        done(out)
+
+    def _on_profiled(self, profile) -> None:
+        if not self._pipeline.profiler.enabled:
             return
+        self.profile_changed.emit(profile.format())
+
+    def _check_background_state(self) -> None:
+        state = self._pipeline.background_state
+        if state == self._background_state:
+            return
+        self._background_state = state
+        if state == BackgroundState.READY:
+            self.status_changed.emit("Background model ready.")
+        elif state == BackgroundState.STALE:
+            self.status_changed.emit(
+                "Background model is stale (scene moved). Relearn with an empty table."
+            )
+
+    def _apply_render_settings(self) -> None:
+        if self._worker is not None:
+            self._worker.set_render(self.state.layer, self.state.point_budget, self.state.lod_method)
+            self._worker.refresh()
+
+    def _emit_current_layer(self) -> None:
         layer = self.state.layer
-        if layer in self._latest_clouds:
-            self.points_changed.emit(self._latest_clouds[layer])
+        # After a layer switch the worker publishes the new layer with its next result.
+        if self._latest_render is not None and self._latest_render[0] == layer:
+            self.points_changed.emit(self._latest_render[1])
 
     def _emit_result(self, dims) -> None:
         self.result_changed.emit(dims.length, dims.width, dims.height)
@@ -290,68 +590,24 @@ class AppController(QObject):
             self._fps_last = now
             self._fps_value = fps
             self.fps_changed.emit(fps)
+            self._emit_queue_stats()
 
-    def _config_file_path(self) -> Path:
-        return Path(__file__).resolve().parents[3] / "src" / "config.py"
-
-    def _to_literal(self, value: object) -> str:
-        if isinstance(value, bool):
-            return "True" if value else "False"
-        if isinstance(value, numbers.Integral):
-            return str(int(value))
-        if isinstance(value, numbers.Real):
-            return repr(float(value))
-        return repr(value)
-
-    def _write_config_values(self, values: dict[str, object]) -> None:
-        path = self._config_file_path()
-        if not path.exists():
-            raise FileNotFoundError(f"config.py not found at {path}")
-        lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
-
-        annotated_re = re.compile(r"^(\s*)(\w+)\s*:\s*([^=]+?)\s*=\s*(.+?)(\s+#.*)?$")
-        simple_re = re.compile(r"^(\s*)(\w+)\s*=\s*(.+?)(\s+#.*)?$")
-
-        in_class = False
-        class_indent = 0
-        for idx, line in enumerate(lines):
-            stripped = line.lstrip()
-            indent = len(line) - len(stripped)
-            if not in_class:
-                if stripped.startswith("class DimsAlgoConfig"):
-                    in_class = True
-                    class_indent = indent
-                continue
-
-            if stripped and indent <= class_indent:
-                in_class = False
-                continue
-
-            if not stripped.strip() or stripped.lstrip().startswith("#"):
-                continue
-
-            m = annotated_re.match(line)
-            if m:
-                name = m.group(2)
-                if name in values:
-                    annotation = m.group(3).strip()
-                    comment = m.group(5) or ""
-                    new_val = self._to_literal(values[name])
-                    new_line = f"{m.group(1)}{name}: {annotation} = {new_val}{comment}"
-                    if line.endswith("\n"):
-                        new_line += "\n"
-                    lines[idx] = new_line
-                continue
-
-            m = simple_re.match(line)
-            if m:
-                name = m.group(2)
-                if name in values:
-                    comment = m.group(4) or ""
-                    new_val = self._to_literal(values[name])
-                    new_line = f"{m.group(1)}{name} = {new_val}{comment}"
-                    if line.endswith("\n"):
-                        new_line += "\n"
-                    lines[idx] = new_line
-
-        path.write_text("".join(lines), encoding="utf-8")
+    def _emit_queue_stats(self) -> None:
+        if self._frames is None or self._results is None:
+            return
+        text = (
+            f"Queue: acq {self._frames.depth}/{self._frames.capacity}, "
+            f"render {self._results.depth}/{self._results.capacity} | "
+            f"Dropped: acq {self._frames.dropped}, render {self._results.dropped}"
+        )
+        current = self._configs.version
+        text += f" | Params v{self._shown_version}"
+        if self._shown_version != current:
+            text += f" (v{current} pending)"
+        rec = self._rec_worker
+        if rec is not None:
+            text += (
+                f" | Rec: {rec.written} frames, {rec.bytes_written / MIB:.0f} MiB, "
+                f"dropped {rec.queue_dropped} queue / {rec.budget_dropped} budget"
+            )
+        self.queue_changed.emit(text)
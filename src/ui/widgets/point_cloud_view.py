@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QGuiApplication, QOffscreenSurface, QOpenGLContext, QSurfaceFormat
 from PySide6.QtWidgets import QLabel, QVBoxLayout, QWidget
 
+from src.ui.app_state import LodMethod
+from src.ui.services.point_lod import RenderPoints, prepare_points
+
 pg = None
 gl = None
 np = None
@@ -65,11 +68,29 @@ def _ensure_pyqtgraph() -> bool:
     return _HAS_PG
 
 
+DEFAULT_POINT_BUDGET = 100_000
+
+
 class PointCloudView(QWidget):
-    def __init__(self, parent: QWidget | None = None) -> None:
+    """
+    3D scatter view fed with `RenderPoints` prepared off the GUI thread.
+
+    The scatter draws from one float32 buffer of ``point_budget`` rows that is
+    refilled in place, so pyqtgraph rewrites the same VBO instead of
+    reallocating it; unused rows repeat the first point. Frames arriving
+    faster than the screen refresh only replace the pending one, and a timer
+    at the refresh rate uploads the latest.
+    """
+
+    def __init__(self, parent: QWidget | None = None, point_budget: int = DEFAULT_POINT_BUDGET) -> None:
         super().__init__(parent=parent)
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
+        self.point_budget = max(1, int(point_budget))
+        self._buffer = None
+        self._pending: RenderPoints | None = None
+        self._redraw = QTimer(self)
+        self._redraw.timeout.connect(self._flush)
 
         if _ensure_pyqtgraph():
             self._view = gl.GLViewWidget()
@@ -84,13 +105,15 @@ class PointCloudView(QWidget):
             axis.setSize(100, 100, 100)
             self._view.addItem(axis)
 
+            self._buffer = np.zeros((self.point_budget, 3), dtype=np.float32)
             self._scatter = gl.GLScatterPlotItem(
-                pos=np.zeros((1, 3), dtype=np.float32),
+                pos=self._buffer,
                 size=3,
                 color=(0.2, 0.8, 1.0, 1.0),
             )
             self._view.addItem(self._scatter)
             layout.addWidget(self._view)
+            self._redraw.start(self._refresh_interval_ms())
         else:
             self._view = None
             self._scatter = None
@@ -103,13 +126,27 @@ class PointCloudView(QWidget):
             layout.addWidget(placeholder)
 
     def set_points(self, points) -> None:
+        """Show ``points``: `RenderPoints` as is, a raw (N, 3) array after LOD on this thread."""
         if not _ensure_pyqtgraph() or self._scatter is None:
             return
-        if points is None or len(points) == 0:
-            points = np.zeros((1, 3), dtype=np.float32)
-        pts = np.asarray(points, dtype=np.float32)
-        if pts.ndim != 2 or pts.shape[1] != 3:
+        if not isinstance(points, RenderPoints):
+            points = prepare_points(points, self.point_budget, LodMethod.STRIDE)
+        self._pending = points
+
+    def _refresh_interval_ms(self) -> int:
+        screen = self.screen() or QGuiApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 60.0
+        return max(1, int(1000.0 / (rate if rate > 0 else 60.0)))
+
+    def _flush(self) -> None:
+        render, self._pending = self._pending, None
+        if render is None:
             return
-        center = pts.mean(axis=0)
-        pts = pts - center
-        self._scatter.setData(pos=pts)
+        pos = render.pos
+        n = min(pos.shape[0], self._buffer.shape[0])
+        if n == 0:
+            self._buffer[:] = 0.0
+        else:
+            self._buffer[:n] = pos[:n]
+            self._buffer[n:] = pos[0]
+        self._scatter.setData(pos=self._buffer)
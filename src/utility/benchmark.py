@@ -0,0 +1,372 @@
+"""
+Accuracy and throughput benchmark over the recorded `.npz` scenes.
+
+    python -m src.utility.benchmark run --data-dir data --repeats 5 --out bench.json
+    python -m src.utility.benchmark run --set organized=True --out organized.json
+    python -m src.utility.benchmark compare bench.json organized.json
+
+`run` replays every scene through `Pipeline`, records latency percentiles,
+the per-stage breakdown and L/W/H error against `data/measurements.csv`,
+and times fresh processes from launch to their first result (cold start:
+interpreter, imports, first frame, first measurement).
+`compare` flags latency and accuracy regressions between two result files
+and exits non-zero when any are found, so it can gate parameter changes.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from src.acquisition.replay import ReplaySource
+from src.config import DimsAlgoConfig
+from src.config_io import config_values, parse_field
+from src.core.pipeline import Pipeline
+
+DIMS = ("length", "width", "height")
+TRUTH_COLUMNS = {"length": "T-L", "width": "T-W", "height": "T-H"}
+PERCENTILES = (50, 90, 99)
+
+
+def scene_key(name: str) -> str:
+    """`measurements.csv` names ("mic box") to file stems ("mic_box")."""
+    return name.strip().lower().replace(" ", "_")
+
+
+def load_truth(csv_path: Path) -> dict[str, dict[str, float]]:
+    if not csv_path.exists():
+        return {}
+    truth: dict[str, dict[str, float]] = {}
+    with csv_path.open("r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                truth[scene_key(row["name"])] = {dim: float(row[col]) for dim, col in TRUTH_COLUMNS.items()}
+            except (KeyError, ValueError):
+                continue
+    return truth
+
+
+def make_config(overrides: list[str]) -> DimsAlgoConfig:
+    cfg = DimsAlgoConfig()
+    for item in overrides:
+        name, sep, value = item.partition("=")
+        if not sep or not hasattr(cfg, name):
+            raise SystemExit(f"Invalid --set {item!r}: expected <DimsAlgoConfig field>=<value>")
+        setattr(cfg, name, parse_field(cfg, name, value))
+    return cfg
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, timeout=5,
+        )
+    except Exception:
+        return None
+    return out.stdout.strip() or None
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    arr = np.asarray(values, dtype=np.float64)
+    out = {f"p{p}": float(np.percentile(arr, p)) for p in PERCENTILES}
+    out["mean"] = float(arr.mean())
+    out["min"] = float(arr.min())
+    return out
+
+
+def _failed_scene(path: Path, exc: Exception, truth: dict[str, float] | None) -> dict[str, object]:
+    """Scene record for a run that raised: no latency, NaN dims and errors."""
+    nan = {dim: float("nan") for dim in DIMS}
+    scene: dict[str, object] = {
+        "file": str(path),
+        "failed": f"{type(exc).__name__}: {exc}",
+        "dims_mm": dict(nan),
+        "dims_std_mm": dict(nan),
+    }
+    if truth is not None:
+        scene["truth_mm"] = dict(truth)
+        scene["abs_error_mm"] = dict(nan)
+        scene["error_pct"] = dict(nan)
+    return scene
+
+
+def bench_scene(pipe: Pipeline, path: Path, config_path: Path, repeats: int, warmup: int, truth: dict[str, float] | None) -> dict[str, object]:
+    """
+    Latency and dims of one scene. A scene whose read or measurement raises
+    (e.g. `ValueError` when no table plane is found) is recorded as failed
+    instead of aborting the whole run.
+    """
+    try:
+        frame = ReplaySource(data_dir=path, config_path=config_path, loop=False).read()
+        # The same frame object is replayed, so drop the stage cache before
+        # every run to time the full pipeline.
+        for _ in range(warmup):
+            pipe.invalidate()
+            pipe.measure(frame)
+
+        profiler = pipe.enable_profiling(history=repeats)
+        results = []
+        for _ in range(repeats):
+            pipe.invalidate()
+            results.append(pipe.measure(frame))
+    except Exception as exc:
+        return _failed_scene(path, exc, truth)
+    finally:
+        pipe.enable_profiling(False)
+
+    totals = [fp.ms for fp in profiler.frames]
+    stages: dict[str, list[float]] = {}
+    for fp in profiler.frames:
+        for name, ms in fp.stage_ms().items():
+            stages.setdefault(name, []).append(ms)
+
+    dims = {dim: [float(getattr(r, dim)) for r in results] for dim in DIMS}
+    scene: dict[str, object] = {
+        "file": str(path),
+        "latency_ms": _percentiles(totals),
+        "stages_ms": {name: float(np.mean(v)) for name, v in stages.items()},
+        "dims_mm": {dim: float(np.nanmean(v)) if not all(math.isnan(x) for x in v) else float("nan") for dim, v in dims.items()},
+        "dims_std_mm": {dim: float(np.nanstd(v)) if not all(math.isnan(x) for x in v) else float("nan") for dim, v in dims.items()},
+    }
+    if truth is not None:
+        measured = scene["dims_mm"]
+        scene["truth_mm"] = dict(truth)
+        scene["abs_error_mm"] = {dim: abs(measured[dim] - truth[dim]) for dim in DIMS}
+        scene["error_pct"] = {dim: abs(measured[dim] - truth[dim]) / truth[dim] * 100.0 for dim in DIMS}
+    return scene
+
+
+def cold_start(path: Path, config_path: Path, overrides: list[str], runs: int) -> dict[str, object]:
+    """
+    Launch ``runs`` fresh interpreters that measure ``path`` once and time
+    each from launch until its result line arrives (process teardown is not
+    counted). ``startup_ms`` is what is left after the first frame read and
+    the first measurement: interpreter start, imports and pipeline setup.
+    The backend is imported on first use, so its import lands in ``measure_ms``.
+    """
+    cmd = [sys.executable, "-m", "src.utility.benchmark", "first-result", str(path), "--config", str(config_path)]
+    for item in overrides:
+        cmd += ["--set", item]
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True) as proc:
+            line = proc.stdout.readline()
+            total_ms = (time.perf_counter() - t0) * 1e3
+            proc.stdout.read()
+        if proc.returncode != 0 or not line:
+            raise SystemExit(f"Cold-start run failed with exit code {proc.returncode}")
+        child = json.loads(line)
+        child["total_ms"] = total_ms
+        child["startup_ms"] = total_ms - child["read_ms"] - child["measure_ms"]
+        samples.append(child)
+    out: dict[str, object] = {
+        key: float(np.median([c[key] for c in samples]))
+        for key in ("total_ms", "startup_ms", "read_ms", "measure_ms")
+    }
+    out["runs"] = runs
+    out["open3d_loaded"] = samples[0]["open3d_loaded"]
+    return out
+
+
+def first_result(args: argparse.Namespace) -> int:
+    """Child of `cold_start`: one frame, one measurement, one JSON line."""
+    cfg = make_config(args.set or [])
+    t0 = time.perf_counter()
+    pipe = Pipeline(cfg)
+    source = ReplaySource(data_dir=args.scene, config_path=args.config, loop=False)
+    frame = source.read()
+    t1 = time.perf_counter()
+    pipe.measure(frame)
+    t2 = time.perf_counter()
+    print(json.dumps({
+        "read_ms": (t1 - t0) * 1e3,
+        "measure_ms": (t2 - t1) * 1e3,
+        "open3d_loaded": "open3d" in sys.modules,
+    }), flush=True)
+    return 0
+
+
+def run(args: argparse.Namespace) -> int:
+    data_dir = Path(args.data_dir)
+    paths = sorted(data_dir.glob(args.pattern)) if data_dir.is_dir() else [data_dir]
+    if not paths:
+        raise SystemExit(f"No scenes found in {data_dir!s} with pattern {args.pattern!r}")
+    truth = load_truth(Path(args.truth))
+    cfg = make_config(args.set or [])
+    pipe = Pipeline(cfg)
+
+    scenes: dict[str, dict[str, object]] = {}
+    for path in paths:
+        key = path.stem
+        scene_truth = truth.get(key)
+        if args.labelled_only and scene_truth is None:
+            continue
+        scene = bench_scene(pipe, path, Path(args.config), args.repeats, args.warmup, scene_truth)
+        scenes[key] = scene
+        if "failed" in scene:
+            print(f"{key:<14} FAILED: {scene['failed']}")
+            continue
+        lat = scene["latency_ms"]
+        line = f"{key:<14} p50 {lat['p50']:8.1f}ms  p90 {lat['p90']:8.1f}ms"
+        if "error_pct" in scene:
+            err = scene["error_pct"]
+            line += f"  err% L/W/H {err['length']:5.2f} / {err['width']:5.2f} / {err['height']:5.2f}"
+        print(line)
+
+    measured = [s for s in scenes.values() if "failed" not in s]
+    labelled = [s for s in measured if "error_pct" in s]
+    aggregate: dict[str, object] = {
+        "latency_p50_ms": float(np.mean([s["latency_ms"]["p50"] for s in measured])) if measured else float("nan"),
+        "failed": sorted(key for key, s in scenes.items() if "failed" in s),
+    }
+    if labelled:
+        aggregate["mean_error_pct"] = {
+            dim: float(np.nanmean([s["error_pct"][dim] for s in labelled])) for dim in DIMS
+        }
+        print(
+            "mean err% L/W/H "
+            + " / ".join(f"{aggregate['mean_error_pct'][dim]:.2f}" for dim in DIMS)
+            + f"  | mean p50 {aggregate['latency_p50_ms']:.1f}ms"
+        )
+    if aggregate["failed"]:
+        print(f"{len(aggregate['failed'])} scene(s) failed: {', '.join(aggregate['failed'])}")
+
+    if args.cold_starts > 0:
+        cold = cold_start(paths[0], Path(args.config), args.set or [], args.cold_starts)
+        aggregate["cold_start"] = cold
+        print(
+            f"cold start {cold['total_ms']:.0f}ms to first result "
+            f"(startup {cold['startup_ms']:.0f} / read {cold['read_ms']:.0f} / measure {cold['measure_ms']:.0f}ms"
+            f"{', open3d loaded' if cold['open3d_loaded'] else ''})"
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git": _git_revision(),
+            "repeats": args.repeats,
+            "warmup": args.warmup,
+            "python": sys.version.split()[0],
+            "config": config_values(cfg),
+        },
+        "aggregate": aggregate,
+        "scenes": scenes,
+    }
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"saved: {out}")
+    return 0
+
+
+def compare_reports(base: dict, new: dict, latency_tol: float, error_tol: float) -> list[str]:
+    """
+    Regressions of ``new`` against ``base``: a scene that now fails, p50
+    latency slower by > latency_tol (ratio), error worse by > error_tol (pp).
+    """
+    regressions: list[str] = []
+    for key, b in base["scenes"].items():
+        n = new["scenes"].get(key)
+        if n is None:
+            regressions.append(f"{key}: missing from new run")
+            continue
+        if "failed" in n:
+            if "failed" not in b:
+                regressions.append(f"{key}: failed ({n['failed']})")
+            continue
+        if "failed" in b:
+            continue
+        b_lat, n_lat = b["latency_ms"]["p50"], n["latency_ms"]["p50"]
+        if b_lat > 0 and n_lat > b_lat * (1.0 + latency_tol):
+            regressions.append(f"{key}: p50 latency {b_lat:.1f}ms -> {n_lat:.1f}ms (+{(n_lat / b_lat - 1) * 100:.0f}%)")
+        if "error_pct" in b and "error_pct" in n:
+            for dim in DIMS:
+                b_err, n_err = b["error_pct"][dim], n["error_pct"][dim]
+                if math.isnan(n_err) and not math.isnan(b_err):
+                    regressions.append(f"{key}: {dim} is no longer measured")
+                elif n_err > b_err + error_tol:
+                    regressions.append(f"{key}: {dim} error {b_err:.2f}% -> {n_err:.2f}%")
+    b_cold, n_cold = base["aggregate"].get("cold_start"), new["aggregate"].get("cold_start")
+    if b_cold is not None and n_cold is not None:
+        b_ms, n_ms = b_cold["total_ms"], n_cold["total_ms"]
+        if b_ms > 0 and n_ms > b_ms * (1.0 + latency_tol):
+            regressions.append(f"cold start {b_ms:.0f}ms -> {n_ms:.0f}ms (+{(n_ms / b_ms - 1) * 100:.0f}%)")
+    return regressions
+
+
+def compare(args: argparse.Namespace) -> int:
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+
+    for key in sorted(set(base["scenes"]) & set(new["scenes"])):
+        b, n = base["scenes"][key], new["scenes"][key]
+        if "failed" in b or "failed" in n:
+            print(f"{key:<14} {'FAILED' if 'failed' in b else 'ok'} -> {'FAILED' if 'failed' in n else 'ok'}")
+            continue
+        line = f"{key:<14} p50 {b['latency_ms']['p50']:8.1f} -> {n['latency_ms']['p50']:8.1f}ms"
+        if "error_pct" in b and "error_pct" in n:
+            line += "  err% " + " ".join(
+                f"{dim[0].upper()} {b['error_pct'][dim]:.2f}->{n['error_pct'][dim]:.2f}" for dim in DIMS
+            )
+        print(line)
+    b_cold, n_cold = base["aggregate"].get("cold_start"), new["aggregate"].get("cold_start")
+    if b_cold is not None and n_cold is not None:
+        print(f"{'cold start':<14} {b_cold['total_ms']:8.0f} -> {n_cold['total_ms']:8.0f}ms")
+
+    regressions = compare_reports(base, new, args.latency_tol, args.error_tol)
+    if regressions:
+        print(f"{len(regressions)} regression(s):")
+        for item in regressions:
+            print(f"  - {item}")
+        return 1
+    print("No regressions.")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Benchmark the pipeline on recorded scenes")
+    p_run.add_argument("--data-dir", default="data", help="Directory with .npz scenes (or a single file)")
+    p_run.add_argument("--pattern", default="*.npz", help="Glob for scene files")
+    p_run.add_argument("--truth", default="data/measurements.csv", help="CSV with T-L/T-W/T-H ground truth")
+    p_run.add_argument("--config", default="configs/config.yaml", help="Config with camera intrinsics")
+    p_run.add_argument("--repeats", type=int, default=5, help="Timed runs per scene")
+    p_run.add_argument("--warmup", type=int, default=1, help="Untimed runs per scene")
+    p_run.add_argument("--labelled-only", action="store_true", help="Skip scenes without ground truth")
+    p_run.add_argument("--set", action="append", metavar="FIELD=VALUE", help="Override a DimsAlgoConfig field")
+    p_run.add_argument("--cold-starts", type=int, default=3, help="Fresh processes timed to their first result (0 to skip)")
+    p_run.add_argument("--out", default=None, help="Write results JSON here")
+    p_run.set_defaults(func=run)
+
+    p_first = sub.add_parser("first-result", help="Measure one scene once and print the timings (used by run)")
+    p_first.add_argument("scene", help=".npz or .session file")
+    p_first.add_argument("--config", default="configs/config.yaml", help="Config with camera intrinsics")
+    p_first.add_argument("--set", action="append", metavar="FIELD=VALUE", help="Override a DimsAlgoConfig field")
+    p_first.set_defaults(func=first_result)
+
+    p_cmp = sub.add_parser("compare", help="Flag regressions between two result files")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--latency-tol", type=float, default=0.15, help="Allowed p50 slowdown ratio")
+    p_cmp.add_argument("--error-tol", type=float, default=0.5, help="Allowed error increase, percentage points")
+    p_cmp.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+"""
+Migrate `.npz` recordings into a single memory-mapped session file.
+
+    python -m src.utility.npz_to_session data --out data/recordings.session
+
+Payloads are copied as recorded (float32 points or uint16 depth) together
+with the per-file intrinsics, distortion, depth scale and timestamp; no backprojection
+happens here. Replay the result with `ReplaySource(data_dir="...session")`.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import fields
+from pathlib import Path
+
+import numpy as np
+
+from src.acquisition.replay import DEPTH_KEY
+from src.acquisition.session import SESSION_SUFFIX, SessionWriter, index_path
+from src.app_types import Distortion, Intrinsics
+
+
+def _intrinsics(data, width: int, height: int) -> Intrinsics | None:
+    if not all(k in data for k in ("fx", "fy", "cx", "cy")):
+        return None
+    return Intrinsics(
+        fx=float(data["fx"]),
+        fy=float(data["fy"]),
+        cx=float(data["cx"]),
+        cy=float(data["cy"]),
+        width=int(data["intr_width"]) if "intr_width" in data else width,
+        height=int(data["intr_height"]) if "intr_height" in data else height,
+    )
+
+
+def _distortion(data) -> Distortion | None:
+    names = [f.name for f in fields(Distortion)]
+    if not any(k in data for k in names):
+        return None
+    return Distortion(**{k: float(data[k]) for k in names if k in data})
+
+
+def append_npz(writer: SessionWriter, path: Path) -> str:
+    """Append one recording; returns the payload kind written."""
+    with np.load(path) as data:
+        depth_scale = float(data["depth_scale"]) if "depth_scale" in data else 1.0
+        timestamp_ns = int(data["timestamp_ns"]) if "timestamp_ns" in data else None
+        if DEPTH_KEY in data and "points" not in data:
+            depth = data[DEPTH_KEY]
+            height, width = depth.shape
+            writer.append_depth(
+                depth, depth_scale, _intrinsics(data, width, height), timestamp_ns, _distortion(data)
+            )
+            return "depth"
+        if "points" not in data:
+            raise KeyError(f"Missing 'points' or '{DEPTH_KEY}' in {path!s}")
+        width = int(data["width"]) if "width" in data else int(data["intr_width"])
+        height = int(data["height"]) if "height" in data else int(data["intr_height"])
+        intrinsics = _intrinsics(data, width, height)
+        writer.append_points(data["points"], width, height, depth_scale, intrinsics, timestamp_ns, _distortion(data))
+        return "points"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data_dir", nargs="?", default="data", help="Directory with .npz recordings")
+    parser.add_argument("--pattern", default="*.npz", help="Glob for recording files")
+    parser.add_argument("--out", default=None, help=f"Session file (default: <data_dir>/recordings{SESSION_SUFFIX})")
+    parser.add_argument("--append", action="store_true", help="Append to an existing session instead of replacing it")
+    args = parser.parse_args(argv)
+
+    data_dir = Path(args.data_dir)
+    paths = sorted(data_dir.glob(args.pattern))
+    if not paths:
+        print(f"No files matching {args.pattern!r} in {data_dir!s}")
+        return 1
+    out = Path(args.out) if args.out else data_dir / f"recordings{SESSION_SUFFIX}"
+    if out.exists() and not args.append:
+        out.unlink()
+        index_path(out).unlink(missing_ok=True)
+
+    with SessionWriter(out) as writer:
+        for path in paths:
+            try:
+                kind = append_npz(writer, path)
+            except Exception as exc:
+                print(f"skipped {path.name}: {exc}")
+                continue
+            print(f"{path.name}: {kind}")
+        frames = writer.frames
+    print(f"saved: {out} ({frames} frames, {out.stat().st_size / 1e6:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,3 +1,4 @@
+import argparse
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -16,6 +17,16 @@ def _points_to_numpy(points) -> np.ndarray:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Record one Orbbec frame to .npz")
+    parser.add_argument("--name", default=None, help="Output file name without extension")
+    parser.add_argument("--out-dir", default="data", help="Output directory")
+    parser.add_argument(
+        "--points",
+        action="store_true",
+        help="Store Nx3 float32 points (12 B/pixel) instead of the uint16 depth image (2 B/pixel)",
+    )
+    args = parser.parse_args()
+
     config = Config()
     pipeline = Pipeline()
     try:
@@ -25,6 +36,7 @@ def main():
         assert depth_profile is not None
         print("depth profile: ", depth_profile)
         depth_intrinsics = depth_profile.get_intrinsic()
+        depth_distortion = depth_profile.get_distortion()
         config.enable_stream(depth_profile)
     except Exception as e:
         print(e)
@@ -48,16 +60,25 @@ def main():
     height = depth_frame.get_height()
     depth_scale = depth_frame.get_depth_scale()
 
-    points = frames.get_point_cloud(camera_param)
-    points_np = _points_to_numpy(points)
+    if args.points:
+        prefix = "point_cloud"
+        payload = {"points": _points_to_numpy(frames.get_point_cloud(camera_param))}
+    else:
+        # ReplaySource backprojects the depth on load with the intrinsics and distortion below.
+        prefix = "depth"
+        depth = np.frombuffer(depth_frame.get_data(), dtype=np.uint16).reshape((height, width))
+        payload = {
+            "depth_data": depth,
+            **{k: float(getattr(depth_distortion, k)) for k in ("k1", "k2", "k3", "k4", "k5", "k6", "p1", "p2")},
+        }
 
-    out_dir = Path("data")
+    out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
     ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-    out_path = out_dir / f"point_cloud_{ts}.npz"
+    out_path = out_dir / f"{args.name or f'{prefix}_{ts}'}.npz"
     np.savez_compressed(
         out_path,
-        points=points_np,
+        **payload,
         width=width,
         height=height,
         depth_scale=depth_scale,
@@ -75,4 +96,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,403 @@
+"""
+Parallel parameter sweep for `DimsAlgoConfig` over the labelled `.npz` scenes.
+
+    python -m src.utility.tune --param voxel_size=1,2,4 --param dbscan_eps=10:40:4 --out sweep.json
+    python -m src.utility.tune --search random --trials 60 --param sd_thresh=1:6 --param plane_dist_thresh=2:8
+    python -m src.utility.tune --search bayes --trials 40 --param dbscan_eps=8:40 --pick max-latency=300 --write
+
+Parameter specs:
+    name=a,b,c        explicit values
+    name=lo:hi        continuous range (random / bayes)
+    name=lo:hi:n      n evenly spaced values (grid), a range otherwise
+
+Configurations are grouped by their early-stage fields (ROI, downsampling,
+plane); each group runs the expensive stages once per scene and then only the
+late stages (signed-distance filter, clustering, extents) per configuration.
+Groups are spread over a process pool. The result is scored as mean L/W/H
+error against `data/measurements.csv` and per-frame latency; the Pareto front
+of the two is printed and the chosen configuration can be written back to
+`src/config.py` in the format used by the GUI "Save" button.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from src.config import DimsAlgoConfig
+from src.config_io import config_values, field_kind, parse_value, write_config_values
+from src.core.pipeline import Pipeline
+from src.core.stages import STAGE_FIELDS, STAGE_ORDER
+from src.utility.benchmark import DIMS, load_truth
+
+# Fields read only after the table plane is known; configurations that differ
+# only in these share the cached ROI / downsample / plane stages.
+LATE_FIELDS = frozenset(
+    name for stage in STAGE_ORDER[STAGE_ORDER.index("plane") + 1:] for name in STAGE_FIELDS[stage]
+)
+FAILED_ERROR_PCT = 100.0
+
+_FRAMES: dict[str, object] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class ParamSpec:
+    name: str
+    kind: str = "float"
+    values: tuple | None = None
+    low: float | None = None
+    high: float | None = None
+
+    def grid(self) -> tuple:
+        if self.values is None:
+            raise SystemExit(f"{self.name}: grid search needs explicit values or lo:hi:n")
+        return self.values
+
+    def sample(self, rng: np.random.Generator):
+        if self.values is not None:
+            return self.values[int(rng.integers(len(self.values)))]
+        return self.from_unit(float(rng.random()))
+
+    def to_unit(self, value: object) -> float:
+        if self.values is not None:
+            if len(self.values) == 1:
+                return 0.0
+            return self.values.index(value) / (len(self.values) - 1)
+        return (float(value) - self.low) / max(self.high - self.low, 1e-12)
+
+    def from_unit(self, u: float):
+        u = min(max(u, 0.0), 1.0)
+        if self.values is not None:
+            return self.values[int(round(u * (len(self.values) - 1)))]
+        value = self.low + u * (self.high - self.low)
+        if self.kind == "bool":
+            return value >= 0.5
+        if self.kind == "int":
+            return int(round(value))
+        return float(value)
+
+
+def parse_param(text: str, defaults: DimsAlgoConfig) -> ParamSpec:
+    name, sep, spec = text.partition("=")
+    name = name.strip()
+    if not sep or not hasattr(defaults, name):
+        raise SystemExit(f"Invalid --param {text!r}: expected <DimsAlgoConfig field>=<spec>")
+    current = getattr(defaults, name)
+    kind = field_kind(defaults, name)
+    if kind == "float":
+        current = float(current)
+    if ":" in spec:
+        parts = spec.split(":")
+        if len(parts) not in (2, 3):
+            raise SystemExit(f"Invalid range in --param {text!r}")
+        low, high = float(parts[0]), float(parts[1])
+        if len(parts) == 3:
+            values = tuple(dict.fromkeys(
+                parse_value(current, repr(float(v))) for v in np.linspace(low, high, int(parts[2]))
+            ))
+            return ParamSpec(name, kind, values=values, low=low, high=high)
+        return ParamSpec(name, kind, low=low, high=high)
+    values = tuple(dict.fromkeys(parse_value(current, v) for v in spec.split(",") if v.strip()))
+    if not values:
+        raise SystemExit(f"No values in --param {text!r}")
+    return ParamSpec(name, kind, values=values)
+
+
+def make_config(values: dict[str, object]) -> DimsAlgoConfig:
+    # setattr rather than the constructor: `sd_thresh` is a plain class attribute.
+    cfg = DimsAlgoConfig()
+    for key, value in values.items():
+        setattr(cfg, key, value)
+    return cfg
+
+
+def early_key(values: dict[str, object]) -> tuple:
+    return tuple(sorted((k, v) for k, v in values.items() if k not in LATE_FIELDS))
+
+
+def _load_frame(path: str, config_path: str):
+    frame = _FRAMES.get(path)
+    if frame is None:
+        from src.acquisition.replay import ReplaySource
+
+        frame = ReplaySource(data_dir=path, config_path=config_path, loop=False).read()
+        _FRAMES[path] = frame
+    return frame
+
+
+def evaluate_group(
+    configs: list[dict[str, object]],
+    scenes: list[str],
+    truth: dict[str, dict[str, float]],
+    config_path: str,
+    repeats: int,
+) -> list[dict[str, object]]:
+    """
+    Score configurations sharing the same early-stage fields. They run
+    back to back on each frame, so the pipeline's stage cache serves the
+    early stages after the first configuration; latency is charged as the
+    uncached per-frame cost (`Pipeline.stage_cost_ms`).
+    """
+    pipe = Pipeline(make_config(configs[0]))
+    per_cfg = [{"errors": [], "latency_ms": []} for _ in configs]
+    for path in scenes:
+        frame = _load_frame(path, config_path)
+        scene_truth = truth[Path(path).stem]
+        for _ in range(repeats):
+            pipe.invalidate()
+            for values, acc in zip(configs, per_cfg):
+                pipe.cfg = make_config(values)
+                try:
+                    res = pipe.measure(frame)
+                except ValueError:
+                    res = None
+                acc["latency_ms"].append(pipe.stage_cost_ms)
+                for dim in DIMS:
+                    measured = getattr(res, dim) if res is not None else float("nan")
+                    if math.isnan(measured):
+                        acc["errors"].append(FAILED_ERROR_PCT)
+                    else:
+                        acc["errors"].append(abs(measured - scene_truth[dim]) / scene_truth[dim] * 100.0)
+
+    return [
+        {
+            "config": values,
+            "error_pct": float(np.mean(acc["errors"])),
+            "latency_ms": float(np.median(acc["latency_ms"])),
+        }
+        for values, acc in zip(configs, per_cfg)
+    ]
+
+
+def pareto_front(results: list[dict[str, object]]) -> list[dict[str, object]]:
+    """Non-dominated results in (error_pct, latency_ms), both minimized."""
+    ordered = sorted(results, key=lambda r: (r["latency_ms"], r["error_pct"]))
+    front = []
+    best_err = math.inf
+    for r in ordered:
+        if r["error_pct"] < best_err:
+            front.append(r)
+            best_err = r["error_pct"]
+    return front
+
+
+def pick(front: list[dict[str, object]], rule: str) -> dict[str, object] | None:
+    if not front:
+        return None
+    if rule == "min-error":
+        return min(front, key=lambda r: r["error_pct"])
+    if rule == "min-latency":
+        return min(front, key=lambda r: r["latency_ms"])
+    name, _, value = rule.partition("=")
+    if name == "max-latency":
+        within = [r for r in front if r["latency_ms"] <= float(value)]
+        return min(within, key=lambda r: r["error_pct"]) if within else None
+    if name == "max-error":
+        within = [r for r in front if r["error_pct"] <= float(value)]
+        return min(within, key=lambda r: r["latency_ms"]) if within else None
+    raise SystemExit(f"Unknown --pick rule {rule!r}")
+
+
+class SweepRunner:
+    def __init__(self, args: argparse.Namespace, scenes: list[str], truth: dict[str, dict[str, float]]) -> None:
+        self.args = args
+        self.scenes = scenes
+        self.truth = truth
+        self.results: list[dict[str, object]] = []
+        self._seen: set[tuple] = set()
+        self._pool = ProcessPoolExecutor(max_workers=args.workers)
+
+    def close(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+
+    def evaluate(self, configs: list[dict[str, object]]) -> list[dict[str, object]]:
+        fresh = []
+        for values in configs:
+            key = tuple(sorted(values.items()))
+            if key not in self._seen:
+                self._seen.add(key)
+                fresh.append(values)
+        groups: dict[tuple, list[dict[str, object]]] = {}
+        for values in fresh:
+            groups.setdefault(early_key(values), []).append(values)
+
+        futures = [
+            self._pool.submit(
+                evaluate_group, group, self.scenes, self.truth, self.args.config, self.args.repeats
+            )
+            for group in groups.values()
+        ]
+        batch = []
+        for future in futures:
+            for r in future.result():
+                batch.append(r)
+                self.results.append(r)
+                if self.args.verbose:
+                    print(f"  err {r['error_pct']:6.2f}%  {r['latency_ms']:8.1f}ms  {_diff(r['config'])}")
+        print(f"evaluated {len(self.results)} configs ({len(groups)} early-stage groups in this batch)")
+        return batch
+
+
+def _diff(values: dict[str, object]) -> str:
+    base = config_values(DimsAlgoConfig())
+    return ", ".join(f"{k}={v}" for k, v in values.items() if base.get(k) != v) or "defaults"
+
+
+def _objective(r: dict[str, object], latency_weight: float) -> float:
+    return float(r["error_pct"]) + latency_weight * float(r["latency_ms"])
+
+
+def search_grid(runner: SweepRunner, specs: list[ParamSpec]) -> None:
+    base = config_values(DimsAlgoConfig())
+    grids = [spec.grid() for spec in specs]
+    configs = []
+    for combo in np.ndindex(*[len(g) for g in grids]):
+        values = dict(base)
+        for spec, g, i in zip(specs, grids, combo):
+            values[spec.name] = g[i]
+        configs.append(values)
+    runner.evaluate(configs)
+
+
+def search_random(runner: SweepRunner, specs: list[ParamSpec], trials: int, rng: np.random.Generator) -> None:
+    base = config_values(DimsAlgoConfig())
+    configs = []
+    for _ in range(trials):
+        values = dict(base)
+        for spec in specs:
+            values[spec.name] = spec.sample(rng)
+        configs.append(values)
+    runner.evaluate(configs)
+
+
+def _gp_expected_improvement(x: np.ndarray, y: np.ndarray, cand: np.ndarray, length: float = 0.25, noise: float = 1e-3) -> np.ndarray:
+    """Expected improvement (minimization) of a unit-variance RBF Gaussian process."""
+    from scipy.stats import norm
+
+    mu_y, sd_y = float(y.mean()), float(y.std()) or 1.0
+    yn = (y - mu_y) / sd_y
+
+    def kernel(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        d2 = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)
+        return np.exp(-0.5 * d2 / length ** 2)
+
+    K = kernel(x, x) + noise * np.eye(x.shape[0])
+    L = np.linalg.cholesky(K)
+    alpha = np.linalg.solve(L.T, np.linalg.solve(L, yn))
+    Ks = kernel(cand, x)
+    mean = Ks @ alpha
+    v = np.linalg.solve(L, Ks.T)
+    std = np.sqrt(np.maximum(1.0 - (v ** 2).sum(axis=0), 1e-12))
+    best = yn.min()
+    z = (best - mean) / std
+    return (best - mean) * norm.cdf(z) + std * norm.pdf(z)
+
+
+def search_bayes(runner: SweepRunner, specs: list[ParamSpec], trials: int, rng: np.random.Generator, latency_weight: float) -> None:
+    """
+    Gaussian-process search with expected improvement on the scalarized
+    objective ``error_pct + latency_weight * latency_ms``. Each round proposes
+    one configuration per worker so the pool stays busy.
+    """
+    base = config_values(DimsAlgoConfig())
+    batch = max(1, runner.args.workers)
+    n_init = min(trials, max(5, batch))
+    search_random(runner, specs, n_init, rng)
+    while len(runner.results) < trials:
+        x = np.array([[spec.to_unit(r["config"][spec.name]) for spec in specs] for r in runner.results])
+        y = np.array([_objective(r, latency_weight) for r in runner.results])
+        cand = rng.random((2048, len(specs)))
+        ei = _gp_expected_improvement(x, y, cand)
+        configs = []
+        for i in np.argsort(-ei):
+            values = dict(base)
+            for spec, u in zip(specs, cand[i]):
+                values[spec.name] = spec.from_unit(float(u))
+            if values not in configs:
+                configs.append(values)
+            if len(configs) >= min(batch, trials - len(runner.results)):
+                break
+        if not runner.evaluate(configs):
+            break
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--param", action="append", required=True, metavar="FIELD=SPEC", help="Field to sweep")
+    parser.add_argument("--search", choices=("grid", "random", "bayes"), default="grid")
+    parser.add_argument("--trials", type=int, default=40, help="Configurations for random / bayes search")
+    parser.add_argument("--data-dir", default="data", help="Directory with .npz scenes")
+    parser.add_argument("--truth", default="data/measurements.csv", help="CSV with T-L/T-W/T-H ground truth")
+    parser.add_argument("--config", default="configs/config.yaml", help="Config with camera intrinsics")
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per scene and configuration")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-weight", type=float, default=0.01, help="Bayes objective: error % per ms")
+    parser.add_argument("--pick", default="min-error", help="min-error | min-latency | max-latency=MS | max-error=PCT")
+    parser.add_argument("--write", action="store_true", help="Write the picked config to src/config.py")
+    parser.add_argument("--out", default=None, help="Write all results and the Pareto front as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    defaults = DimsAlgoConfig()
+    specs = [parse_param(p, defaults) for p in args.param]
+    truth = load_truth(Path(args.truth))
+    scenes = [str(p) for p in sorted(Path(args.data_dir).glob("*.npz")) if p.stem in truth]
+    if not scenes:
+        raise SystemExit(f"No labelled scenes in {args.data_dir!s}")
+    rng = np.random.default_rng(args.seed)
+
+    runner = SweepRunner(args, scenes, truth)
+    t0 = time.perf_counter()
+    try:
+        if args.search == "grid":
+            search_grid(runner, specs)
+        elif args.search == "random":
+            search_random(runner, specs, args.trials, rng)
+        else:
+            search_bayes(runner, specs, args.trials, rng, args.latency_weight)
+    finally:
+        runner.close()
+    print(f"sweep finished in {time.perf_counter() - t0:.1f}s")
+
+    front = pareto_front(runner.results)
+    names = [spec.name for spec in specs]
+    print("Pareto front (error % vs latency):")
+    for r in front:
+        params = ", ".join(f"{n}={r['config'][n]}" for n in names)
+        print(f"  err {r['error_pct']:6.2f}%  {r['latency_ms']:8.1f}ms  {params}")
+
+    chosen = pick(front, args.pick)
+    if chosen is None:
+        print(f"No configuration satisfies --pick {args.pick}")
+    else:
+        print(f"picked ({args.pick}): {_diff(chosen['config'])}")
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps({
+            "search": args.search,
+            "params": names,
+            "scenes": [Path(s).stem for s in scenes],
+            "results": runner.results,
+            "pareto": front,
+            "picked": chosen,
+        }, indent=2), encoding="utf-8")
+        print(f"saved: {out}")
+
+    if args.write and chosen is not None:
+        write_config_values(chosen["config"])
+        print("Parameters saved to config.py.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import QObject, QThread  # noqa: E402
+
+from src.ui.viewmodels import app_controller  # noqa: E402
+from src.ui.viewmodels.app_controller import AppController  # noqa: E402
+
+
+def test_class_level_settings_are_saved_and_reset(monkeypatch):
+    written = []
+    monkeypatch.setattr(app_controller, "write_config_values", lambda values: written.append(values))
+    controller = AppController()
+    default = controller.get_defaults()["sd_thresh"]
+
+    controller.set_param("sd_thresh", "7")
+    assert controller.save_params()
+    assert written[0]["sd_thresh"] == 7
+    assert controller.get_defaults()["sd_thresh"] == 7
+
+    controller.set_param("sd_thresh", str(default + 1))
+    controller.reset_params()
+    assert controller._configs.cfg.sd_thresh == 7
+
+
+class _BusyWorker(QObject):
+    def run(self) -> None:
+        time.sleep(1.5)
+
+    def stop(self) -> None:
+        pass
+
+
+def test_stop_does_not_block_on_a_busy_stream_thread():
+    controller = AppController()
+    thread = QThread()
+    worker = _BusyWorker()
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    thread.start()
+    controller._thread, controller._worker = thread, worker
+
+    started = time.perf_counter()
+    controller._stop_stream()
+
+    assert time.perf_counter() - started < 1.4
+    assert controller._stopping == [(thread, worker)]
+    controller.shutdown()
+    assert thread.isFinished() and controller._stopping == []
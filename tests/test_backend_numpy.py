@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.core.backend import get_backend
+
+
+def _scene(seed: int = 0) -> np.ndarray:
+    """Two well-separated blobs, a flat patch and scattered noise."""
+    rng = np.random.default_rng(seed)
+    a = rng.normal([0.0, 0.0, 500.0], 4.0, size=(800, 3))
+    b = rng.normal([80.0, 0.0, 500.0], 4.0, size=(600, 3))
+    patch = np.column_stack([rng.uniform(-50, 50, 1000), rng.uniform(60, 160, 1000), np.full(1000, 520.0)])
+    noise = rng.uniform([-100, -100, 400], [200, 200, 600], size=(60, 3))
+    return np.concatenate([a, b, patch, noise])
+
+
+def _rows(points: np.ndarray) -> np.ndarray:
+    return points[np.lexsort(points.T[::-1])]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_backend("nope")
+
+
+def test_segment_plane_finds_patch():
+    pts = _scene()[1400:2400]
+    plane = get_backend("numpy").segment_plane(pts, dist_thresh=1.0, ransac_n=3, iters=200, seed=0)
+
+    plane = plane / np.linalg.norm(plane[:3]) * np.sign(plane[2])
+    np.testing.assert_allclose(plane, [0.0, 0.0, 1.0, -520.0], atol=1e-6)
+
+
+def test_dbscan_labels_blobs():
+    labels = get_backend("numpy").cluster_dbscan(_scene()[:1400], eps=3.0, min_points=5)
+
+    main_a = np.bincount(labels[:800][labels[:800] >= 0]).argmax()
+    main_b = np.bincount(labels[800:][labels[800:] >= 0]).argmax()
+    assert main_a != main_b
+    assert (labels[:800] == main_a).mean() > 0.9
+    assert (labels[800:] == main_b).mean() > 0.9
+
+
+class TestMatchesOpen3D:
+    @pytest.fixture(autouse=True)
+    def _backends(self):
+        pytest.importorskip("open3d")
+        self.np_backend = get_backend("numpy")
+        self.o3d_backend = get_backend("open3d")
+
+    def test_voxel_down_sample(self):
+        pts = _scene()
+        for voxel in (1.0, 5.0):
+            ours = self.np_backend.voxel_down_sample(pts, voxel)
+            ref = self.o3d_backend.voxel_down_sample(pts, voxel)
+            assert ours.shape == ref.shape
+            np.testing.assert_allclose(_rows(ours), _rows(ref), atol=1e-9)
+
+    def test_statistical_outlier_mask(self):
+        pts = _scene()
+        np.testing.assert_array_equal(
+            self.np_backend.statistical_outlier_mask(pts, 20, 2.0),
+            self.o3d_backend.statistical_outlier_mask(pts, 20, 2.0),
+        )
+
+    def test_radius_outlier_mask(self):
+        pts = _scene()
+        np.testing.assert_array_equal(
+            self.np_backend.radius_outlier_mask(pts, 5.0, 5),
+            self.o3d_backend.radius_outlier_mask(pts, 5.0, 5),
+        )
+
+    def test_dbscan_same_partition(self):
+        pts = _scene()[:1400]
+        ours = self.np_backend.cluster_dbscan(pts, eps=3.0, min_points=5)
+        ref = self.o3d_backend.cluster_dbscan(pts, eps=3.0, min_points=5)
+
+        np.testing.assert_array_equal(ours < 0, ref < 0)
+        # Same clusters up to numbering.
+        pairs = np.unique(np.column_stack([ours, ref])[ours >= 0], axis=0)
+        assert np.unique(pairs[:, 0]).size == np.unique(pairs[:, 1]).size == pairs.shape[0]
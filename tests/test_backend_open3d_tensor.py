@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+pytest.importorskip("open3d")
+
+from src.core.backend import get_backend  # noqa: E402
+
+
+def _scene(seed: int = 0) -> np.ndarray:
+    # Quarter-millimeter coordinates are exact in float32, so both grids bin every point alike.
+    rng = np.random.default_rng(seed)
+    return (rng.integers([-400, -400, 1600], [400, 400, 2400], size=(5000, 3)) / 4.0).astype(np.float32)
+
+
+def _rows(points: np.ndarray) -> np.ndarray:
+    return points[np.lexsort(points.T[::-1])]
+
+
+@pytest.mark.parametrize("voxel", [1.0, 5.0, 7.5])
+def test_voxel_down_sample_uses_the_legacy_grid(voxel):
+    pts = _scene()
+    ours = get_backend("open3d_tensor").voxel_down_sample(pts, voxel)
+    ref = get_backend("open3d").voxel_down_sample(pts, voxel)
+
+    assert ours.shape == ref.shape
+    np.testing.assert_allclose(_rows(ours), _rows(ref), atol=1e-3)
+
+
+def test_radius_outlier_mask_matches_legacy():
+    pts = _scene()
+    np.testing.assert_array_equal(
+        get_backend("open3d_tensor").radius_outlier_mask(pts, 8.0, 3),
+        get_backend("open3d").radius_outlier_mask(pts, 8.0, 3),
+    )
+
+
+def test_read_only_input():
+    pts = _scene()
+    pts.flags.writeable = False
+    mask = get_backend("open3d_tensor").statistical_outlier_mask(pts, 10, 2.0)
+
+    assert mask.shape == (pts.shape[0],) and mask.dtype == np.bool_
+    assert get_backend("open3d_tensor").voxel_down_sample(pts[:0], 5.0).shape == (0, 3)
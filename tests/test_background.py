@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.acquisition.replay import ReplaySource
+from src.app_types import PointCloud
+from src.config import DimsAlgoConfig
+from src.core.background import BackgroundModel, BackgroundState
+from src.core.pipeline import Pipeline
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _scene(z: np.ndarray) -> np.ndarray:
+    h, w = z.shape
+    v, u = np.mgrid[0:h, 0:w].astype(np.float64)
+    return np.stack([u, v, z], axis=-1)
+
+
+def _learned_model(frames: int = 4) -> BackgroundModel:
+    model = BackgroundModel((8, 8), target_frames=frames)
+    for i in range(frames):
+        z = np.full((8, 8), 500.0 + (-1.0) ** i)  # 501 / 499 alternating around 500
+        z[0, 0] = 0.0  # never valid
+        model.accumulate(_scene(z))
+    model.finalize(np.array([0.0, 0.0, 1.0, -500.0]))
+    return model
+
+
+def test_learning_tracks_mean_and_std():
+    model = _learned_model()
+
+    assert model.learned and model.is_ready
+    assert model.state == BackgroundState.READY
+    known = model.known_mask()
+    assert not known[0, 0] and known.sum() == 63
+    np.testing.assert_allclose(model.mean_points()[:, 2], 500.0)
+    np.testing.assert_allclose(model.std()[known], np.std([499.0, 501.0] * 2, ddof=1))
+
+
+def test_foreground_is_closer_than_background():
+    model = _learned_model()
+    z = np.full((8, 8), 500.0)
+    z[4, 4] = 480.0  # object on the table
+    z[5, 5] = 498.0  # within noise
+    valid = z > 0
+
+    fg = model.foreground_mask(z, valid, k_sigma=3.0, min_diff=5.0)
+
+    # The never-seen pixel is left to the height filter.
+    assert fg[4, 4] and fg[0, 0]
+    assert fg.sum() == 2
+
+
+def test_model_turns_stale_when_depth_moves_away():
+    model = _learned_model()
+    z = np.full((8, 8), 500.0)
+    valid = z > 0
+
+    assert not model.update_staleness(z, valid, 3.0, 5.0, max_ratio=0.2)
+    assert model.state == BackgroundState.READY
+
+    z[:4] = 540.0
+    assert model.update_staleness(z, valid, 3.0, 5.0, max_ratio=0.2)
+    assert model.state == BackgroundState.STALE
+    assert model.stale_ratio > 0.2
+
+
+def _mouse_frame() -> PointCloud:
+    return ReplaySource(data_dir=ROOT / "data" / "mouse.npz", config_path=ROOT / "configs" / "config.yaml", loop=False).read()
+
+
+def test_stale_model_keeps_the_stage_cache():
+    frame = _mouse_frame()
+    pipe = Pipeline(DimsAlgoConfig(backend="numpy"))
+    pipe._background = _learned_model()
+    pipe._background.state = BackgroundState.STALE
+
+    pipe.measure(frame)
+    pipe.measure(frame)
+
+    assert pipe.background_state == BackgroundState.STALE
+    assert pipe.recomputed == ()
+
+
+def test_learning_rejects_unorganized_frames():
+    frame = _mouse_frame()
+    cropped = PointCloud(points=np.asarray(frame.points)[::2], intrinsics=frame.intrinsics, depth_scale=frame.depth_scale)
+    pipe = Pipeline(DimsAlgoConfig(backend="numpy"))
+    pipe.learn_background()
+
+    with pytest.raises(ValueError):
+        pipe.measure(cropped)
+    assert pipe.background_state == BackgroundState.OFF
+    assert not np.isnan(pipe.measure(cropped).length)
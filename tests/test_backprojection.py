@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+import numpy as np
+
+from src.acquisition.backprojection import DepthBackprojector, _undistort_normalized
+from src.app_types import Distortion, Intrinsics
+
+INTR = Intrinsics(fx=500.0, fy=510.0, cx=3.5, cy=2.5, width=8, height=6)
+
+
+def _distort(x: np.ndarray, y: np.ndarray, d: Distortion) -> tuple[np.ndarray, np.ndarray]:
+    r2 = x * x + y * y
+    radial = (1 + r2 * (d.k1 + r2 * (d.k2 + r2 * d.k3))) / (1 + r2 * (d.k4 + r2 * (d.k5 + r2 * d.k6)))
+    return (
+        x * radial + 2 * d.p1 * x * y + d.p2 * (r2 + 2 * x * x),
+        y * radial + d.p1 * (r2 + 2 * y * y) + 2 * d.p2 * x * y,
+    )
+
+
+def test_organized_output_matches_the_pinhole_model():
+    depth = np.arange(1, 49, dtype=np.uint16).reshape(6, 8)
+    points = DepthBackprojector().backproject(depth, INTR, depth_scale=0.5, organized=True)
+
+    v, u = np.mgrid[0:6, 0:8]
+    z = depth * 0.5
+    expected = np.stack([(u - INTR.cx) / INTR.fx * z, (v - INTR.cy) / INTR.fy * z, z], axis=-1).reshape(-1, 3)
+    assert points.dtype == np.float32
+    np.testing.assert_allclose(points, expected, rtol=1e-6)
+
+
+def test_zero_depth_is_dropped_or_kept_as_origin():
+    depth = np.full((6, 8), 1000, dtype=np.uint16)
+    depth[1, 2] = depth[4, 7] = 0
+    bp = DepthBackprojector()
+
+    organized = bp.backproject(depth, INTR, organized=True)
+    sparse = bp.backproject(depth, INTR)
+
+    assert organized.shape == (48, 3) and not organized[[10, 39]].any()
+    np.testing.assert_array_equal(sparse, np.delete(organized, [10, 39], axis=0))
+
+
+def test_ray_table_is_built_once_per_camera_model():
+    bp = DepthBackprojector()
+    dist = Distortion(k1=0.1)
+    rays = bp.rays(INTR)
+
+    assert bp.rays(replace(INTR)) is rays  # keyed by value, not identity
+    assert bp.rays(INTR, dist) is not rays and bp.rays(INTR, dist) is bp.rays(INTR, dist)
+    assert not rays.flags.writeable
+    # Backprojecting reads the table without writing through it.
+    bp.backproject(np.ones((6, 8), dtype=np.uint16), INTR, depth_scale=2.0)
+    np.testing.assert_array_equal(rays[:, 2], 1.0)
+
+
+def test_undistortion_inverts_the_distortion_model():
+    dist = Distortion(k1=-0.3, k2=0.1, p1=0.002, p2=-0.001)
+    x, y = np.meshgrid(np.linspace(-0.5, 0.5, 7), np.linspace(-0.4, 0.4, 5))
+    xd, yd = _distort(x, y, dist)
+
+    ux, uy = _undistort_normalized(xd, yd, dist)
+
+    np.testing.assert_allclose(ux, x, atol=1e-6)
+    np.testing.assert_allclose(uy, y, atol=1e-6)
+    rays = DepthBackprojector().rays(INTR, dist)
+    assert not np.allclose(rays, DepthBackprojector().rays(INTR))
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.config import DimsAlgoConfig
+from src.core.pipeline import Pipeline
+from src.utility.benchmark import bench_scene, compare_reports
+
+ROOT = Path(__file__).resolve().parents[1]
+TRUTH = {"length": 100.0, "width": 50.0, "height": 20.0}
+
+
+def _scene(p50: float, err: float) -> dict:
+    return {"latency_ms": {"p50": p50}, "error_pct": {dim: err for dim in TRUTH}}
+
+
+def test_failing_scene_is_recorded_not_raised():
+    pipe = Pipeline(DimsAlgoConfig(backend="numpy", outlier_method="bogus"))
+    scene = bench_scene(pipe, ROOT / "data" / "mouse.npz", ROOT / "configs" / "config.yaml", 1, 0, TRUTH)
+
+    assert scene["failed"].startswith("ValueError")
+    assert "latency_ms" not in scene
+    assert all(v != v for v in scene["error_pct"].values())  # NaN
+
+
+def test_compare_flags_new_failures_only():
+    failed = {"failed": "ValueError: Plane segmentation failed"}
+    base = {"scenes": {"a": _scene(10.0, 1.0), "b": failed, "c": _scene(10.0, 1.0)}, "aggregate": {}}
+    new = {"scenes": {"a": failed, "b": _scene(10.0, 1.0), "c": _scene(10.5, 1.2)}, "aggregate": {}}
+
+    regressions = compare_reports(base, new, latency_tol=0.1, error_tol=0.5)
+
+    assert regressions == ["a: failed (ValueError: Plane segmentation failed)"]
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.core.clustering import grid_components, largest_label
+
+
+def _blob(center: tuple[float, float, float], n: int, rng: np.random.Generator) -> np.ndarray:
+    return np.asarray(center) + rng.uniform(-10.0, 10.0, size=(n, 3))
+
+
+def test_grid_components_separates_blobs_and_noise():
+    rng = np.random.default_rng(0)
+    a = _blob((0.0, 0.0, 0.0), 300, rng)
+    b = _blob((100.0, 0.0, 0.0), 200, rng)
+    stray = np.array([[50.0, 200.0, 0.0]])
+    labels = grid_components(np.concatenate([a, b, stray]), cell=5.0, min_points=10)
+
+    assert np.unique(labels[:300]).size == 1
+    assert np.unique(labels[300:500]).size == 1
+    assert labels[0] != labels[300]
+    assert labels[0] >= 0 and labels[300] >= 0
+    assert labels[-1] == -1
+
+
+def test_grid_components_joins_touching_cells():
+    # A line of points one cell apart is one component under 26-connectivity.
+    line = np.column_stack([np.arange(0.0, 100.0, 4.0), np.zeros(25), np.zeros(25)])
+    labels = grid_components(np.repeat(line, 4, axis=0), cell=5.0, min_points=4)
+
+    assert (labels == 0).all()
+
+
+def test_grid_components_empty_input():
+    assert grid_components(np.empty((0, 3)), cell=5.0, min_points=3).shape == (0,)
+    assert (grid_components(np.zeros((4, 3)), cell=0.0, min_points=3) == -1).all()
+
+
+def test_largest_label():
+    assert largest_label(np.array([-1, 0, 1, 1, -1, 2])) == 1
+    assert largest_label(np.array([0, 1])) == 0
+    assert largest_label(np.array([-1, -1])) is None
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from src.config import DimsAlgoConfig
+from src.config_store import ConfigStore
+
+
+def test_update_publishes_a_new_version():
+    store = ConfigStore(DimsAlgoConfig(voxel_size=1.0))
+    before = store.current()
+
+    after = store.update({"voxel_size": 2.0, "use_dbscan": False})
+
+    assert (before.version, after.version) == (0, 1)
+    assert store.current() is after and store.version == 1
+    assert (after.cfg.voxel_size, after.cfg.use_dbscan) == (2.0, False)
+
+
+def test_snapshots_are_not_modified_by_later_updates():
+    cfg = DimsAlgoConfig()
+    store = ConfigStore(cfg)
+    snapshot = store.current()
+
+    store.update({"voxel_size": 7.0})
+    cfg.voxel_size = 9.0
+
+    assert snapshot.cfg.voxel_size == DimsAlgoConfig().voxel_size
+    assert store.cfg.voxel_size == 7.0
+    assert snapshot.cfg is not store.cfg
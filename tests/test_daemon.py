@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from src.acquisition.replay import ReplaySource
+from src.app.daemon import MeasureServer, MeasureService, request
+from src.config import DimsAlgoConfig
+from src.core.pipeline import Pipeline
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class _GatedSource:
+    """Replay whose reads wait for the test, so requests can pile up behind one frame."""
+
+    def __init__(self) -> None:
+        self.source = ReplaySource(data_dir=ROOT / "data" / "mouse.npz", config_path=ROOT / "configs" / "config.yaml")
+        self.gate = threading.Semaphore(0)
+
+    def read(self):
+        self.gate.acquire(timeout=30)
+        return self.source.read()
+
+    def close(self) -> None:
+        self.source.close()
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    source = _GatedSource()
+    service = MeasureService(source, Pipeline(DimsAlgoConfig()))
+    path = tmp_path / "d.sock"
+    server = MeasureServer(path, service)
+    service.start()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield path, service, source.gate
+    server.shutdown()
+    server.server_close()
+    service.stop()
+    thread.join()
+
+
+def _wait_for(predicate, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_ping_and_unknown_op(daemon):
+    path, _, _ = daemon
+
+    assert request(path, {"id": 1, "op": "ping"}) == {"id": 1, "ok": True}
+    reply = request(path, {"id": 2, "op": "bogus"})
+    assert reply == {"id": 2, "ok": False, "error": "ValueError: unknown op 'bogus'"}
+
+
+def test_measure_and_coalesced_requests(daemon):
+    path, service, gate = daemon
+    gate.release()
+    first = request(path, {"id": 1, "op": "measure"})
+    assert first["ok"] and first["frame"] == 1 and first["coalesced"] == 1
+    assert first["dims"]["length"] > 0 and first["dims"]["units"] == "mm"
+    assert {"queue_ms", "read_ms", "process_ms", "total_ms", "stages_ms"} <= first["timing"].keys()
+
+    with ThreadPoolExecutor(3) as pool:
+        # The measurement thread blocks reading for the first of these, so the other two queue up.
+        blocked = pool.submit(request, path, {"id": 2})
+        _wait_for(lambda: service.requests == 2 and not service._pending)
+        pair = [pool.submit(request, path, {"id": i}) for i in (3, 4)]
+        _wait_for(lambda: len(service._pending) == 2)
+        gate.release()
+        gate.release()
+        replies = [blocked.result(timeout=30)] + [f.result(timeout=30) for f in pair]
+
+    assert [r["id"] for r in replies] == [2, 3, 4]
+    assert (replies[0]["frame"], replies[0]["coalesced"]) == (2, 1)
+    assert [(r["frame"], r["coalesced"]) for r in replies[1:]] == [(3, 2), (3, 2)]
+    assert replies[1]["dims"] == replies[2]["dims"]
+    assert request(path, {"op": "stats"})["frames"] == 3
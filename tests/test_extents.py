@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from src.core.extents import convex_hull_2d, min_area_rect, select_quantile
+
+
+def _rotated_rect_points(length: float, width: float, angle: float, rng: np.random.Generator) -> np.ndarray:
+    local = rng.uniform([-length / 2, -width / 2], [length / 2, width / 2], size=(500, 2))
+    corners = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]]) * [length / 2, width / 2]
+    c, s = math.cos(angle), math.sin(angle)
+    return np.concatenate([local, corners]) @ np.array([[c, s], [-s, c]]) + [30.0, -12.0]
+
+
+def test_select_quantile_matches_numpy():
+    v = np.random.default_rng(0).normal(size=101)
+    for q in (0.0, 0.02, 0.5, 0.98, 1.0):
+        assert select_quantile(v.copy(), q) == np.quantile(v, q)
+
+
+def test_convex_hull_of_square_with_interior_points():
+    rng = np.random.default_rng(1)
+    square = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])
+    # Enough points to go through the octagon prefilter, plus a duplicate corner.
+    xy = np.concatenate([rng.uniform(0.1, 0.9, size=(200, 2)), square, square[:1]])
+    hull = convex_hull_2d(xy)
+
+    assert hull.shape == (4, 2)
+    assert {tuple(p) for p in hull} == {tuple(p) for p in square}
+    # Counter-clockwise: positive signed area.
+    x, y = hull[:, 0], hull[:, 1]
+    assert np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)) > 0
+
+
+def test_min_area_rect_of_rotated_rectangle():
+    pts = _rotated_rect_points(120.0, 40.0, math.radians(30.0), np.random.default_rng(2))
+    length, width, angle = min_area_rect(convex_hull_2d(pts))
+
+    assert math.isclose(length, 120.0, rel_tol=1e-9)
+    assert math.isclose(width, 40.0, rel_tol=1e-9)
+    # The long side's direction, up to orientation.
+    assert math.isclose(math.cos(angle - math.radians(30.0)) ** 2, 1.0, rel_tol=1e-9)
+
+
+def test_min_area_rect_degenerate_hulls():
+    assert min_area_rect(np.empty((0, 2))) == (0.0, 0.0, 0.0)
+    length, width, _ = min_area_rect(np.array([[0.0, 0.0], [3.0, 4.0]]))
+    assert (length, width) == (5.0, 0.0)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import threading
+
+from src.ui.app_state import DropPolicy
+from src.ui.services.frame_ring import FrameRing
+
+
+def test_latest_policy_skips_to_newest():
+    ring = FrameRing(capacity=2, policy=DropPolicy.LATEST)
+
+    assert ring.put(1) is True
+    assert ring.put(2) is False
+    assert ring.put(3) is False  # full: drops 1
+
+    assert ring.get_nowait() == 3
+    assert ring.dropped == 2
+    assert ring.get_nowait() is None
+
+
+def test_drop_oldest_policy_is_fifo():
+    ring = FrameRing(capacity=2, policy=DropPolicy.DROP_OLDEST)
+    for item in (1, 2, 3):
+        ring.put(item)
+
+    assert [ring.get_nowait(), ring.get_nowait()] == [2, 3]
+    assert ring.dropped == 1
+
+
+def test_blocking_put_waits_for_space():
+    ring = FrameRing(capacity=1, policy=DropPolicy.DROP_OLDEST)
+    ring.put(1)
+    producer = threading.Thread(target=ring.put, args=(2,), kwargs={"block": True})
+    producer.start()
+    producer.join(0.05)
+    assert producer.is_alive()
+
+    assert ring.get(timeout=1.0) == 1
+    producer.join(1.0)
+    assert not producer.is_alive()
+    assert ring.get(timeout=1.0) == 2
+    assert ring.dropped == 0
+
+
+def test_close_drains_then_returns_none():
+    ring = FrameRing(capacity=2, policy=DropPolicy.DROP_OLDEST)
+    ring.put(1)
+    ring.close()
+
+    assert ring.put(2) is False
+    assert ring.closed
+    assert ring.get(timeout=1.0) == 1
+    assert ring.get(timeout=1.0) is None
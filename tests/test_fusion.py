@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.acquisition.replay import ReplaySource
+from src.config import DimsAlgoConfig
+from src.core.fusion import VoxelFusion
+from src.core.pipeline import Pipeline
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_insert_averages_points_per_voxel():
+    fusion = VoxelFusion(voxel_size=2.0, max_voxels=100)
+    fusion.insert(np.array([[0.5, 0.5, 0.5], [1.5, 1.5, 1.5], [-0.5, 0.0, 0.0]]))
+    fusion.insert(np.array([[1.0, 1.0, 1.0]]))
+
+    assert fusion.frames == 2
+    assert len(fusion) == 2
+    pts = fusion.points()
+    np.testing.assert_allclose(pts[np.argsort(pts[:, 0])], [[-0.5, 0.0, 0.0], [1.0, 1.0, 1.0]])
+
+
+def test_points_require_min_hits():
+    fusion = VoxelFusion(voxel_size=1.0, max_voxels=100)
+    stable = np.array([[0.5, 0.5, 0.5], [5.5, 0.5, 0.5]])
+    for speckle in ([[20.5, 0, 0]], [[30.5, 0, 0]], [[40.5, 0, 0]]):
+        fusion.insert(np.concatenate([stable, speckle]))
+
+    assert len(fusion.points(1)) == 5
+    np.testing.assert_allclose(np.sort(fusion.points(2)[:, 0]), [0.5, 5.5])
+
+
+def test_negative_coordinates_do_not_collide():
+    fusion = VoxelFusion(voxel_size=1.0, max_voxels=100)
+    fusion.insert(np.array([[-0.5, -0.5, -0.5], [0.5, 0.5, 0.5], [-0.5, 0.5, -0.5]]))
+
+    assert len(fusion) == 3
+
+
+def test_eviction_keeps_most_frequent_voxels():
+    fusion = VoxelFusion(voxel_size=1.0, max_voxels=2)
+    fusion.insert(np.array([[0.5, 0.5, 0.5], [1.5, 0.5, 0.5]]))
+    fusion.insert(np.array([[0.5, 0.5, 0.5], [1.5, 0.5, 0.5], [2.5, 0.5, 0.5]]))
+
+    assert len(fusion) == 2
+    np.testing.assert_allclose(np.sort(fusion.points()[:, 0]), [0.5, 1.5])
+
+
+def test_empty_frames_still_count():
+    fusion = VoxelFusion(voxel_size=1.0, max_voxels=10)
+    fusion.insert(np.empty((0, 3)))
+
+    assert fusion.frames == 1 and len(fusion) == 0
+    with pytest.raises(ValueError):
+        VoxelFusion(voxel_size=0.0, max_voxels=10)
+
+
+def test_pipeline_fuses_a_repeated_frame_once():
+    frame = ReplaySource(data_dir=ROOT / "data" / "mouse.npz", config_path=ROOT / "configs" / "config.yaml", loop=False).read()
+    pipe = Pipeline(DimsAlgoConfig(backend="numpy"))
+    pipe.begin_fusion()
+    pipe.measure(frame)  # locks the plane and inserts the frame
+    pipe.measure(frame)
+
+    assert pipe.fusion_frames == 1
+    assert pipe.fusion_stalled
+    dims, obj = pipe.finish_fusion()
+    assert obj.shape[0] > 0 and not np.isnan(dims.length)
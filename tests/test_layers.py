@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.core.layers import LayerViews, ViewLayer
+
+
+def test_layers_are_gathered_on_first_read_and_cached():
+    base = np.arange(30, dtype=np.float64).reshape(10, 3)
+    mask = np.zeros(10, dtype=bool)
+    mask[[1, 4, 7]] = True
+    views = LayerViews()
+    views.set(ViewLayer.RAW, base)
+    views.set(ViewLayer.TABLE, base, mask)
+    views.set(ViewLayer.OBJECT, base, np.array([2, 3]))
+
+    assert views.count(ViewLayer.TABLE) == 3 and views.count(ViewLayer.OBJECT) == 2
+    assert views[ViewLayer.RAW] is base
+    table = views[ViewLayer.TABLE]
+    np.testing.assert_array_equal(table, base[mask])
+    assert views[ViewLayer.TABLE] is table
+    np.testing.assert_array_equal(views[ViewLayer.OBJECT], base[[2, 3]])
+
+
+def test_factories_run_once_and_only_when_read():
+    calls = []
+    views = LayerViews()
+    views.set_lazy(ViewLayer.FILTERED, lambda: calls.append(1) or np.zeros((4, 3)))
+
+    assert ViewLayer.FILTERED in views and calls == []
+    assert views.count(ViewLayer.FILTERED) == 4
+    views[ViewLayer.FILTERED]
+    assert calls == [1]
+
+
+def test_replacing_a_layer_drops_its_cached_points():
+    base = np.arange(12, dtype=np.float64).reshape(4, 3)
+    views = LayerViews()
+    views.set(ViewLayer.OBJECT, base, np.array([0]))
+    views[ViewLayer.OBJECT]
+    views.set(ViewLayer.OBJECT, base, np.array([1, 2]))
+    assert views[ViewLayer.OBJECT].shape == (2, 3)
+
+    views.set_lazy(ViewLayer.OBJECT, lambda: base[:1])
+    assert views[ViewLayer.OBJECT].shape == (1, 3) and len(views) == 1
+
+
+def test_requested_limits_the_layers_kept():
+    base = np.zeros((5, 3))
+    views = LayerViews([ViewLayer.OBJECT])
+    views.set(ViewLayer.RAW, base)
+    views.set_lazy(ViewLayer.FILTERED, lambda: base)
+    views.set(ViewLayer.OBJECT, base)
+
+    assert list(views) == [ViewLayer.OBJECT]
+    assert not views.wants(ViewLayer.RAW) and not LayerViews(()).wants(ViewLayer.OBJECT)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.app_types import Intrinsics
+from src.core.organized import as_grid, block_decimate, block_size_for_voxel, neighborhood_outlier_mask
+
+
+def _plane_grid(h: int = 24, w: int = 32, z: float = 500.0, fx: float = 500.0) -> np.ndarray:
+    v, u = np.mgrid[0:h, 0:w].astype(np.float64)
+    grid = np.empty((h, w, 3), dtype=np.float64)
+    grid[..., 0] = (u - w / 2) * z / fx
+    grid[..., 1] = (v - h / 2) * z / fx
+    grid[..., 2] = z
+    return grid
+
+
+def test_as_grid_is_a_view_only_for_full_frames():
+    intr = Intrinsics(fx=500.0, fy=500.0, cx=16.0, cy=12.0, width=32, height=24)
+    points = _plane_grid().reshape(-1, 3)
+
+    grid = as_grid(points, intr)
+    assert grid.shape == (24, 32, 3)
+    assert np.shares_memory(grid, points)
+    assert as_grid(points[:-1], intr) is None
+
+
+def test_block_decimate_averages_valid_points_per_tile():
+    grid = np.arange(4 * 4 * 3, dtype=np.float64).reshape(4, 4, 3)
+    valid = np.ones((4, 4), dtype=bool)
+    valid[0, 0] = False
+    valid[2:, 2:] = False
+
+    out, ok = block_decimate(grid, valid, 2)
+
+    assert out.shape == (2, 2, 3)
+    np.testing.assert_array_equal(ok, [[True, True], [True, False]])
+    np.testing.assert_allclose(out[0, 0], grid[[0, 1, 1], [1, 0, 1]].mean(axis=0))
+    np.testing.assert_allclose(out[1, 0], grid[2:, :2].reshape(-1, 3).mean(axis=0))
+
+
+def test_block_size_matches_voxel_footprint():
+    grid = _plane_grid(z=500.0)
+    valid = np.ones(grid.shape[:2], dtype=bool)
+    # One pixel spans 1 mm at 500 mm with fx = 500.
+    assert block_size_for_voxel(grid, valid, 4.0, 500.0) == 4
+    assert block_size_for_voxel(grid, valid, 0.0, 500.0) == 1
+
+
+def test_neighborhood_filter_drops_flying_pixel():
+    grid = _plane_grid()
+    valid = np.ones(grid.shape[:2], dtype=bool)
+    valid[0, :] = False
+    grid[10, 10, 2] = 800.0
+
+    keep = neighborhood_outlier_mask(grid, valid, radius=2, std_ratio=2.0, fx=500.0)
+
+    assert not keep[10, 10]
+    assert not keep[0].any()
+    assert keep[1:].sum() == valid[1:].sum() - 1
+
+
+def test_neighborhood_filter_tolerance_scales_with_focal_length():
+    # A 6 mm step is within two pixel pitches of a 4x decimated grid (fx / 4)
+    # but not of the full-resolution one.
+    grid = _plane_grid(fx=125.0)
+    grid[10, 10, 2] += 6.0
+    valid = np.ones(grid.shape[:2], dtype=bool)
+
+    assert neighborhood_outlier_mask(grid, valid, radius=1, std_ratio=2.0, fx=125.0)[10, 10]
+    assert not neighborhood_outlier_mask(grid, valid, radius=1, std_ratio=2.0, fx=500.0)[10, 10]
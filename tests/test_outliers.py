@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.config import DimsAlgoConfig
+from src.core.backend_numpy import radius_outlier_mask
+from src.core.outliers import voxel_occupancy_mask
+from src.core.pipeline import Pipeline
+
+
+def test_voxel_mask_drops_isolated_points():
+    rng = np.random.default_rng(0)
+    cluster = rng.normal([0.0, 0.0, 500.0], 2.0, size=(300, 3))
+    strays = np.array([[60.0, 0.0, 500.0], [0.0, -70.0, 480.0]])
+    mask = voxel_occupancy_mask(np.concatenate([cluster, strays]), voxel_size=5.0, min_points=5)
+
+    assert mask[:300].all()
+    assert not mask[300:].any()
+
+
+def test_voxel_mask_keeps_what_the_radius_filter_keeps():
+    pts = np.random.default_rng(1).uniform(0.0, 200.0, size=(4000, 3))
+    for radius, min_points in ((5.0, 1), (10.0, 5)):
+        radius_keep = radius_outlier_mask(pts, radius, min_points)
+        voxel_keep = voxel_occupancy_mask(pts, radius, min_points)
+        assert not (radius_keep & ~voxel_keep).any()
+
+
+def test_voxel_mask_empty():
+    assert voxel_occupancy_mask(np.empty((0, 3)), 5.0, 3).shape == (0,)
+
+
+def test_organized_object_scope_uses_the_grid_test():
+    # An unknown backend raises if the KD-tree filter is reached.
+    pipe = Pipeline(DimsAlgoConfig(organized=True, outlier_scope="object", backend="none", nb_neighbors=8))
+    v, u = np.mgrid[0:20, 0:20].astype(np.float64)
+    grid = np.stack([u - 10.0, v - 10.0, np.full((20, 20), 500.0)], axis=-1)
+    grid[5, 5, 2] = 300.0  # flying pixel among the candidates
+    valid = np.ones((20, 20), dtype=bool)
+    valid[0] = False
+    pts = grid[valid]
+    # Candidates: the 10x10 block at rows 2..11, cols 2..11 (row 0 is not in ``pts``).
+    candidate_idx = np.flatnonzero((v[valid] >= 2) & (v[valid] < 12) & (u[valid] >= 2) & (u[valid] < 12))
+
+    kept = pipe._object_outliers(pts, candidate_idx, (grid, valid, 1), fx=500.0)
+
+    flying = int(np.flatnonzero((v[valid] == 5) & (u[valid] == 5))[0])
+    assert flying in candidate_idx and flying not in kept
+    assert kept.size == candidate_idx.size - 1
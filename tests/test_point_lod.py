@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.ui.app_state import LodMethod
+from src.ui.services.point_lod import EMPTY_RENDER, prepare_points
+
+
+def test_stride_keeps_the_budget_and_centers_float32():
+    points = np.random.default_rng(0).uniform(-50, 50, size=(1000, 3)) + [0.0, 0.0, 800.0]
+    render = prepare_points(points, 300)
+
+    assert render.total == 1000 and render.pos.shape[0] <= 300
+    assert render.pos.dtype == np.float32
+    np.testing.assert_allclose(render.pos.mean(axis=0), 0.0, atol=1e-3)
+    np.testing.assert_allclose(render.center, points[::4].mean(axis=0), rtol=1e-5)
+
+
+def test_voxel_lod_spreads_points_over_the_extent():
+    rng = np.random.default_rng(1)
+    # A dense blob and a sparse sheet: striding would keep mostly the blob.
+    blob = rng.normal([0.0, 0.0, 800.0], 1.0, size=(9000, 3))
+    sheet = np.column_stack([rng.uniform(-100, 100, (1000, 2)), np.full(1000, 800.0)])
+    render = prepare_points(np.concatenate([blob, sheet]), 500, LodMethod.VOXEL)
+
+    assert render.pos.shape[0] <= 500
+    from_sheet = np.abs(render.pos[:, :2] + render.center[:2]).max(axis=1) > 10.0
+    assert from_sheet.mean() > 0.5
+
+
+def test_small_clouds_are_kept_and_non_finite_points_dropped():
+    points = np.array([[0.0, 0.0, 1.0], [np.nan, 0.0, 1.0], [2.0, 0.0, 1.0]])
+    render = prepare_points(points, 100, LodMethod.VOXEL)
+
+    assert render.total == 3
+    np.testing.assert_allclose(render.pos + render.center, points[[0, 2]])
+
+
+def test_empty_inputs():
+    assert prepare_points(None, 100) is EMPTY_RENDER
+    assert prepare_points(np.empty((0, 3)), 100) is EMPTY_RENDER
+    render = prepare_points(np.full((4, 3), np.inf), 100)
+    assert render.pos.shape == (0, 3) and render.total == 4
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.core.ransac import _planes_from_samples, fit_plane_lstsq, ransac_planes
+
+
+def _same_plane(a: np.ndarray, b: np.ndarray) -> bool:
+    # [a, b, c, d] and its negation describe the same plane.
+    return np.allclose(a, b, atol=1e-3) or np.allclose(a, -b, atol=1e-3)
+
+
+def _table_with_box(rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Noisy table z = 800 (camera looking down), a box top at z = 700 and scattered outliers."""
+    table = np.column_stack([rng.uniform(-200, 200, 6000), rng.uniform(-200, 200, 6000), np.full(6000, 800.0)])
+    table[:, 2] += rng.normal(0.0, 0.5, 6000)
+    box = np.column_stack([rng.uniform(-40, 40, 2000), rng.uniform(-40, 40, 2000), np.full(2000, 700.0)])
+    noise = rng.uniform([-200, -200, 600], [200, 200, 800], size=(500, 3))
+    return table, box, noise
+
+
+def test_fit_plane_lstsq_recovers_tilted_plane():
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(-100, 100, size=(200, 2))
+    n = np.array([0.1, -0.2, 1.0]) / np.linalg.norm([0.1, -0.2, 1.0])
+    z = (-300.0 - n[0] * xy[:, 0] - n[1] * xy[:, 1]) / n[2]
+    plane = fit_plane_lstsq(np.column_stack([xy, z]))
+
+    assert _same_plane(plane, np.array([*n, 300.0]))
+
+
+def test_ransac_finds_each_candidate_plane():
+    table, box, noise = _table_with_box(np.random.default_rng(1))
+    points = np.concatenate([table, box, noise])
+    table_idx = np.concatenate([np.arange(6000), np.arange(8000, 8500)])
+    box_idx = np.arange(6000, 8000)
+
+    planes = ransac_planes(points, [table_idx, box_idx], dist_thresh=3.0, max_iters=500, rng=np.random.default_rng(0))
+
+    assert _same_plane(planes[0] / np.linalg.norm(planes[0][:3]), np.array([0.0, 0.0, 1.0, -800.0]))
+    assert _same_plane(planes[1] / np.linalg.norm(planes[1][:3]), np.array([0.0, 0.0, 1.0, -700.0]))
+
+
+def test_ransac_is_repeatable_with_a_seed():
+    table, box, noise = _table_with_box(np.random.default_rng(2))
+    points = np.concatenate([table, box, noise])
+    all_idx = np.arange(points.shape[0])
+    # More points than are scored, so the scoring subset is drawn too.
+    runs = [
+        ransac_planes(points, [all_idx], dist_thresh=3.0, max_iters=200, rng=np.random.default_rng(7), score_points=1024)[0]
+        for _ in range(2)
+    ]
+
+    np.testing.assert_array_equal(runs[0], runs[1])
+
+
+def test_ransac_tilt_limit_rejects_walls():
+    rng = np.random.default_rng(3)
+    wall = np.column_stack([np.full(3000, 50.0), rng.uniform(-100, 100, 3000), rng.uniform(600, 800, 3000)])
+
+    planes = ransac_planes(wall, [np.arange(3000)], dist_thresh=2.0, max_iters=200, max_tilt_deg=15.0, rng=np.random.default_rng(0))
+
+    assert planes == [None]
+
+
+def test_ransac_without_enough_points():
+    assert ransac_planes(np.zeros((2, 3)), [np.arange(2)], dist_thresh=1.0, max_iters=10) == [None]
+    assert ransac_planes(np.zeros((10, 3)), [], dist_thresh=1.0, max_iters=10) == []
+
+
+def test_ransac_n_point_hypotheses():
+    # A 20-point sample is all inliers often enough only when the plane dominates.
+    table, _, noise = _table_with_box(np.random.default_rng(4))
+    points = np.concatenate([table, noise[:200]])
+    plane = ransac_planes(
+        points, [np.arange(points.shape[0])], dist_thresh=3.0, max_iters=300, rng=np.random.default_rng(0), sample_size=20
+    )[0]
+
+    assert _same_plane(plane / np.linalg.norm(plane[:3]), np.array([0.0, 0.0, 1.0, -800.0]))
+
+
+def test_least_squares_samples_reject_collinear_points():
+    line = np.column_stack([np.arange(5.0), 2.0 * np.arange(5.0), np.full(5, 3.0)])
+    flat = np.column_stack([np.arange(5.0), np.array([0.0, 1.0, 0.0, 1.0, 2.0]), np.full(5, 3.0)])
+    n, d, ok = _planes_from_samples(np.stack([line, flat]))
+
+    assert ok.tolist() == [False, True]
+    np.testing.assert_allclose(np.abs(n[1]), [0.0, 0.0, 1.0], atol=1e-9)
+    np.testing.assert_allclose(d[1] * np.sign(n[1][2]), -3.0)
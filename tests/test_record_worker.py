@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import csv
+
+import numpy as np
+import pytest
+
+pytest.importorskip("PySide6")
+
+from src.acquisition.session import KIND_DEPTH, KIND_POINTS, SessionReader  # noqa: E402
+from src.app_types import DimsResult, Intrinsics, PointCloud  # noqa: E402
+from src.ui.app_state import DropPolicy, ViewLayer  # noqa: E402
+from src.ui.services import record_worker  # noqa: E402
+from src.ui.services.frame_ring import FrameRing  # noqa: E402
+from src.ui.services.record_worker import MIB, RecordWorker, ThroughputBudget  # noqa: E402
+
+INTR = Intrinsics(fx=500.0, fy=500.0, cx=3.5, cy=2.5, width=8, height=6)
+DIMS = DimsResult(length=100.0, width=50.0, height=20.0)
+
+
+def test_budget_allows_one_second_burst_then_refills(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(record_worker.time, "monotonic", lambda: now[0])
+    budget = ThroughputBudget(1.0)
+
+    assert budget.rate == MIB
+    assert budget.take(MIB // 2) and budget.take(MIB // 2)
+    assert not budget.take(1)
+    now[0] = 0.25
+    assert budget.take(MIB // 4) and not budget.take(1)
+    now[0] = 10.0  # idle time never banks more than one second's worth
+    assert not budget.take(MIB + 1)
+
+
+def test_zero_budget_is_unlimited():
+    assert ThroughputBudget(0.0).take(10 * MIB)
+
+
+def test_record_worker_writes_session_layers_and_results(tmp_path):
+    depth = np.arange(48, dtype=np.uint16).reshape(6, 8)
+    points = np.random.default_rng(0).uniform(0, 100, size=(10, 3))
+    layer = np.ones((4, 3))
+    ring = FrameRing(4, DropPolicy.DROP_OLDEST)
+    ring.put((PointCloud(points=points, intrinsics=INTR, depth_scale=1.0, depth=depth, timestamp_ns=5), DIMS, None))
+    ring.put((PointCloud(points=points, intrinsics=INTR, depth_scale=1.0), DIMS, {ViewLayer.OBJECT: layer}))
+    worker = RecordWorker(tmp_path / "rec.session", ring, budget_mb_s=0.0, layers=True)
+    worker.stop()  # drains what is queued, then exits
+    worker.run()
+
+    assert (worker.written, worker.budget_dropped, worker.queue_dropped) == (2, 0, 0)
+    assert worker.bytes_written == depth.nbytes + (10 + 4) * 12
+    reader = SessionReader(tmp_path / "rec.session")
+    assert [reader.frame(i).kind for i in range(len(reader))] == [KIND_DEPTH, KIND_POINTS]
+    np.testing.assert_array_equal(reader.frame(0).data, depth)
+    reader.close()
+    reader = SessionReader(tmp_path / f"rec.{ViewLayer.OBJECT.value}.session")
+    assert [reader.frame(i).data.shape[0] for i in range(len(reader))] == [0, 4]
+    reader.close()
+    with (tmp_path / "rec.csv").open(newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[1] == ["0", "5", "100.0", "50.0", "20.0"] and rows[2][1] == ""
+
+
+def test_record_worker_skips_frames_over_budget(tmp_path):
+    ring = FrameRing(4, DropPolicy.DROP_OLDEST)
+    big = np.zeros((MIB // 12 + 1, 3))
+    ring.put((PointCloud(points=big, intrinsics=INTR, depth_scale=1.0), DIMS, None))
+    worker = RecordWorker(tmp_path / "rec.session", ring, budget_mb_s=1.0)
+    worker.stop()
+    worker.run()
+
+    assert (worker.written, worker.budget_dropped, worker.bytes_written) == (0, 1, 0)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.acquisition.replay import DEPTH_KEY, FrameCache, ReplaySource
+from src.app_types import Intrinsics, PointCloud
+
+
+def _write_frames(tmp_path, n: int = 4) -> None:
+    for i in range(n):
+        np.savez(
+            tmp_path / f"frame_{i}.npz",
+            **{DEPTH_KEY: np.full((6, 8), 100 + i, dtype=np.uint16)},
+            fx=500.0, fy=500.0, cx=3.5, cy=2.5, timestamp_ns=i,
+        )
+
+
+def _frame(nbytes: int) -> PointCloud:
+    points = np.zeros((nbytes // 12, 3), dtype=np.float32)
+    return PointCloud(points=points, intrinsics=Intrinsics(1.0, 1.0, 0.0, 0.0, 1, 1), depth_scale=1.0)
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_frames_come_in_file_order_and_stop_without_loop(tmp_path, prefetch):
+    _write_frames(tmp_path)
+    src = ReplaySource(data_dir=tmp_path, config_path=tmp_path / "missing.yaml", loop=False, prefetch=prefetch)
+
+    assert [frame.timestamp_ns for frame in src] == [0, 1, 2, 3]
+    with pytest.raises(StopIteration):
+        src.read()
+    src.close()
+
+
+def test_looped_prefetch_with_cache_decodes_each_file_once(tmp_path):
+    _write_frames(tmp_path, 3)
+    src = ReplaySource(data_dir=tmp_path, config_path=tmp_path / "missing.yaml", prefetch=2, cache_mb=1)
+
+    frames = [src.read() for _ in range(7)]
+    src.close()
+
+    assert [f.timestamp_ns for f in frames] == [0, 1, 2, 0, 1, 2, 0]
+    assert frames[3] is frames[0] and frames[6] is frames[0]
+    assert (src.cache.misses, len(src.cache)) == (3, 3)
+
+
+def test_single_file_without_loop_yields_one_frame(tmp_path):
+    _write_frames(tmp_path, 1)
+    src = ReplaySource(data_dir=tmp_path / "frame_0.npz", config_path=tmp_path / "missing.yaml", loop=False)
+
+    assert len(list(src)) == 1
+
+
+def test_frame_cache_evicts_least_recently_used():
+    cache = FrameCache(budget_mb=100 * 12 / 2**20)  # room for 100 points
+    frames = {key: _frame(40 * 12) for key in "abc"}
+    cache.put("a", frames["a"])
+    cache.put("b", frames["b"])
+    assert cache.get("a") is frames["a"]  # "b" is now the oldest
+
+    cache.put("c", frames["c"])
+
+    assert cache.get("b") is None and len(cache) == 2 and cache.nbytes == 80 * 12
+    cache.put("big", _frame(101 * 12))  # larger than the whole budget: not cached
+    assert cache.get("big") is None and cache.get("a") is frames["a"]
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.acquisition import session
+from src.acquisition.replay import ReplaySource
+from src.acquisition.session import KIND_DEPTH, KIND_POINTS, SessionReader, SessionWriter, index_path, is_session
+from src.app_types import Distortion, Intrinsics
+
+INTR = Intrinsics(fx=500.0, fy=501.0, cx=3.5, cy=2.5, width=8, height=6)
+
+
+def test_round_trip_points_and_depth(tmp_path):
+    path = tmp_path / "rec.session"
+    points = np.arange(48 * 3, dtype=np.float64).reshape(48, 3)
+    depth = np.arange(48, dtype=np.uint16).reshape(6, 8)
+    with SessionWriter(path) as writer:
+        writer.append_points(points, width=8, height=6, depth_scale=1.0, intrinsics=INTR, timestamp_ns=10)
+        writer.append_depth(depth, depth_scale=0.5)
+
+    reader = SessionReader(path)
+    assert is_session(path) and len(reader) == 2
+
+    pts = reader.frame(0)
+    assert pts.kind == KIND_POINTS
+    assert pts.data.dtype == np.float32 and not pts.data.flags.writeable
+    np.testing.assert_array_equal(pts.data, points.astype(np.float32))
+    assert (pts.width, pts.height, pts.timestamp_ns, pts.intrinsics) == (8, 6, 10, INTR)
+    # Payloads start on 64-byte boundaries of the mapping.
+    assert pts.data.ctypes.data % 64 == 0
+
+    dep = reader.frame(1)
+    assert dep.kind == KIND_DEPTH
+    np.testing.assert_array_equal(dep.data, depth)
+    assert (dep.depth_scale, dep.timestamp_ns, dep.intrinsics, dep.distortion) == (0.5, None, None, None)
+    reader.close()
+
+
+def test_append_to_existing_session(tmp_path):
+    path = tmp_path / "rec.session"
+    for value in (1.0, 2.0):
+        with SessionWriter(path) as writer:
+            writer.append_points(np.full((4, 3), value), width=4, height=1)
+
+    reader = SessionReader(path)
+    assert [float(reader.frame(i).data[0, 0]) for i in range(len(reader))] == [1.0, 2.0]
+
+
+def test_truncated_last_frame_is_skipped(tmp_path):
+    path = tmp_path / "rec.session"
+    with SessionWriter(path) as writer:
+        writer.append_depth(np.ones((6, 8), dtype=np.uint16))
+        writer.append_depth(np.full((6, 8), 2, dtype=np.uint16))
+    path.write_bytes(path.read_bytes()[:-40])
+
+    assert len(SessionReader(path)) == 1
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "other.session"
+    path.write_bytes(b"not a session file")
+    with pytest.raises(ValueError):
+        SessionReader(path)
+    with SessionWriter(tmp_path / "pts.session") as writer, pytest.raises(ValueError):
+        writer.append_points(np.zeros((4, 2)), width=4, height=1)
+
+
+def test_reader_uses_the_index_instead_of_walking_records(tmp_path, monkeypatch):
+    path = tmp_path / "rec.session"
+    with SessionWriter(path) as writer:
+        for value in range(5):
+            writer.append_depth(np.full((6, 8), value, dtype=np.uint16))
+    walked = []
+    record_end = session._record_end
+    monkeypatch.setattr(session, "_record_end", lambda mm, pos, *a: walked.append(pos) or record_end(mm, pos, *a))
+
+    reader = SessionReader(path)
+
+    assert len(reader) == 5 and len(walked) == 1  # only the last indexed record is checked
+    assert int(reader.frame(3).data[0, 0]) == 3
+
+
+def test_missing_or_short_index_is_completed_by_walking(tmp_path):
+    path = tmp_path / "rec.session"
+    with SessionWriter(path) as writer:
+        for value in range(3):
+            writer.append_depth(np.full((6, 8), value, dtype=np.uint16))
+    idx = index_path(path)
+    idx.write_bytes(idx.read_bytes()[:-12])  # crash between a record and its entry
+    assert [int(SessionReader(path).frame(i).data[0, 0]) for i in range(3)] == [0, 1, 2]
+    idx.unlink()
+    assert len(SessionReader(path)) == 3
+
+
+def test_append_truncates_a_cut_frame(tmp_path):
+    path = tmp_path / "rec.session"
+    with SessionWriter(path) as writer:
+        writer.append_depth(np.ones((6, 8), dtype=np.uint16))
+        writer.append_depth(np.full((6, 8), 2, dtype=np.uint16))
+    path.write_bytes(path.read_bytes()[:-40])
+
+    with SessionWriter(path) as writer:
+        writer.append_depth(np.full((6, 8), 3, dtype=np.uint16))
+
+    reader = SessionReader(path)
+    assert [int(reader.frame(i).data[0, 0]) for i in range(len(reader))] == [1, 3]
+    assert len(index_path(path).read_bytes()) == 2 * 8
+
+
+def test_recorded_distortion_is_used_for_depth_replay(tmp_path):
+    path = tmp_path / "rec.session"
+    dist = Distortion(k1=0.2, p1=0.01)
+    depth = np.full((6, 8), 1000, dtype=np.uint16)
+    with SessionWriter(path) as writer:
+        writer.append_depth(depth, intrinsics=INTR, distortion=dist)
+        writer.append_depth(depth, intrinsics=INTR)
+    assert SessionReader(path).frame(0).distortion == dist
+
+    src = ReplaySource(data_dir=path, config_path=tmp_path / "missing.yaml", loop=False)
+    distorted, plain = np.asarray(src.read().points), np.asarray(src.read().points)
+    src.close()
+    assert not np.allclose(distorted, plain)
+
+
+def test_reads_version_1_sessions(tmp_path):
+    path = tmp_path / "old.session"
+    header = np.zeros((), dtype=session._FILE_HEADER)
+    header["magic"], header["version"] = session.FILE_MAGIC, 1
+    rec = np.zeros((), dtype=session._RECORD_DTYPES[1])
+    rec["magic"], rec["kind"], rec["width"], rec["height"] = session.RECORD_MAGIC, KIND_DEPTH, 8, 6
+    rec["count"], rec["nbytes"], rec["depth_scale"] = 48, 96, 1.0
+    path.write_bytes(header.tobytes() + bytes(48) + rec.tobytes() + bytes(32) + np.ones(48, np.uint16).tobytes() + bytes(32))
+
+    frame = SessionReader(path).frame(0)
+    assert frame.distortion is None and int(frame.data.sum()) == 48
+    with pytest.raises(ValueError, match="version 1"):
+        SessionWriter(path)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.acquisition.replay import ReplaySource
+from src.config import DimsAlgoConfig
+from src.core.pipeline import Pipeline
+from src.core.stages import STAGE_FIELDS, STAGE_ORDER, StageCache
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _run(cache: StageCache, frame: object, cfg: object, stages: tuple[str, ...]) -> list[str]:
+    cache.bind(frame, cfg)
+    for stage in stages:
+        cache.run(stage, lambda stage=stage: stage)
+    return cache.recomputed
+
+
+def test_field_change_reruns_from_the_first_stage_that_reads_it():
+    cfg = SimpleNamespace(**{name: 0 for names in STAGE_FIELDS.values() for name in names})
+    cache, frame = StageCache(), object()
+    assert _run(cache, frame, cfg, STAGE_ORDER) == list(STAGE_ORDER)
+    assert _run(cache, frame, cfg, STAGE_ORDER) == []
+
+    cfg.sd_thresh = 1
+    assert _run(cache, frame, cfg, STAGE_ORDER) == list(STAGE_ORDER[STAGE_ORDER.index("sd_filter"):])
+    cfg.q_low = 1
+    assert _run(cache, frame, cfg, STAGE_ORDER) == ["extents"]
+    # A new frame object drops every output.
+    assert _run(cache, object(), cfg, STAGE_ORDER) == list(STAGE_ORDER)
+
+
+def test_cost_counts_cached_stages():
+    cache, frame, cfg = StageCache(), object(), DimsAlgoConfig()
+    cache.bind(frame, cfg)
+    cache.run("roi", lambda: sum(range(100_000)))
+    cost = cache.cost_ms
+    cache.bind(frame, cfg)
+    cache.run("roi", lambda: 0)
+    assert cache.cost_ms == cost > 0 and cache.recomputed == []
+
+
+def test_pipeline_reuses_stages_for_the_same_frame():
+    src = ReplaySource(data_dir=ROOT / "data" / "mouse.npz", config_path=ROOT / "configs" / "config.yaml", loop=False)
+    frame = src.read()
+    pipe = Pipeline(DimsAlgoConfig())
+    first, _ = pipe.process(frame)
+    assert pipe.recomputed[0] == "roi"
+
+    again, _ = pipe.process(frame)
+    assert pipe.recomputed == () and again == first
+
+    pipe.cfg.q_high = 0.9
+    narrower, _ = pipe.process(frame)
+    assert pipe.recomputed == ("extents",)
+    assert narrower.height < first.height
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+pytest.importorskip("PySide6")
+
+from src.app_types import DimsResult  # noqa: E402
+from src.config import DimsAlgoConfig  # noqa: E402
+from src.config_store import ConfigStore  # noqa: E402
+from src.core.layers import LayerViews  # noqa: E402
+from src.ui.app_state import DropPolicy, LodMethod, ViewLayer  # noqa: E402
+from src.ui.services.frame_ring import FrameRing  # noqa: E402
+from src.ui.services.stream_worker import StreamResult, StreamWorker  # noqa: E402
+
+
+class _FakePipeline:
+    """Frame n measures n mm and has n * 100 points in every layer it is asked for."""
+
+    def __init__(self) -> None:
+        self.cfg = None
+        self.recomputed = ("roi",)
+        self.profiler = type("Profiler", (), {"last": None})()
+        self.requests: list[tuple[ViewLayer, ...] | None] = []
+
+    def process(self, frame, layers=None):
+        self.requests.append(None if layers is None else tuple(layers))
+        views = LayerViews(layers)
+        for layer in ViewLayer:
+            views.set(layer, np.full((frame * 100, 3), float(frame)))
+        return DimsResult(length=frame, width=frame, height=frame), views
+
+
+def test_mailbox_keeps_only_the_latest_result_of_the_displayed_layer():
+    frames = FrameRing(4, DropPolicy.DROP_OLDEST)
+    for frame in (1, 2, 3):
+        frames.put(frame)
+    frames.close()
+    results = FrameRing(1, DropPolicy.LATEST)
+    configs = ConfigStore(DimsAlgoConfig())
+    configs.update({"voxel_size": 2.0})
+    pipeline = _FakePipeline()
+    worker = StreamWorker(frames, results, pipeline, configs)
+    worker.set_render(ViewLayer.OBJECT, point_budget=150, lod=LodMethod.STRIDE)
+    ready = []
+    worker.ready.connect(lambda: ready.append(1))
+
+    worker.run()  # drains the closed ring, then exits
+
+    assert pipeline.requests == [(ViewLayer.OBJECT,)] * 3
+    assert len(ready) == 1 and results.dropped == 2
+    result = results.get_nowait()
+    assert isinstance(result, StreamResult)
+    assert (result.dims.length, result.layer, result.config_version) == (3, ViewLayer.OBJECT, 1)
+    assert result.render.total == 300 and result.render.pos.shape[0] <= 150
+    assert pipeline.cfg.voxel_size == 2.0
+
+
+def test_tap_with_layers_gets_every_layer():
+    frames = FrameRing(2, DropPolicy.DROP_OLDEST)
+    frames.put(1)
+    frames.close()
+    tap = FrameRing(2, DropPolicy.DROP_OLDEST)
+    pipeline = _FakePipeline()
+    worker = StreamWorker(frames, FrameRing(1, DropPolicy.LATEST), pipeline, ConfigStore(DimsAlgoConfig()))
+    worker.set_tap(tap, layers=True)
+
+    worker.run()
+
+    assert pipeline.requests == [None]
+    frame, dims, clouds = tap.get_nowait()
+    assert frame == 1 and set(clouds) == set(ViewLayer)